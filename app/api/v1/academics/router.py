@@ -6,6 +6,7 @@ from sqlalchemy.orm import Session
 
 from app.db.session import get_db
 from app.core.rbac.permission_checker import require_roles
+from app.core.response_cache import cached_response
 from app.core.rbac.role_enums import Role
 from app.services.academics.academics_service import AcademicsService
 
@@ -27,6 +28,7 @@ def create_subject(payload: Dict[str, Any], db: Session = Depends(get_db), user=
     )
 
 @router.get("/subjects")
+@cached_response("Subject")
 def list_subjects(db: Session = Depends(get_db), user=Depends(require_roles(
     Role.TEACHER, Role.SCHOOL_ADMIN, Role.SUPER_ADMIN
 ))):
@@ -50,6 +52,7 @@ def create_curriculum(payload: Dict[str, Any], db: Session = Depends(get_db), us
     )
 
 @router.get("/curriculum")
+@cached_response("Curriculum")
 def list_curriculum(db: Session = Depends(get_db), user=Depends(require_roles(
     Role.TEACHER, Role.SCHOOL_ADMIN, Role.SUPER_ADMIN
 ))):
@@ -73,6 +76,7 @@ def create_term(payload: Dict[str, Any], db: Session = Depends(get_db), user=Dep
     )
 
 @router.get("/terms")
+@cached_response("AcademicTerm")
 def list_terms(db: Session = Depends(get_db), user=Depends(require_roles(
     Role.TEACHER, Role.SCHOOL_ADMIN, Role.SUPER_ADMIN
 ))):
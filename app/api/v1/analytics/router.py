@@ -2,10 +2,10 @@ from typing import Optional
 from datetime import date
 
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.session import get_db
-from app.core.rbac.permission_checker import require_roles
+from app.db.session import get_async_read_db
+from app.core.rbac.permission_checker import require_roles_async
 from app.core.rbac.role_enums import Role
 from app.services.analytics.analytics_service import AnalyticsService
 
@@ -16,17 +16,18 @@ router = APIRouter(prefix="/analytics", tags=["Analytics"])
 # Attendance
 # ----------------------------------------
 @router.get("/attendance")
-def attendance_summary(
+async def attendance_summary(
     date_from: date = Query(...),
     date_to: date = Query(...),
-    db: Session = Depends(get_db),
-    user=Depends(require_roles(Role.SCHOOL_ADMIN, Role.SUPER_ADMIN, Role.PRINCIPAL)),
+    db: AsyncSession = Depends(get_async_read_db),
+    user=Depends(require_roles_async(Role.SCHOOL_ADMIN, Role.SUPER_ADMIN, Role.PRINCIPAL)),
 ):
-    svc = AnalyticsService(db)
-    return svc.attendance_summary(
-        school_id=user.school_id,
-        date_from=date_from,
-        date_to=date_to,
+    return await db.run_sync(
+        lambda sync_db: AnalyticsService(sync_db).attendance_summary(
+            school_id=user.school_id,
+            date_from=date_from,
+            date_to=date_to,
+        )
     )
 
 
@@ -34,29 +35,31 @@ def attendance_summary(
 # Grades
 # ----------------------------------------
 @router.get("/grades")
-def grades_summary(
-    db: Session = Depends(get_db),
-    user=Depends(require_roles(Role.TEACHER, Role.SCHOOL_ADMIN, Role.SUPER_ADMIN)),
+async def grades_summary(
+    db: AsyncSession = Depends(get_async_read_db),
+    user=Depends(require_roles_async(Role.TEACHER, Role.SCHOOL_ADMIN, Role.SUPER_ADMIN)),
 ):
-    svc = AnalyticsService(db)
-    return svc.grade_distribution(school_id=user.school_id)
+    return await db.run_sync(
+        lambda sync_db: AnalyticsService(sync_db).grade_distribution(school_id=user.school_id)
+    )
 
 
 # ----------------------------------------
 # Transport
 # ----------------------------------------
 @router.get("/transport")
-def transport_kpis(
+async def transport_kpis(
     date_from: date = Query(...),
     date_to: date = Query(...),
-    db: Session = Depends(get_db),
-    user=Depends(require_roles(Role.TRANSPORT, Role.SCHOOL_ADMIN, Role.SUPER_ADMIN)),
+    db: AsyncSession = Depends(get_async_read_db),
+    user=Depends(require_roles_async(Role.TRANSPORT, Role.SCHOOL_ADMIN, Role.SUPER_ADMIN)),
 ):
-    svc = AnalyticsService(db)
-    return svc.transport_kpis(
-        school_id=user.school_id,
-        date_from=date_from,
-        date_to=date_to,
+    return await db.run_sync(
+        lambda sync_db: AnalyticsService(sync_db).transport_kpis(
+            school_id=user.school_id,
+            date_from=date_from,
+            date_to=date_to,
+        )
     )
 
 
@@ -64,19 +67,20 @@ def transport_kpis(
 # Health
 # ----------------------------------------
 @router.get("/health")
-def health_summary(
+async def health_summary(
     date_from: date = Query(...),
     date_to: date = Query(...),
-    db: Session = Depends(get_db),
-    user=Depends(require_roles(
+    db: AsyncSession = Depends(get_async_read_db),
+    user=Depends(require_roles_async(
         Role.NURSE, Role.SCHOOL_ADMIN, Role.SUPER_ADMIN
     )),
 ):
-    svc = AnalyticsService(db)
-    return svc.health_kpis(
-        school_id=user.school_id,
-        date_from=date_from,
-        date_to=date_to,
+    return await db.run_sync(
+        lambda sync_db: AnalyticsService(sync_db).health_kpis(
+            school_id=user.school_id,
+            date_from=date_from,
+            date_to=date_to,
+        )
     )
 
 
@@ -84,17 +88,18 @@ def health_summary(
 # Events
 # ----------------------------------------
 @router.get("/events/{event_id}")
-def event_stats(
+async def event_stats(
     event_id: int,
-    db: Session = Depends(get_db),
-    user=Depends(require_roles(
+    db: AsyncSession = Depends(get_async_read_db),
+    user=Depends(require_roles_async(
         Role.TEACHER, Role.SCHOOL_ADMIN, Role.SUPER_ADMIN, Role.PRINCIPAL
     )),
 ):
-    svc = AnalyticsService(db)
-    return svc.events_summary(
-        school_id=user.school_id,
-        event_id=event_id,
+    return await db.run_sync(
+        lambda sync_db: AnalyticsService(sync_db).events_summary(
+            school_id=user.school_id,
+            event_id=event_id,
+        )
     )
 
 
@@ -102,11 +107,12 @@ def event_stats(
 # Early Warning System
 # ----------------------------------------
 @router.get("/early-warning")
-def early_warning(
-    db: Session = Depends(get_db),
-    user=Depends(require_roles(
+async def early_warning(
+    db: AsyncSession = Depends(get_async_read_db),
+    user=Depends(require_roles_async(
         Role.HR, Role.SCHOOL_ADMIN, Role.SUPER_ADMIN, Role.PRINCIPAL
     )),
 ):
-    svc = AnalyticsService(db)
-    return svc.early_warning(school_id=user.school_id)
+    return await db.run_sync(
+        lambda sync_db: AnalyticsService(sync_db).early_warning(school_id=user.school_id)
+    )
@@ -2,7 +2,7 @@ from typing import Optional
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
 
-from app.db.session import get_db
+from app.db.session import get_read_db
 from app.core.rbac.permission_checker import require_roles
 from app.core.rbac.role_enums import Role
 
@@ -16,7 +16,7 @@ def search(
     action: Optional[str] = Query(None),
     since: Optional[str] = Query(None),
     until: Optional[str] = Query(None),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     user=Depends(require_roles(Role.SUPER_ADMIN, Role.SCHOOL_ADMIN)),
 ):
     svc = AuditIntelService(db)
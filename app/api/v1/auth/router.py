@@ -1,23 +1,54 @@
-cat > ~/kogia/coreon-edu-api/app/api/v1/auth/router.py <<'EOF'
 from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
-from app.core.security import verify_password, create_access_token
-from app.db.session import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from app.core.passwords import LoginAdmissionError, verify_password_async
+from app.core.principal_cache import primary_role
+from app.core.security import create_access_token
+from app.db.session import get_async_db
 from app import models
 
 # No local prefix here; main.py adds /api/v1/auth
 router = APIRouter()
 
 class LoginRequest(BaseModel):
-    username: str
+    username: str  # the account email (OAuth2 password-flow field name)
     password: str
 
 @router.post("/login")
-def login(data: LoginRequest, db: Session = Depends(get_db)):
-    user = db.query(models.User).filter(models.User.username == data.username).first()
-    if not user or not verify_password(data.password, user.hashed_password):
+async def login(data: LoginRequest, db: AsyncSession = Depends(get_async_db)):
+    result = await db.execute(
+        select(models.User)
+        .where(models.User.email == data.username)
+        .options(selectinload(models.User.roles).selectinload(models.UserRole.role))
+        .execution_options(all_tenants=True)
+    )
+    user = result.scalars().first()
+    if not user:
         raise HTTPException(status_code=401, detail="Invalid credentials")
-    token = create_access_token(sub=str(user.id), role=user.role)
+
+    # bcrypt runs in the dedicated hash executor, never on the event loop / shared threadpool
+    try:
+        valid, new_hash = await verify_password_async(data.password, user.password_hash)
+    except LoginAdmissionError:
+        raise HTTPException(
+            status_code=503,
+            detail="Too many concurrent logins, retry shortly",
+            headers={"Retry-After": "1"},
+        )
+    if not valid:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+
+    # cost parameters changed since this hash was stored: upgrade it now
+    if new_hash:
+        user.password_hash = new_hash
+        await db.commit()
+
+    token = create_access_token(
+        sub=str(user.id),
+        role=primary_role(user),
+        school_id=user.school_id,
+        is_superuser=bool(user.is_superuser),
+    )
     return {"access_token": token, "token_type": "bearer"}
-EOF
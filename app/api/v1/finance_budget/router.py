@@ -4,7 +4,7 @@ from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
 from decimal import Decimal
 
-from app.db.session import get_db
+from app.db.session import get_db, get_read_db
 from app.core.security import get_current_user
 from app.core.rbac.permission_checker import require_roles
 from app.core.rbac.role_enums import Role
@@ -84,7 +84,7 @@ def register_transaction(
 def get_department_summary(
     department_id: int,
     fiscal_year: int = Query(..., description="Fiscal year e.g. 2025"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     user=Depends(require_roles(
         Role.ACCOUNTANT,
         Role.SCHOOL_ADMIN,
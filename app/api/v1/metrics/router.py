@@ -1,5 +1,7 @@
 from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
 from app.monitoring.metrics import metrics
+from app.monitoring.multiprocess import render_prometheus
 
 router = APIRouter(prefix="/metrics", tags=["Metrics"])
 
@@ -10,3 +12,15 @@ def get_metrics_debug():
     Not for production public exposure.
     """
     return metrics.snapshot()
+
+
+@router.get("/prometheus", response_class=PlainTextResponse, include_in_schema=False)
+def get_metrics_prometheus():
+    """
+    Prometheus text exposition, aggregated across all worker processes
+    sharing METRICS_MULTIPROC_DIR.
+    """
+    return PlainTextResponse(
+        render_prometheus(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
@@ -1,32 +1,123 @@
-from fastapi import APIRouter, Depends
+from typing import List, Optional
+
+from fastapi import APIRouter, Body, Depends, Header, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.db.session import get_db
-from app.core.security import get_current_user
+from app.db.session import AsyncSessionLocal, get_db, get_async_db
+from app.core.security import get_current_user, get_current_user_async
 from app.models import Notification, NotificationPreference
-from app.services.notification_service import NotificationService
+from app.services.notification_hub import (
+    StreamLimitExceeded,
+    notification_hub,
+    notification_message,
+)
+from app.services.notification_inbox import (
+    INBOX_DEFAULT_LIMIT,
+    INBOX_MAX_LIMIT,
+    inbox_query,
+    mark_all_read as mark_all_notifications_read,
+    mark_read as mark_notifications_read,
+    split_page,
+    unread_count as unread_notification_count,
+)
 
 router = APIRouter(prefix="/notifications", tags=["Notifications"])
 
+# notifications re-sent to a reconnecting stream
+STREAM_REPLAY_LIMIT = 100
+
 @router.get("/")
-def list_notifications(db: Session = Depends(get_db), user=Depends(get_current_user)):
-    q = (
-        db.query(Notification)
-        .filter(Notification.user_id == user.id)
-        .order_by(Notification.created_at.desc())
+async def list_notifications(
+    response: Response,
+    limit: int = Query(INBOX_DEFAULT_LIMIT, ge=1, le=INBOX_MAX_LIMIT),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
+    unread_only: bool = False,
+    db: AsyncSession = Depends(get_async_db),
+    user=Depends(get_current_user_async),
+):
+    """
+    Newest first, one page at a time. The cursor for the next page is
+    returned in the X-Next-Cursor header (absent on the last page).
+    """
+    try:
+        q = inbox_query(user.id, limit=limit, cursor=cursor, unread_only=unread_only)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    result = await db.execute(q)
+    items, next_cursor = split_page(result.scalars().all(), limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return items
+
+@router.get("/unread-count")
+async def unread_count(db: AsyncSession = Depends(get_async_db), user=Depends(get_current_user_async)):
+    count = await db.run_sync(lambda sync_db: unread_notification_count(sync_db, user.id))
+    return {"unread": count}
+
+@router.get("/stream")
+async def stream(
+    user=Depends(get_current_user_async),
+    last_event_id: Optional[int] = Header(None, alias="Last-Event-ID"),
+):
+    """
+    Server-sent events: "notification" (new or updated, id = notification id)
+    and "unread" (delta / absolute count). Starts with the current unread
+    count; on reconnect, notifications after Last-Event-ID are replayed.
+    No DB connection is held while the stream is open.
+    """
+    try:
+        sub = notification_hub.subscribe(user.id)
+    except StreamLimitExceeded as exc:
+        raise HTTPException(status_code=503, detail=str(exc), headers={"Retry-After": "30"})
+
+    try:
+        async with AsyncSessionLocal() as db:
+            initial = [{
+                "event": "unread",
+                "count": await db.run_sync(lambda sync_db: unread_notification_count(sync_db, user.id)),
+            }]
+            if last_event_id is not None:
+                result = await db.execute(
+                    select(Notification)
+                    .where(Notification.user_id == user.id)
+                    .where(Notification.id > last_event_id)
+                    .order_by(Notification.id)
+                    .limit(STREAM_REPLAY_LIMIT)
+                )
+                initial += [
+                    notification_message(
+                        n.id, type=n.type, category=n.category, title=n.title,
+                        body=n.body, priority=n.priority, unread_delta=0,
+                    )
+                    for n in result.scalars()
+                ]
+    except Exception:
+        notification_hub.unsubscribe(sub)
+        raise
+
+    return StreamingResponse(
+        notification_hub.events(sub, initial),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
-    return q.all()
+
+@router.post("/mark-read")
+def mark_read_bulk(
+    ids: List[int] = Body(..., embed=True),
+    db: Session = Depends(get_db),
+    user=Depends(get_current_user),
+):
+    return {"updated": mark_notifications_read(db, user.id, ids)}
+
+@router.post("/mark-all-read")
+def mark_all_read(db: Session = Depends(get_db), user=Depends(get_current_user)):
+    return {"updated": mark_all_notifications_read(db, user.id)}
 
 @router.post("/{notification_id}/mark-read")
 def mark_read(notification_id: int, db: Session = Depends(get_db), user=Depends(get_current_user)):
-    notif = (
-        db.query(Notification)
-        .filter(Notification.id == notification_id)
-        .filter(Notification.user_id == user.id)
-        .first()
-    )
-    if notif:
-        notif.is_read = True
-        db.commit()
+    mark_notifications_read(db, user.id, [notification_id])
     return {"status": "ok"}
 
 @router.get("/preferences")
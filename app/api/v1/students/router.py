@@ -1,11 +1,12 @@
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel, EmailStr
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.db.session import get_db
+from app.db.session import get_db, get_async_db
 from app import models
-from app.core.security import get_current_user
+from app.core.security import get_current_user, get_current_user_async
 
 router = APIRouter()
 
@@ -119,19 +120,23 @@ def create_student(school_id: int, grade_id: int, classroom_id: int,
     "/{school_id}/grades/{grade_id}/classrooms/{classroom_id}/students",
     response_model=List[StudentOut],
 )
-def list_students(school_id: int, grade_id: int, classroom_id: int,
-                  db: Session = Depends(get_db),
-                  current_user: models.User = Depends(get_current_user)):
-
-    _check_access(db, current_user, school_id)
-    _validate_structure(db, school_id, grade_id, classroom_id)
+async def list_students(school_id: int, grade_id: int, classroom_id: int,
+                        db: AsyncSession = Depends(get_async_db),
+                        current_user: models.User = Depends(get_current_user_async)):
+
+    # sync helpers run on the async connection (greenlet), not the threadpool
+    def _load(sync_db: Session):
+        _check_access(sync_db, current_user, school_id)
+        _validate_structure(sync_db, school_id, grade_id, classroom_id)
+
+        return (
+            sync_db.query(models.Student)
+            .filter(models.Student.classroom_id == classroom_id)
+            .order_by(models.Student.id)
+            .all()
+        )
 
-    return (
-        db.query(models.Student)
-        .filter(models.Student.classroom_id == classroom_id)
-        .order_by(models.Student.id)
-        .all()
-    )
+    return await db.run_sync(_load)
 
 
 @router.get(
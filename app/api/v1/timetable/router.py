@@ -1,10 +1,12 @@
 from typing import Dict, Any, Optional
 
 from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.db.session import get_db
-from app.core.rbac.permission_checker import require_roles
+from app.db.session import get_db, get_async_db
+from app.core.rbac.permission_checker import require_roles, require_roles_async
+from app.core.response_cache import cached_response
 from app.core.rbac.role_enums import Role
 from app.services.timetable.timetable_service import TimetableService
 
@@ -43,10 +45,11 @@ def create_entry(
 # Class timetable
 # -------------------------------------
 @router.get("/class/{class_id}")
-def class_timetable(
+@cached_response("TimetableEntry")
+async def class_timetable(
     class_id: int,
-    db: Session = Depends(get_db),
-    user=Depends(require_roles(
+    db: AsyncSession = Depends(get_async_db),
+    user=Depends(require_roles_async(
         Role.TEACHER,
         Role.STUDENT,
         Role.PARENT,
@@ -54,10 +57,11 @@ def class_timetable(
         Role.SUPER_ADMIN,
     )),
 ):
-    svc = TimetableService(db)
-    return svc.class_timetable(
-        school_id=user.school_id,
-        class_id=class_id,
+    return await db.run_sync(
+        lambda sync_db: TimetableService(sync_db).class_timetable(
+            school_id=user.school_id,
+            class_id=class_id,
+        )
     )
 
 
@@ -65,20 +69,22 @@ def class_timetable(
 # Teacher schedule
 # -------------------------------------
 @router.get("/teacher/{teacher_id}")
-def teacher_timetable(
+@cached_response("TimetableEntry")
+async def teacher_timetable(
     teacher_id: int,
-    db: Session = Depends(get_db),
-    user=Depends(require_roles(
+    db: AsyncSession = Depends(get_async_db),
+    user=Depends(require_roles_async(
         Role.TEACHER,
         Role.SCHOOL_ADMIN,
         Role.SUPER_ADMIN,
         Role.PRINCIPAL,
     )),
 ):
-    svc = TimetableService(db)
-    return svc.teacher_timetable(
-        school_id=user.school_id,
-        teacher_id=teacher_id,
+    return await db.run_sync(
+        lambda sync_db: TimetableService(sync_db).teacher_timetable(
+            school_id=user.school_id,
+            teacher_id=teacher_id,
+        )
     )
 
 
@@ -86,19 +92,21 @@ def teacher_timetable(
 # Room timetable
 # -------------------------------------
 @router.get("/room/{room_id}")
-def room_timetable(
+@cached_response("TimetableEntry")
+async def room_timetable(
     room_id: int,
-    db: Session = Depends(get_db),
-    user=Depends(require_roles(
+    db: AsyncSession = Depends(get_async_db),
+    user=Depends(require_roles_async(
         Role.SCHOOL_ADMIN,
         Role.SUPER_ADMIN,
         Role.PRINCIPAL,
     )),
 ):
-    svc = TimetableService(db)
-    return svc.room_timetable(
-        school_id=user.school_id,
-        room_id=room_id,
+    return await db.run_sync(
+        lambda sync_db: TimetableService(sync_db).room_timetable(
+            school_id=user.school_id,
+            room_id=room_id,
+        )
     )
 
 
@@ -7,6 +7,7 @@ from sqlalchemy.orm import Session
 
 from app.db.session import get_db
 from app.core.rbac.permission_checker import require_roles
+from app.core.response_cache import cached_response
 from app.core.rbac.role_enums import Role
 from app.services.transport.transport_service import TransportService
 
@@ -35,6 +36,7 @@ def create_bus(
 
 
 @router.get("/buses")
+@cached_response("TransportBus")
 def list_buses(
     db: Session = Depends(get_db),
     user=Depends(require_roles(
@@ -66,6 +68,7 @@ def create_route(
 
 
 @router.get("/routes")
+@cached_response("TransportRoute")
 def list_routes(
     db: Session = Depends(get_db),
     user=Depends(require_roles(
@@ -104,6 +107,7 @@ def add_stop(
 
 
 @router.get("/routes/{route_id}/stops")
+@cached_response("TransportStop")
 def list_stops(
     route_id: int,
     db: Session = Depends(get_db),
@@ -3,8 +3,16 @@ from app.background.handlers.notification_tasks import (
     send_email_task,
     send_sms_task,
     send_push_task,
+    send_email_batch_task,
+    send_sms_batch_task,
+    send_push_batch_task,
+    send_digest_task,
 )
 
 task_queue.register("send_email", send_email_task)
 task_queue.register("send_sms", send_sms_task)
 task_queue.register("send_push", send_push_task)
+task_queue.register("send_email_batch", send_email_batch_task)
+task_queue.register("send_sms_batch", send_sms_batch_task)
+task_queue.register("send_push_batch", send_push_batch_task)
+task_queue.register("send_digest", send_digest_task)
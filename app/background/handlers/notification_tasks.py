@@ -1,6 +1,3 @@
-from app.services.notification_service import NotificationService
-from app.db.session import SessionLocal
-
 def send_email_task(payload):
     # placeholder for real integration
     print("[TASK] Sending email:", payload)
@@ -10,3 +7,21 @@ def send_sms_task(payload):
 
 def send_push_task(payload):
     print("[TASK] Sending push notification:", payload)
+
+
+# batch variants, enqueued by NotificationService.create_many:
+# payload = {school_id, title, body, priority, recipients: [{user_id, notification_id}]}
+def send_email_batch_task(payload):
+    print(f"[TASK] Sending email batch: {len(payload['recipients'])} recipients")
+
+def send_sms_batch_task(payload):
+    print(f"[TASK] Sending SMS batch: {len(payload['recipients'])} recipients")
+
+def send_push_batch_task(payload):
+    print(f"[TASK] Sending push batch: {len(payload['recipients'])} recipients")
+
+
+# periodic digest, enqueued by notification_digest.flush_digests:
+# payload = {user_id, channel, period, count, items: [{notification_id, title}]}
+def send_digest_task(payload):
+    print(f"[TASK] Sending {payload['period']} {payload['channel']} digest: {payload['count']} notifications")
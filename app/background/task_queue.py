@@ -1,32 +1,296 @@
-import threading
+import itertools
+import logging
+import os
 import queue
+import threading
 import time
-from typing import Callable, Dict, Any
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from app.monitoring.metrics import metrics
+
+logger = logging.getLogger("coreon.api")
+
+# Lower runs first; unknown priorities are treated as "normal"
+PRIORITIES = {"critical": 0, "high": 1, "normal": 2, "low": 3}
+
+TASK_QUEUE_CAPACITY = int(os.getenv("TASK_QUEUE_CAPACITY", "1000"))  # per task type
+# default wait for room in a full lane; 0 = fail at once (request threads
+# must not stall on a backed-up task type)
+TASK_ENQUEUE_TIMEOUT_SECONDS = float(os.getenv("TASK_ENQUEUE_TIMEOUT_SECONDS", "0"))
+TASK_MAX_RETRIES = int(os.getenv("TASK_MAX_RETRIES", "3"))
+TASK_RETRY_BACKOFF_SECONDS = float(os.getenv("TASK_RETRY_BACKOFF_SECONDS", "1"))
+TASK_DEAD_LETTER_MAX = int(os.getenv("TASK_DEAD_LETTER_MAX", "1000"))
+
+
+def _parse_workers(raw: str) -> Dict[str, int]:
+    # TASK_WORKERS="send_email=4,send_sms=2"
+    workers = {}
+    for item in raw.split(","):
+        name, _, count = item.strip().partition("=")
+        if name and count:
+            workers[name] = int(count)
+    return workers
+
+
+TASK_WORKERS = _parse_workers(os.getenv("TASK_WORKERS", ""))
+
+
+class TaskQueueFull(Exception):
+    """
+    Raised by enqueue() when a task type stays at capacity for the whole
+    enqueue timeout.
+    """
+
+
+class TaskDeadLettered(Exception):
+    """
+    Set on an enqueue() future when the task exhausted its retries.
+    """
+
+
+class _Task:
+    __slots__ = ("name", "payload", "priority", "attempt", "enqueued_at", "future")
+
+    def __init__(self, name: str, payload: Dict[str, Any], priority: str):
+        self.name = name
+        self.payload = payload
+        self.priority = priority
+        self.attempt = 0
+        self.enqueued_at = time.perf_counter()
+        # settled when the task finishes or is dead-lettered
+        self.future: Future = Future()
+
+
+class _Lane:
+    """
+    Bounded priority queue + worker threads for one task type, so a slow
+    email provider never holds up SMS or push.
+    """
+
+    def __init__(self, name: str, handler: Callable, workers: int, max_retries: int, capacity: int):
+        self.name = name
+        self.handler = handler
+        self.workers = workers
+        self.max_retries = max_retries
+        self.queue: "queue.PriorityQueue" = queue.PriorityQueue(maxsize=capacity)
+        self.threads: List[threading.Thread] = []
 
 
 class TaskQueue:
     def __init__(self):
-        self.queue = queue.Queue()
         self.handlers: Dict[str, Callable] = {}
-        self.worker = threading.Thread(target=self._worker_loop, daemon=True)
-        self.worker.start()
+        self._lanes: Dict[str, _Lane] = {}
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        # queued + running + waiting for retry, for drain()
+        self._outstanding = 0
+        self._closing = False
+        self.dead_letters: Deque[Dict[str, Any]] = deque(maxlen=TASK_DEAD_LETTER_MAX)
 
-    def register(self, task_name: str, handler: Callable):
+    def register(
+        self,
+        task_name: str,
+        handler: Callable,
+        *,
+        workers: Optional[int] = None,
+        max_retries: int = TASK_MAX_RETRIES,
+        capacity: int = TASK_QUEUE_CAPACITY,
+    ):
+        """
+        workers defaults to TASK_WORKERS[task_name], else 1.
+        """
         self.handlers[task_name] = handler
+        self._lanes[task_name] = _Lane(
+            task_name,
+            handler,
+            workers or TASK_WORKERS.get(task_name, 1),
+            max_retries,
+            capacity,
+        )
+
+    def enqueue(
+        self,
+        task_name: str,
+        payload: Dict[str, Any],
+        priority: Optional[str] = None,
+        timeout: Optional[float] = None,
+    ):
+        """
+        Queue a task; priority defaults to payload["priority"].
+
+        Raises TaskQueueFull when the task type is at capacity. Callers that
+        can afford to wait (scripts, the outbox relay) pass `timeout` to
+        block that many seconds for room; the default is
+        TASK_ENQUEUE_TIMEOUT_SECONDS (0: never blocks).
 
-    def enqueue(self, task_name: str, payload: Dict[str, Any]):
-        self.queue.put((task_name, payload))
+        Returns a Future that resolves when the task has run, or fails with
+        TaskDeadLettered once it is dead-lettered (None when no handler is
+        registered).
+        """
+        lane = self._lanes.get(task_name)
+        if lane is None:
+            logger.warning(f"[TaskQueue] no handler registered for {task_name}")
+            return None
 
-    def _worker_loop(self):
+        priority = priority or payload.get("priority") or "normal"
+        task = _Task(task_name, payload, priority)
+        self._ensure_workers(lane)
+        with self._lock:
+            self._outstanding += 1
+        try:
+            self._put(lane, task, timeout=TASK_ENQUEUE_TIMEOUT_SECONDS if timeout is None else timeout)
+        except queue.Full:
+            self._done()
+            metrics.inc("task_rejected_total", labels={"task": task_name})
+            raise TaskQueueFull(f"{task_name} queue is full")
+        return task.future
+
+    def _put(self, lane: _Lane, task: _Task, timeout: Optional[float]):
+        rank = PRIORITIES.get(task.priority, PRIORITIES["normal"])
+        if not timeout:
+            lane.queue.put_nowait((rank, next(self._seq), task))
+        else:
+            lane.queue.put((rank, next(self._seq), task), timeout=timeout)
+        metrics.set_gauge("task_queue_depth", lane.queue.qsize(), labels={"task": lane.name})
+
+    # ------------------------------------------------------------------
+    # Workers
+    # ------------------------------------------------------------------
+    def _ensure_workers(self, lane: _Lane):
+        # started lazily so forked workers / cron scripts get their own threads
+        if lane.threads:
+            return
+        with self._lock:
+            if lane.threads:
+                return
+            for i in range(lane.workers):
+                t = threading.Thread(
+                    target=self._worker_loop, args=(lane,), name=f"task-{lane.name}-{i}", daemon=True
+                )
+                t.start()
+                lane.threads.append(t)
+
+    def _worker_loop(self, lane: _Lane):
         while True:
-            task_name, payload = self.queue.get()
-            handler = self.handlers.get(task_name)
-            if handler:
+            _, _, task = lane.queue.get()
+            if task is None:
+                return
+            metrics.set_gauge("task_queue_depth", lane.queue.qsize(), labels={"task": lane.name})
+            self._run(lane, task)
+
+    def _run(self, lane: _Lane, task: _Task):
+        labels = {"task": task.name}
+        metrics.observe(
+            "task_wait_ms",
+            (time.perf_counter() - task.enqueued_at) * 1000.0,
+            labels={"task": task.name, "priority": task.priority},
+        )
+        start = time.perf_counter()
+        try:
+            lane.handler(task.payload)
+        except Exception as exc:
+            metrics.inc("task_failures_total", labels=labels)
+            self._retry_or_dead_letter(lane, task, exc)
+        else:
+            task.future.set_result(None)
+            self._done()
+        finally:
+            metrics.observe("task_duration_ms", (time.perf_counter() - start) * 1000.0, labels=labels)
+
+    def _retry_or_dead_letter(self, lane: _Lane, task: _Task, exc: Exception):
+        if task.attempt < lane.max_retries and not self._closing:
+            task.attempt += 1
+            delay = TASK_RETRY_BACKOFF_SECONDS * (2 ** (task.attempt - 1))
+            metrics.inc("task_retries_total", labels={"task": task.name})
+            logger.warning(f"[TaskQueue] {task.name} failed (attempt {task.attempt}), retrying in {delay:.1f}s")
+            timer = threading.Timer(delay, self._requeue, args=(lane, task))
+            timer.daemon = True
+            timer.start()
+            return
+
+        logger.error(f"[TaskQueue] {task.name} failed after {task.attempt + 1} attempts", exc_info=exc)
+        self._dead_letter(task, repr(exc))
+
+    def _requeue(self, lane: _Lane, task: _Task):
+        task.enqueued_at = time.perf_counter()
+        try:
+            self._put(lane, task, timeout=None)
+        except queue.Full:
+            self._dead_letter(task, "queue full on retry")
+
+    def _dead_letter(self, task: _Task, error: str):
+        self.dead_letter(task.name, task.payload, error, priority=task.priority, attempts=task.attempt + 1)
+        task.future.set_exception(TaskDeadLettered(f"{task.name}: {error}"))
+        self._done()
+
+    def dead_letter(
+        self,
+        task_name: str,
+        payload: Dict[str, Any],
+        error: str,
+        *,
+        priority: Optional[str] = None,
+        attempts: int = 0,
+    ):
+        """
+        Record a task that will not run (also used for tasks that could not
+        be queued at all, e.g. TaskQueueFull after the transaction committed).
+        """
+        metrics.inc("task_dead_letter_total", labels={"task": task_name})
+        self.dead_letters.append({
+            "task": task_name,
+            "payload": payload,
+            "priority": priority or payload.get("priority") or "normal",
+            "attempts": attempts,
+            "error": error,
+            "failed_at": time.time(),
+        })
+
+    def _done(self):
+        with self._lock:
+            self._outstanding -= 1
+            if self._outstanding <= 0:
+                self._idle.notify_all()
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+    def drain(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every queued task (including pending retries) has finished
+        or been dead-lettered. Returns False on timeout.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._lock:
+            while self._outstanding > 0:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._idle.wait(remaining)
+        return True
+
+    def shutdown(self, timeout: float = 30.0):
+        """
+        Graceful stop: failures stop being retried, queued tasks are drained,
+        then the workers exit.
+        """
+        self._closing = True
+        if not self.drain(timeout):
+            logger.warning(f"[TaskQueue] shutdown with {self._outstanding} tasks still outstanding")
+        for lane in self._lanes.values():
+            for _ in lane.threads:
+                # sorts after every real task
                 try:
-                    handler(payload)
-                except Exception:
-                    print(f"[TASK ERROR] {task_name}", flush=True)
-            self.queue.task_done()
+                    lane.queue.put_nowait((len(PRIORITIES), next(self._seq), None))
+                except queue.Full:
+                    break
+            for t in lane.threads:
+                t.join(timeout=1.0)
+            lane.threads = []
+        self._closing = False
 
 
 task_queue = TaskQueue()
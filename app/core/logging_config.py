@@ -1,12 +1,60 @@
+import atexit
 import logging
+import os
+import queue
 import sys
+from logging.handlers import QueueHandler, QueueListener
+
+from app.monitoring.metrics import metrics
 
 LOG_LEVEL = logging.INFO
 
+# Bounded buffer between request threads and stdout; when it is full new
+# records are dropped (and counted) instead of blocking the request.
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+
+
+class DroppingQueueHandler(QueueHandler):
+    """
+    QueueHandler that never blocks: put_nowait + drop counter on overflow.
+    """
+
+    def __init__(self, q: queue.Queue):
+        super().__init__(q)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            metrics.inc("log_records_dropped_total", labels={"logger": record.name})
+
+
+log_queue: queue.Queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+queue_handler = DroppingQueueHandler(log_queue)
+
+# The only handler that touches stdout, running on the listener thread
+_stream_handler = logging.StreamHandler(sys.stdout)
+_stream_handler.setFormatter(logging.Formatter("%(message)s"))
+log_listener = QueueListener(log_queue, _stream_handler, respect_handler_level=True)
+
 logging.basicConfig(
     level=LOG_LEVEL,
     format="%(message)s",
-    handlers=[logging.StreamHandler(sys.stdout)],
+    handlers=[queue_handler],
 )
+log_listener.start()
+
+
+def stop_logging() -> None:
+    """
+    Drain the queue and stop the listener (shutdown / exit).
+    """
+    if log_listener._thread is not None:
+        log_listener.stop()
+
+
+atexit.register(stop_logging)
 
 logger = logging.getLogger("coreon.api")
@@ -0,0 +1,143 @@
+"""
+Password hashing off the request path.
+
+bcrypt is deliberately slow; on the shared anyio threadpool a login storm
+occupies every slot and stalls unrelated sync routes. Login verification
+therefore runs in a small dedicated executor (process pool by default, so
+it also escapes the GIL) and concurrent logins per worker are capped by an
+admission semaphore.
+
+This module stays import-light (no DB imports) so pool processes start fast.
+"""
+from __future__ import annotations
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional, Tuple
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+
+from passlib.context import CryptContext
+
+from app.monitoring.metrics import metrics
+
+
+# Raising BCRYPT_ROUNDS makes verify_and_update() return a new hash for
+# users on the old cost; the login route stores it (rehash on login).
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+
+PASSWORD_HASH_EXECUTOR = os.getenv("PASSWORD_HASH_EXECUTOR", "process")  # process | thread
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))
+# never "fork": by the time the pool starts, the API process runs logging /
+# event-bus / task-queue / scheduler threads (inherited locks can deadlock the
+# children) and holds the scheduler lease fd
+PASSWORD_HASH_START_METHOD = os.getenv("PASSWORD_HASH_START_METHOD", "forkserver")  # forkserver | spawn
+
+LOGIN_MAX_CONCURRENCY = int(os.getenv("LOGIN_MAX_CONCURRENCY", str(PASSWORD_HASH_WORKERS * 4)))
+LOGIN_ADMISSION_TIMEOUT_SECONDS = float(os.getenv("LOGIN_ADMISSION_TIMEOUT_SECONDS", "5"))
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+
+
+# --- Sync primitives (also the functions shipped to pool workers) ---
+def hash_password(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(plain_password, hashed_password)
+
+
+def verify_and_update(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    (valid, new_hash) - new_hash is set when the stored hash uses outdated
+    cost parameters and should be replaced.
+    """
+    try:
+        return pwd_context.verify_and_update(plain_password, hashed_password)
+    except ValueError:
+        # malformed / unknown hash format
+        return False, None
+
+
+# --- Dedicated executor ---
+_executor: Optional[Executor] = None
+_executor_lock = threading.Lock()
+
+
+def _configure_worker(config: str) -> None:
+    # pool processes import this module afresh (forkserver / spawn): adopt the
+    # parent's context, or verify_and_update would rehash to the env default
+    pwd_context.load(config)
+
+
+def get_hash_executor() -> Executor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                if PASSWORD_HASH_EXECUTOR == "thread":
+                    _executor = ThreadPoolExecutor(
+                        max_workers=PASSWORD_HASH_WORKERS,
+                        thread_name_prefix="pwd-hash",
+                    )
+                else:
+                    method = PASSWORD_HASH_START_METHOD
+                    if method not in multiprocessing.get_all_start_methods():
+                        method = "spawn"
+                    _executor = ProcessPoolExecutor(
+                        max_workers=PASSWORD_HASH_WORKERS,
+                        mp_context=multiprocessing.get_context(method),
+                        initializer=_configure_worker,
+                        initargs=(pwd_context.to_string(),),
+                    )
+    return _executor
+
+
+def shutdown_hash_executor() -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+# --- Admission control ---
+class LoginAdmissionError(Exception):
+    """Raised when a login waited too long for a verification slot."""
+
+
+_login_slots: Optional[asyncio.Semaphore] = None
+
+
+def _get_login_slots() -> asyncio.Semaphore:
+    global _login_slots
+    if _login_slots is None:
+        _login_slots = asyncio.Semaphore(LOGIN_MAX_CONCURRENCY)
+    return _login_slots
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Admission-controlled, off-event-loop verify_and_update().
+
+    Raises LoginAdmissionError when no slot frees up within
+    LOGIN_ADMISSION_TIMEOUT_SECONDS (caller should answer 503 + Retry-After).
+    """
+    slots = _get_login_slots()
+    try:
+        await asyncio.wait_for(slots.acquire(), timeout=LOGIN_ADMISSION_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        metrics.inc("login_admission_rejected_total")
+        raise LoginAdmissionError("Too many concurrent logins")
+
+    start = time.perf_counter()
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            get_hash_executor(), verify_and_update, plain_password, hashed_password
+        )
+    finally:
+        slots.release()
+        metrics.observe("password_verify_duration_ms", (time.perf_counter() - start) * 1000.0)
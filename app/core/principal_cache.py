@@ -0,0 +1,189 @@
+from __future__ import annotations
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional, Set, Tuple
+import os
+import threading
+import time
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
+
+from app.core.rbac.role_enums import Role
+from app.models import User, UserRole
+from app.monitoring.metrics import metrics
+
+
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", "10000"))
+PRINCIPAL_CACHE_TTL_SECONDS = float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "60"))
+
+
+def primary_role(user: User) -> Optional[str]:
+    """
+    The single role carried in the token / Principal: the user's highest
+    role in Role order (role names as in role_enums), else the first by name.
+    Needs user.roles and their Role rows loaded.
+    """
+    names = {user_role.role.name for user_role in user.roles if user_role.role is not None}
+    for role in Role:
+        if role.value in names:
+            return role.value
+    return min(names) if names else None
+
+
+@dataclass(frozen=True)
+class Principal:
+    """
+    Immutable snapshot of the authenticated user.
+
+    Only the fields routes actually read; never a live ORM object, so it is
+    safe to share across requests/threads.
+    """
+
+    id: int
+    school_id: Optional[int]
+    role: Optional[str]
+    is_active: bool
+    # may act on any school (X-School-ID other than school_id)
+    is_superuser: bool = False
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(
+            id=user.id,
+            school_id=getattr(user, "school_id", None),
+            role=primary_role(user),
+            is_active=bool(getattr(user, "is_active", True)),
+            is_superuser=bool(getattr(user, "is_superuser", False)),
+        )
+
+
+class PrincipalCache:
+    """
+    Bounded LRU + TTL cache of Principal keyed by (user_id, token).
+
+    - entries expire after ttl seconds
+    - least-recently-used entries are evicted past maxsize
+    - invalidate_user() drops every token cached for a user (deactivation, role change)
+    """
+
+    def __init__(self, maxsize: int = PRINCIPAL_CACHE_SIZE, ttl: float = PRINCIPAL_CACHE_TTL_SECONDS):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Tuple[int, str], Tuple[float, Principal]]" = OrderedDict()
+        self._by_user: Dict[int, Set[Tuple[int, str]]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int, token: str) -> Optional[Principal]:
+        key = (user_id, token)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                metrics.inc("principal_cache_hits_total")
+                return entry[1]
+            if entry is not None:
+                self._drop(key)
+        metrics.inc("principal_cache_misses_total")
+        return None
+
+    def put(self, token: str, principal: Principal) -> None:
+        if self.maxsize <= 0 or self.ttl <= 0:
+            return
+        key = (principal.id, token)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, principal)
+            self._entries.move_to_end(key)
+            self._by_user.setdefault(principal.id, set()).add(key)
+            while len(self._entries) > self.maxsize:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                metrics.inc("principal_cache_evictions_total")
+            size = len(self._entries)
+        metrics.set_gauge("principal_cache_size", size)
+
+    def invalidate_user(self, user_id: int) -> None:
+        with self._lock:
+            for key in list(self._by_user.get(user_id, ())):
+                self._drop(key)
+            size = len(self._entries)
+        metrics.inc("principal_cache_invalidations_total")
+        metrics.set_gauge("principal_cache_size", size)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_user.clear()
+        metrics.set_gauge("principal_cache_size", 0)
+
+    def _drop(self, key: Tuple[int, str]) -> None:
+        # caller holds the lock
+        self._entries.pop(key, None)
+        keys = self._by_user.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_user[key[0]]
+
+
+principal_cache = PrincipalCache()
+
+
+def invalidate_principal(user_id: int) -> None:
+    """
+    Call after deactivating a user or changing their role.
+    """
+    principal_cache.invalidate_user(user_id)
+
+
+# --- Safety net: any ORM change to cached fields invalidates the user ---
+# Evicted after the transaction commits: dropping at flush would let a
+# concurrent request re-cache the old row before the change is visible.
+_CACHED_FIELDS = ("is_active", "school_id", "is_superuser")
+_STALE_KEY = "principal_cache_stale"
+
+
+def _mark_stale(target, user_id: Optional[int]) -> None:
+    if user_id is None:
+        return
+    session = object_session(target)
+    if session is None:
+        invalidate_principal(user_id)
+        return
+    session.info.setdefault(_STALE_KEY, set()).add(user_id)
+
+
+@event.listens_for(User, "after_update")
+def _user_updated(mapper, connection, target):
+    state = inspect(target)
+    for field in _CACHED_FIELDS:
+        attr = state.attrs.get(field)
+        if attr is not None and attr.history.has_changes():
+            _mark_stale(target, target.id)
+            return
+
+
+@event.listens_for(User, "after_delete")
+def _user_deleted(mapper, connection, target):
+    _mark_stale(target, target.id)
+
+
+# role changes (Principal.role comes from user.roles)
+@event.listens_for(UserRole, "after_insert")
+@event.listens_for(UserRole, "after_update")
+@event.listens_for(UserRole, "after_delete")
+def _user_role_changed(mapper, connection, target):
+    _mark_stale(target, target.user_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _evict_after_commit(session):
+    for user_id in session.info.pop(_STALE_KEY, ()):
+        invalidate_principal(user_id)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_after_rollback(session, previous_transaction):
+    if previous_transaction.parent is None:
+        session.info.pop(_STALE_KEY, None)
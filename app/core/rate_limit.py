@@ -0,0 +1,292 @@
+"""
+Per-tenant / per-principal rate limiting and fair-share admission.
+
+- RateLimiter: token buckets keyed by (scope, key, route class) where scope is
+  "tenant" (X-School-ID, only charged for a token of that school or a
+  superuser) or "principal" (JWT subject, client IP when anonymous; behind
+  RATE_LIMIT_TRUSTED_PROXIES the IP comes from X-Forwarded-For) and route
+  class is read / write / report. Budgets are "rate/burst" env values, e.g.
+  RATE_LIMIT_TENANT_REPORT="5/10"; a rate of 0 disables that budget.
+- FairAdmission: caps requests in flight per worker; under overload waiters
+  are admitted in weighted fair order across tenants (start-time fair
+  queuing), so one busy school queues behind its own requests instead of
+  everyone else's.
+
+Buckets live in a backend with take(key, rate, burst, cost) -> wait seconds.
+LocalRateLimitBackend keeps them in process (limits are per worker); a shared
+store (e.g. Redis) can be plugged in with rate_limiter.backend = ...
+"""
+from __future__ import annotations
+from collections import OrderedDict, deque
+from typing import Deque, Dict, Optional, Tuple
+import asyncio
+import ipaddress
+import os
+import threading
+import time
+
+from app.monitoring.metrics import metrics
+
+
+def _budget(name: str, default: str) -> Tuple[float, float]:
+    rate, _, burst = os.getenv(name, default).partition("/")
+    return float(rate), float(burst or rate)
+
+
+def _parse_weights(raw: str) -> Dict[str, float]:
+    # "12=2,15=0.5" -> {"12": 2.0, "15": 0.5}
+    weights = {}
+    for item in raw.split(","):
+        key, _, value = item.partition("=")
+        if key.strip() and value.strip():
+            weights[key.strip()] = float(value)
+    return weights
+
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+# (tokens per second, burst) per route class
+RATE_LIMIT_BUDGETS = {
+    "tenant": {
+        "read": _budget("RATE_LIMIT_TENANT_READ", "200/400"),
+        "write": _budget("RATE_LIMIT_TENANT_WRITE", "50/100"),
+        "report": _budget("RATE_LIMIT_TENANT_REPORT", "5/10"),
+    },
+    "principal": {
+        "read": _budget("RATE_LIMIT_PRINCIPAL_READ", "20/40"),
+        "write": _budget("RATE_LIMIT_PRINCIPAL_WRITE", "10/20"),
+        "report": _budget("RATE_LIMIT_PRINCIPAL_REPORT", "1/3"),
+    },
+}
+# path prefixes served as "report" (heavy reads)
+RATE_LIMIT_REPORT_PREFIXES = tuple(
+    p.strip() for p in os.getenv("RATE_LIMIT_REPORT_PREFIXES", "/analytics,/audit-intel").split(",") if p.strip()
+)
+# never limited: health checks, metrics scrapes, long-lived streams
+RATE_LIMIT_EXEMPT_PREFIXES = tuple(
+    p.strip() for p in os.getenv(
+        "RATE_LIMIT_EXEMPT_PREFIXES", "/api/v1/health/,/metrics,/notifications/stream"
+    ).split(",") if p.strip()
+)
+
+# reverse proxies / load balancers (IPs or CIDRs) whose X-Forwarded-For is believed
+RATE_LIMIT_TRUSTED_PROXIES = tuple(
+    ipaddress.ip_network(p.strip(), strict=False)
+    for p in os.getenv("RATE_LIMIT_TRUSTED_PROXIES", "").split(",") if p.strip()
+)
+
+# Fair admission (per worker)
+ADMISSION_ENABLED = os.getenv("ADMISSION_ENABLED", "false").lower() == "true"
+ADMISSION_MAX_INFLIGHT = int(os.getenv("ADMISSION_MAX_INFLIGHT", "64"))
+ADMISSION_MAX_QUEUED_PER_TENANT = int(os.getenv("ADMISSION_MAX_QUEUED_PER_TENANT", "50"))
+ADMISSION_QUEUE_TIMEOUT_SECONDS = float(os.getenv("ADMISSION_QUEUE_TIMEOUT_SECONDS", "5"))
+TENANT_WEIGHTS = _parse_weights(os.getenv("TENANT_WEIGHTS", ""))
+
+_READ_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+def route_class(method: str, path: str) -> str:
+    if path.startswith(RATE_LIMIT_REPORT_PREFIXES):
+        return "report"
+    return "read" if method in _READ_METHODS else "write"
+
+
+def is_exempt(path: str) -> bool:
+    return path.startswith(RATE_LIMIT_EXEMPT_PREFIXES)
+
+
+def _is_trusted_proxy(address: str) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in RATE_LIMIT_TRUSTED_PROXIES)
+
+
+def client_ip(peer: Optional[str], forwarded_for: Optional[str]) -> Optional[str]:
+    """
+    The client address: the peer, unless it is a trusted proxy, in which case
+    the right-most X-Forwarded-For entry not added by a trusted proxy (left
+    of that, entries are whatever the client sent).
+    """
+    if peer is None or not forwarded_for or not _is_trusted_proxy(peer):
+        return peer
+    for address in reversed([a.strip() for a in forwarded_for.split(",") if a.strip()]):
+        if not _is_trusted_proxy(address):
+            return address
+    return peer
+
+
+# ---------------------------------------------------------------------------
+# Token buckets
+# ---------------------------------------------------------------------------
+class LocalRateLimitBackend:
+    """
+    In-process token buckets (bounded LRU; an evicted bucket is simply full
+    again).
+    """
+
+    def __init__(self, max_keys: int = RATE_LIMIT_MAX_KEYS):
+        self.max_keys = max_keys
+        # key -> (tokens, updated_at)
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key: str, rate: float, burst: float, cost: float = 1.0) -> float:
+        """
+        Take `cost` tokens. Returns 0 when allowed, otherwise the seconds
+        until they would be available (nothing is taken).
+        """
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (burst, now))
+            tokens = min(burst, tokens + (now - updated_at) * rate)
+            if tokens >= cost:
+                self._buckets[key] = (tokens - cost, now)
+                wait = 0.0
+            else:
+                self._buckets[key] = (tokens, now)
+                wait = (cost - tokens) / rate
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return wait
+
+
+class RateLimiter:
+    def __init__(self, backend=None, budgets=RATE_LIMIT_BUDGETS):
+        self.backend = backend or LocalRateLimitBackend()
+        self.budgets = budgets
+
+    def check(self, tenant_id: Optional[int], principal: Optional[str], klass: str) -> float:
+        """
+        Returns 0 when the request may proceed, else the Retry-After seconds.
+        The principal is checked first so one user cannot drain the whole
+        school's budget.
+        """
+        for scope, key in (("principal", principal), ("tenant", tenant_id)):
+            if key is None:
+                continue
+            rate, burst = self.budgets[scope][klass]
+            if rate <= 0:
+                continue
+            wait = self.backend.take(f"{scope}:{key}:{klass}", rate, burst)
+            if wait > 0:
+                metrics.inc("rate_limited_total", labels={"scope": scope, "route_class": klass})
+                return wait
+        return 0.0
+
+
+rate_limiter = RateLimiter()
+
+
+# ---------------------------------------------------------------------------
+# Fair admission
+# ---------------------------------------------------------------------------
+class AdmissionRejected(Exception):
+    """
+    status_code: 429 when the tenant's own queue is full, 503 on timeout.
+    """
+
+    def __init__(self, reason: str, retry_after: float, status_code: int):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+        self.status_code = status_code
+
+
+class FairAdmission:
+    """
+    At most `capacity` requests in flight. When full, requests wait in a
+    per-tenant FIFO; a freed slot goes to the tenant with the smallest
+    virtual start tag, so admitted throughput is shared in proportion to
+    TENANT_WEIGHTS (default 1) whatever each tenant's queue length.
+
+    Event-loop only (one instance per worker process).
+    """
+
+    def __init__(
+        self,
+        capacity: int = ADMISSION_MAX_INFLIGHT,
+        *,
+        max_queued: int = ADMISSION_MAX_QUEUED_PER_TENANT,
+        timeout: float = ADMISSION_QUEUE_TIMEOUT_SECONDS,
+        weights: Optional[Dict[str, float]] = None,
+    ):
+        self.capacity = capacity
+        self.max_queued = max_queued
+        self.timeout = timeout
+        self.weights = TENANT_WEIGHTS if weights is None else weights
+        self.inflight = 0
+        self._queues: Dict[str, Deque[asyncio.Future]] = {}
+        self._finish: Dict[str, float] = {}
+        self._vclock = 0.0
+        self._queued = 0
+
+    async def acquire(self, tenant: str) -> None:
+        if self.inflight < self.capacity and not self._queues:
+            self.inflight += 1
+            return
+
+        queue = self._queues.get(tenant)
+        if queue is not None and len(queue) >= self.max_queued:
+            metrics.inc("admission_rejected_total", labels={"reason": "queue_full"})
+            raise AdmissionRejected("Too many queued requests for this school", self.timeout, 429)
+
+        future = asyncio.get_running_loop().create_future()
+        self._queues.setdefault(tenant, deque()).append(future)
+        self._set_depth(+1)
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(asyncio.shield(future), self.timeout)
+        except BaseException as exc:
+            if future.done() and not future.cancelled():
+                # granted just as we gave up: hand the slot on
+                self.release()
+            else:
+                future.cancel()
+                self._discard(tenant, future)
+            if isinstance(exc, asyncio.TimeoutError):
+                metrics.inc("admission_rejected_total", labels={"reason": "timeout"})
+                raise AdmissionRejected("Server busy, retry shortly", self.timeout, 503)
+            raise
+        finally:
+            metrics.observe("admission_wait_ms", (time.perf_counter() - start) * 1000.0)
+
+    def release(self) -> None:
+        while self._queues:
+            tenant = min(self._queues, key=lambda t: max(self._finish.get(t, 0.0), self._vclock))
+            queue = self._queues[tenant]
+            future = queue.popleft()
+            if not queue:
+                del self._queues[tenant]
+            self._set_depth(-1)
+            if future.done():
+                continue
+            start_tag = max(self._finish.get(tenant, 0.0), self._vclock)
+            self._vclock = start_tag
+            self._finish[tenant] = start_tag + 1.0 / self.weights.get(tenant, 1.0)
+            # the slot passes straight to the waiter; inflight is unchanged
+            future.set_result(None)
+            return
+        self.inflight -= 1
+        if not self.inflight:
+            # idle: forget tags so old history cannot favour anyone
+            self._finish.clear()
+            self._vclock = 0.0
+
+    def _discard(self, tenant: str, future: asyncio.Future) -> None:
+        queue = self._queues.get(tenant)
+        if queue is None or future not in queue:
+            return
+        queue.remove(future)
+        if not queue:
+            del self._queues[tenant]
+        self._set_depth(-1)
+
+    def _set_depth(self, delta: int) -> None:
+        self._queued += delta
+        metrics.set_gauge("admission_queue_depth", self._queued)
+
+
+admission = FairAdmission()
@@ -1,5 +1,5 @@
 from fastapi import HTTPException, status, Depends
-from app.core.security import get_current_user
+from app.core.security import get_current_user, get_current_user_async
 from app.core.rbac.role_enums import Role
 
 def require_roles(*allowed_roles: Role):
@@ -11,3 +11,13 @@ def require_roles(*allowed_roles: Role):
             )
         return user
     return wrapper
+
+def require_roles_async(*allowed_roles: Role):
+    async def wrapper(user=Depends(get_current_user_async)):
+        if user.role not in allowed_roles:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Access Denied",
+            )
+        return user
+    return wrapper
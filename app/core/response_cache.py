@@ -0,0 +1,440 @@
+"""
+Response cache + conditional GET for slow-changing reference data.
+
+    @router.get("/routes")
+    @cached_response("TransportRoute")
+    def list_routes(db=Depends(get_db), user=Depends(require_roles(...))):
+        ...
+
+Entries are keyed by path + query string and the caller's scope ("tenant":
+user.school_id, or "user": user.id; the endpoint's `user` argument). Each
+carries a strong ETag (hash of the JSON body):
+
+- If-None-Match matching the current ETag -> 304, endpoint not called
+- otherwise the cached body is served while still current
+
+Auth dependencies still run first (principal cache; no DB on a hit), and
+Session/AsyncSession dependencies do not connect until used, so a hit does
+no database work.
+
+Invalidation: every commit bumps a version for each model class name and
+table name it wrote (ORM flushes and session.execute() DML). An entry is
+current while the versions of the names it depends on are unchanged.
+
+Bumps are shared between worker processes (and scripts) over LISTEN/NOTIFY
+on the primary database (RESPONSE_CACHE_INVALIDATION=postgres, the default
+on PostgreSQL), so a write on one worker invalidates every worker within
+milliseconds. If the LISTEN connection drops, the cache is cleared when it
+reconnects; RESPONSE_CACHE_TTL_SECONDS bounds staleness in between (and is
+the only bound with RESPONSE_CACHE_INVALIDATION=local).
+"""
+from __future__ import annotations
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+import functools
+import hashlib
+import inspect
+import json
+import logging
+import os
+import queue
+import select
+import threading
+import time
+import uuid
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import event, text
+from sqlalchemy.orm import ORMExecuteState, Session
+from starlette.concurrency import run_in_threadpool
+
+from app.db.session import Base
+from app.monitoring.metrics import metrics
+
+try:
+    import orjson
+
+    def _dumps(obj) -> bytes:
+        return orjson.dumps(obj)
+except ImportError:  # optional speedup
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode()
+
+logger = logging.getLogger("coreon.api")
+
+
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() == "true"
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "5000"))
+RESPONSE_CACHE_TTL_SECONDS = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "60"))
+# auto (postgres when the primary is PostgreSQL) | postgres | local (this process only)
+RESPONSE_CACHE_INVALIDATION = os.getenv("RESPONSE_CACHE_INVALIDATION", "auto")
+RESPONSE_CACHE_CHANNEL = os.getenv("RESPONSE_CACHE_CHANNEL", "coreon_data_versions")
+
+# pg_notify payloads must stay under 8000 bytes
+_NOTIFY_PAYLOAD_BYTES = 7500
+
+
+# ---------------------------------------------------------------------------
+# Write tracking
+# ---------------------------------------------------------------------------
+class _Versions:
+    def __init__(self):
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, names: Tuple[str, ...]) -> Tuple[int, ...]:
+        versions = self._versions
+        return tuple(versions.get(name, 0) for name in names)
+
+    def bump(self, names) -> None:
+        with self._lock:
+            for name in names:
+                self._versions[name] = self._versions.get(name, 0) + 1
+
+
+data_versions = _Versions()
+
+
+class _VersionSync:
+    """
+    Cross-process version bumps over LISTEN/NOTIFY on the primary database.
+
+    publish() runs in after_commit (on the event loop for AsyncSession
+    commits) and only queues; a sender thread issues pg_notify. The listener
+    thread is started by the first cached endpoint call, so processes that
+    only write (scripts, the relay) just publish.
+    """
+
+    def __init__(self, channel: str = RESPONSE_CACHE_CHANNEL):
+        self.channel = channel
+        # notifications from this process were already applied locally
+        self.origin = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._engine = None
+        self._enabled: Optional[bool] = None
+        self._outgoing: "queue.Queue[Optional[set]]" = queue.Queue(maxsize=10000)
+        self._sender: Optional[threading.Thread] = None
+        self._listener: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def enabled(self) -> bool:
+        if self._enabled is None:
+            if RESPONSE_CACHE_INVALIDATION == "local":
+                self._enabled = False
+            else:
+                from app.db.session import engine
+                self._engine = engine
+                self._enabled = RESPONSE_CACHE_INVALIDATION == "postgres" or engine.dialect.name == "postgresql"
+        return self._enabled
+
+    # -- publish side (any thread) --
+    def publish(self, names) -> None:
+        if not self.enabled():
+            return
+        self._ensure_thread("_sender", self._send_loop, "response-cache-notify")
+        try:
+            self._outgoing.put_nowait(set(names))
+        except queue.Full:
+            metrics.inc("response_cache_sync_dropped_total")
+
+    def _payloads(self, names: set):
+        chunk: List[str] = []
+        for name in sorted(names):
+            chunk.append(name)
+            if len(json.dumps({"o": self.origin, "n": chunk})) > _NOTIFY_PAYLOAD_BYTES:
+                chunk.pop()
+                yield json.dumps({"o": self.origin, "n": chunk})
+                chunk = [name]
+        if chunk:
+            yield json.dumps({"o": self.origin, "n": chunk})
+
+    def _send_loop(self) -> None:
+        while True:
+            names = self._outgoing.get()
+            if names is None:
+                return
+            stopping = False
+            # one round trip for whatever piled up meanwhile
+            while True:
+                try:
+                    more = self._outgoing.get_nowait()
+                except queue.Empty:
+                    break
+                if more is None:
+                    stopping = True
+                    break
+                names |= more
+            try:
+                with self._engine.connect() as conn:
+                    for payload in self._payloads(names):
+                        conn.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": self.channel, "payload": payload})
+                    conn.commit()
+            except Exception:
+                # other workers fall back to the TTL
+                metrics.inc("response_cache_sync_errors_total")
+                logger.error("[ResponseCache] pg_notify failed", exc_info=True)
+            if stopping:
+                return
+
+    # -- listen side --
+    def ensure_listening(self) -> None:
+        if self._listener is None and self.enabled():
+            self._ensure_thread("_listener", self._listen_loop, "response-cache-listen")
+
+    def _listen_loop(self) -> None:
+        backoff = 1.0
+        connected_before = False
+        while not self._stop.is_set():
+            raw = None
+            try:
+                raw = self._engine.raw_connection()
+                raw.detach()  # long-lived: not part of the request pool
+                conn = raw.driver_connection
+                conn.autocommit = True
+                with conn.cursor() as cur:
+                    cur.execute(f'LISTEN "{self.channel}"')
+                if connected_before:
+                    # bumps sent while we were not listening are lost
+                    response_cache.clear()
+                connected_before = True
+                backoff = 1.0
+                while not self._stop.is_set():
+                    if select.select([conn], [], [], 5.0) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        message = json.loads(conn.notifies.pop(0).payload)
+                        if message.get("o") != self.origin:
+                            data_versions.bump(message.get("n") or ())
+            except Exception:
+                metrics.inc("response_cache_sync_errors_total")
+                logger.error("[ResponseCache] LISTEN connection lost, reconnecting", exc_info=True)
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, 30.0)
+            finally:
+                if raw is not None:
+                    try:
+                        raw.close()
+                    except Exception:
+                        pass
+
+    def _ensure_thread(self, attr: str, target, name: str) -> None:
+        # started lazily so forked workers get their own threads
+        if getattr(self, attr) is not None:
+            return
+        with self._lock:
+            if getattr(self, attr) is None:
+                thread = threading.Thread(target=target, name=name, daemon=True)
+                thread.start()
+                setattr(self, attr, thread)
+
+    def close(self) -> None:
+        """
+        Flush pending bumps and stop listening (shutdown).
+        """
+        self._stop.set()
+        if self._sender is not None:
+            try:
+                self._outgoing.put(None, timeout=1.0)
+            except queue.Full:
+                pass
+            self._sender.join(timeout=5.0)
+
+
+version_sync = _VersionSync()
+
+_WRITTEN_KEY = "response_cache_written"
+
+
+def _written(session: Session) -> set:
+    return session.info.setdefault(_WRITTEN_KEY, set())
+
+
+@event.listens_for(Session, "after_flush")
+def _track_flush(session: Session, flush_context):
+    written = _written(session)
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        written.add(type(obj).__name__)
+        table = getattr(obj, "__table__", None)
+        if table is not None:
+            written.add(table.name)
+
+
+_classes_by_table: Dict[str, Tuple[str, ...]] = {}
+
+
+def _class_names(table_name: str) -> Tuple[str, ...]:
+    # insert(Model.__table__) / update(table) also invalidate by model name
+    names = _classes_by_table.get(table_name)
+    if names is None:
+        names = tuple(
+            mapper.class_.__name__
+            for mapper in Base.registry.mappers
+            if getattr(mapper.local_table, "name", None) == table_name
+        )
+        if names:
+            _classes_by_table[table_name] = names
+    return names
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_dml(state: ORMExecuteState):
+    if not (state.is_insert or state.is_update or state.is_delete):
+        return
+    written = _written(state.session)
+    table = getattr(state.statement, "table", None)
+    if table is not None and getattr(table, "name", None):
+        written.add(table.name)
+        written.update(_class_names(table.name))
+    if state.bind_mapper is not None:
+        written.add(state.bind_mapper.class_.__name__)
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_after_commit(session: Session):
+    written = session.info.pop(_WRITTEN_KEY, None)
+    if written:
+        data_versions.bump(written)
+        version_sync.publish(written)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_after_rollback(session: Session, previous_transaction):
+    if previous_transaction.parent is None:
+        session.info.pop(_WRITTEN_KEY, None)
+
+
+# ---------------------------------------------------------------------------
+# Cache
+# ---------------------------------------------------------------------------
+class _Entry:
+    __slots__ = ("versions", "expires_at", "body", "etag")
+
+    def __init__(self, versions: Tuple[int, ...], expires_at: float, body: bytes, etag: str):
+        self.versions = versions
+        self.expires_at = expires_at
+        self.body = body
+        self.etag = etag
+
+
+class ResponseCache:
+    def __init__(self, maxsize: int = RESPONSE_CACHE_MAX_ENTRIES, ttl: float = RESPONSE_CACHE_TTL_SECONDS):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, versions: Tuple[int, ...]) -> Optional[_Entry]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.versions != versions or entry.expires_at <= now:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: Hashable, versions: Tuple[int, ...], body: bytes) -> _Entry:
+        entry = _Entry(
+            versions,
+            time.monotonic() + self.ttl,
+            body,
+            '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"',
+        )
+        if self.maxsize <= 0 or self.ttl <= 0:
+            return entry
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+            size = len(self._entries)
+        metrics.set_gauge("response_cache_size", size)
+        return entry
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+        metrics.set_gauge("response_cache_size", 0)
+
+
+response_cache = ResponseCache()
+
+
+def _not_modified(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    return header.strip() == "*" or etag in (tag.strip() for tag in header.split(","))
+
+
+def _respond(request: Request, entry: _Entry) -> Response:
+    headers = {
+        "ETag": entry.etag,
+        # clients keep the body but revalidate every time (cheap 304s)
+        "Cache-Control": "private, no-cache",
+        "Vary": "Authorization, X-School-ID",
+    }
+    if _not_modified(request, entry.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
+
+def _scope_key(user: Any, scope: str):
+    if scope == "user":
+        return ("user", getattr(user, "id", None))
+    return ("tenant", getattr(user, "school_id", None))
+
+
+def cached_response(*depends_on: str, scope: str = "tenant"):
+    """
+    Cache a GET endpoint's JSON response until one of `depends_on` (model
+    class or table names) is written. The endpoint must take the caller as a
+    `user` argument; its return value is encoded like FastAPI would.
+    """
+    names = tuple(depends_on)
+
+    def decorator(endpoint):
+        signature = inspect.signature(endpoint)
+        needs_request = "request" not in signature.parameters
+        is_async = inspect.iscoroutinefunction(endpoint)
+
+        @functools.wraps(endpoint)
+        async def wrapper(**kwargs):
+            request: Request = kwargs.pop("request") if needs_request else kwargs["request"]
+
+            async def call():
+                if is_async:
+                    return await endpoint(**kwargs)
+                return await run_in_threadpool(endpoint, **kwargs)
+
+            if not RESPONSE_CACHE_ENABLED:
+                return await call()
+
+            version_sync.ensure_listening()
+            route = endpoint.__module__ + "." + endpoint.__qualname__
+            key = (route, request.url.path, request.url.query, _scope_key(kwargs.get("user"), scope))
+            versions = data_versions.get(names)
+            entry = response_cache.get(key, versions)
+            if entry is not None:
+                metrics.inc("response_cache_hits_total", labels={"route": route})
+                return _respond(request, entry)
+
+            metrics.inc("response_cache_misses_total", labels={"route": route})
+            result = await call()
+            if isinstance(result, Response):
+                return result
+            # versions read before the call: a write committed meanwhile makes this entry stale at once
+            entry = response_cache.put(key, versions, _dumps(jsonable_encoder(result)))
+            return _respond(request, entry)
+
+        if needs_request:
+            params = list(signature.parameters.values())
+            params.append(inspect.Parameter("request", inspect.Parameter.KEYWORD_ONLY, annotation=Request))
+            wrapper.__signature__ = signature.replace(parameters=params)
+        return wrapper
+
+    return decorator
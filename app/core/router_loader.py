@@ -1,22 +1,111 @@
 import importlib
-import pkgutil
+import logging
+import os
+import threading
+import time
+from typing import List, Optional, Tuple
+
 from fastapi import FastAPI
+from starlette.routing import Mount
+from starlette.types import Receive, Scope, Send
+
+from app.monitoring.metrics import metrics
+
+logger = logging.getLogger("coreon.api")
+
+# Domains (app.api.v1.<domain>) to import on first request instead of at startup.
+# Only routers with a static prefix can be deferred.
+LAZY_ROUTER_DOMAINS = {
+    d.strip() for d in os.getenv("LAZY_ROUTER_DOMAINS", "").split(",") if d.strip()
+}
+
+
+def _manifest() -> List[Tuple[str, Optional[str]]]:
+    from app.core.router_manifest import ROUTER_MANIFEST
+    return ROUTER_MANIFEST
+
+
+def _domain(module_name: str) -> str:
+    # app.api.v1.<domain>.router
+    return module_name.split(".")[3]
+
+
+def _import_router(app: FastAPI, module_name: str) -> bool:
+    start = time.perf_counter()
+    try:
+        module = importlib.import_module(module_name)
+        app.include_router(module.router)
+    except Exception:
+        metrics.inc("router_import_failures_total", labels={"module": module_name})
+        logger.error(f"[Router Loader] Failed to load {module_name}", exc_info=True)
+        return False
+    finally:
+        elapsed_ms = (time.perf_counter() - start) * 1000.0
+        metrics.set_gauge("router_import_ms", elapsed_ms, labels={"module": module_name})
+        logger.info(f"[Router Loader] {module_name} imported in {elapsed_ms:.1f}ms")
+    return True
+
+
+class _LazyRouter:
+    """
+    Placeholder mounted at a router's prefix. The first request under that
+    prefix imports the module, swaps the real routes in, and re-dispatches.
+    """
+
+    def __init__(self, app: FastAPI, module_name: str, prefix: str):
+        self.app = app
+        self.module_name = module_name
+        self.prefix = prefix
+        self.mount: Optional[Mount] = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        with self._lock:
+            if self.mount not in self.app.router.routes:
+                return
+            _import_router(self.app, self.module_name)
+            self.app.router.routes.remove(self.mount)
+            self.app.openapi_schema = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        self._load()
+        # undo the Mount's scope rewrite, then route again against the real routes
+        root_path = scope.get("root_path", "")
+        if root_path.endswith(self.prefix):
+            scope["root_path"] = root_path[: -len(self.prefix)]
+        scope["path_params"] = {}
+        await self.app.router(scope, receive, send)
 
 
 def load_all_routers(app: FastAPI):
     """
-    Auto-load every router under app.api.v1.* dynamically.
-    No manual import list needed in api/v1/__init__.py.
+    Load every router listed in app.core.router_manifest (generated by
+    app.scripts.build_router_manifest; no package walking at startup).
+
+    Per-module import time is logged and exported as router_import_ms;
+    domains in LAZY_ROUTER_DOMAINS are deferred to their first request.
     """
-    package_name = "app.api.v1"
-    pkg = importlib.import_module(package_name)
-
-    for _, module_name, is_pkg in pkgutil.walk_packages(
-        pkg.__path__, pkg.__name__ + "."
-    ):
-        try:
-            module = importlib.import_module(module_name)
-            if hasattr(module, "router"):
-                app.include_router(module.router)
-        except Exception as e:
-            print(f"[Router Loader] Failed to load {module_name}: {e}")
+    start = time.perf_counter()
+    loaded = deferred = failed = 0
+
+    for module_name, prefix in _manifest():
+        if _domain(module_name) in LAZY_ROUTER_DOMAINS:
+            if prefix:
+                lazy = _LazyRouter(app, module_name, prefix)
+                lazy.mount = Mount(prefix, app=lazy)
+                app.router.routes.append(lazy.mount)
+                deferred += 1
+                continue
+            logger.warning(f"[Router Loader] {module_name} has no static prefix; loading eagerly")
+
+        if _import_router(app, module_name):
+            loaded += 1
+        else:
+            failed += 1
+
+    total_ms = (time.perf_counter() - start) * 1000.0
+    metrics.set_gauge("router_startup_ms", total_ms)
+    logger.info(
+        f"[Router Loader] {loaded} routers loaded, {deferred} deferred, "
+        f"{failed} failed in {total_ms:.1f}ms"
+    )
@@ -0,0 +1,62 @@
+"""
+GENERATED by `python -m app.scripts.build_router_manifest` - do not edit.
+
+(module, static prefix) for every router under app.api.v1.
+Re-run the generator after adding or removing a domain router.
+"""
+
+ROUTER_MANIFEST = [
+    ('app.api.v1.academic.router', None),
+    ('app.api.v1.academics.router', '/academics'),
+    ('app.api.v1.activities.router', '/activities'),
+    ('app.api.v1.analytics.router', '/analytics'),
+    ('app.api.v1.attendance.router', '/attendance'),
+    ('app.api.v1.audit.router', None),
+    ('app.api.v1.audit_intel.router', '/audit-intel'),
+    ('app.api.v1.auth.router', None),
+    ('app.api.v1.behavior.router', '/behavior'),
+    ('app.api.v1.behavior_advanced.router', '/behavior-advanced'),
+    ('app.api.v1.canteen.router', '/canteen'),
+    ('app.api.v1.classrooms.router', None),
+    ('app.api.v1.communication.router', '/communication'),
+    ('app.api.v1.complaints.router', '/complaints'),
+    ('app.api.v1.counseling.router', '/counseling'),
+    ('app.api.v1.curriculum.router', '/curriculum'),
+    ('app.api.v1.depreciation.router', '/depreciation'),
+    ('app.api.v1.events.router', '/events'),
+    ('app.api.v1.exams.router', '/exams'),
+    ('app.api.v1.facilities.router', '/facilities'),
+    ('app.api.v1.finance.router', '/finance'),
+    ('app.api.v1.finance_billing.router', '/finance/billing'),
+    ('app.api.v1.finance_budget.router', '/finance/budgets'),
+    ('app.api.v1.grades.router', None),
+    ('app.api.v1.health.router', '/health'),
+    ('app.api.v1.homework.router', '/homework'),
+    ('app.api.v1.hr.router', '/hr'),
+    ('app.api.v1.hr_lifecycle.router', '/hr/lifecycle'),
+    ('app.api.v1.hr_payroll.router', '/hr-payroll'),
+    ('app.api.v1.inventory.router', '/inventory'),
+    ('app.api.v1.library.router', '/library'),
+    ('app.api.v1.metrics.router', '/metrics'),
+    ('app.api.v1.notifications.router', '/notifications'),
+    ('app.api.v1.nursery.router', '/nursery'),
+    ('app.api.v1.nursery_advanced.router', '/nursery-advanced'),
+    ('app.api.v1.org.router', None),
+    ('app.api.v1.parent_student.router', '/parent-student'),
+    ('app.api.v1.parents.router', None),
+    ('app.api.v1.payroll.router', '/payroll'),
+    ('app.api.v1.people.router', None),
+    ('app.api.v1.procurement.router', '/procurement'),
+    ('app.api.v1.procurement_advanced.router', '/procurement-advanced'),
+    ('app.api.v1.requests.router', None),
+    ('app.api.v1.schools.router', None),
+    ('app.api.v1.security.router', '/security'),
+    ('app.api.v1.sessions.router', None),
+    ('app.api.v1.students.router', None),
+    ('app.api.v1.students.router_single', None),
+    ('app.api.v1.subjects.router', None),
+    ('app.api.v1.teachers.router', None),
+    ('app.api.v1.timetable.router', '/timetable'),
+    ('app.api.v1.transport.router', '/transport'),
+    ('app.api.v1.workflow.router', '/workflow'),
+]
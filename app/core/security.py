@@ -5,36 +5,41 @@ import os
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
-from passlib.context import CryptContext
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
 
-from app.db.session import get_db
+from app.db.session import get_db, get_async_db
 from app import models
+from app.core.principal_cache import Principal, principal_cache
+from app.core.tenancy.tenant_context import get_tenant
+from app.core.passwords import pwd_context, hash_password, verify_password  # noqa: F401
 
 # --- JWT / Crypto config ---
 SECRET_KEY = os.getenv("SECRET_KEY", "coreon_secret")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_HOURS = int(os.getenv("JWT_TTL_HOURS", "8"))
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 # This tells FastAPI how to read "Authorization: Bearer <token>"
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
 
-# --- Password helpers ---
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
-
-
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
-
-
 # --- JWT helpers ---
-def create_access_token(sub: str, role: str, expires_hours: Optional[int] = None) -> str:
+def create_access_token(
+    sub: str,
+    role: str,
+    expires_hours: Optional[int] = None,
+    *,
+    school_id: Optional[int] = None,
+    is_superuser: bool = False,
+) -> str:
     expire = datetime.now(timezone.utc) + timedelta(hours=expires_hours or ACCESS_TOKEN_EXPIRE_HOURS)
     payload = {"sub": sub, "role": role, "exp": expire}
+    # read by the rate limiter before authentication (which school to charge)
+    if school_id is not None:
+        payload["school_id"] = school_id
+    if is_superuser:
+        payload["su"] = True
     return jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
 
 
@@ -50,10 +55,7 @@ def decode_access_token(token: str) -> dict:
 
 
 # --- Current user + RBAC ---
-def get_current_user(
-    db: Session = Depends(get_db),
-    token: str = Depends(oauth2_scheme),
-) -> models.User:
+def _user_id_from_token(token: str) -> int:
     payload = decode_access_token(token)
     sub = payload.get("sub")
 
@@ -65,7 +67,7 @@ def get_current_user(
         )
 
     try:
-        user_id = int(sub)
+        return int(sub)
     except (TypeError, ValueError):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -73,7 +75,18 @@ def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    user = db.query(models.User).filter(models.User.id == user_id).first()
+
+def _principal_query(user_id: int):
+    # unscoped: a mismatching X-School-ID is reported as 403 below, not as 401
+    return (
+        select(models.User)
+        .where(models.User.id == user_id)
+        .options(selectinload(models.User.roles).selectinload(models.UserRole.role))
+        .execution_options(all_tenants=True)
+    )
+
+
+def _principal_from(user, token: str) -> Principal:
     if not user or not getattr(user, "is_active", True):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -81,7 +94,61 @@ def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    return user
+    principal = Principal.from_user(user)
+    principal_cache.put(token, principal)
+    return _check_tenant(principal)
+
+
+def get_current_user(
+    db: Session = Depends(get_db),
+    token: str = Depends(oauth2_scheme),
+) -> Principal:
+    """
+    Resolve the bearer token to an immutable Principal (id, school_id, role, is_active).
+    Cached per (user_id, token); see app.core.principal_cache for invalidation.
+    """
+    user_id = _user_id_from_token(token)
+
+    principal = principal_cache.get(user_id, token)
+    if principal is not None:
+        return _check_tenant(principal)
+
+    user = db.execute(_principal_query(user_id)).scalars().first()
+    return _principal_from(user, token)
+
+
+async def get_current_user_async(
+    db: AsyncSession = Depends(get_async_db),
+    token: str = Depends(oauth2_scheme),
+) -> Principal:
+    """
+    get_current_user for async def routes: same cache, misses are loaded on
+    the async session, so the route never touches the sync pool/threadpool.
+    """
+    user_id = _user_id_from_token(token)
+
+    principal = principal_cache.get(user_id, token)
+    if principal is not None:
+        return _check_tenant(principal)
+
+    user = (await db.execute(_principal_query(user_id))).scalars().first()
+    return _principal_from(user, token)
+
+
+def _check_tenant(principal: Principal) -> Principal:
+    """
+    X-School-ID scopes every ORM query (app.core.tenancy.scoping); only
+    superusers may select a school other than their own.
+    """
+    tenant_id = get_tenant()
+    if tenant_id is None or tenant_id == principal.school_id:
+        return principal
+    if principal.is_superuser or principal.role == "super_admin":
+        return principal
+    raise HTTPException(
+        status_code=status.HTTP_403_FORBIDDEN,
+        detail="X-School-ID does not match the authenticated user",
+    )
 
 
 def require_role(*allowed_roles: str):
@@ -92,7 +159,7 @@ def require_role(*allowed_roles: str):
             ...
     """
 
-    def dependency(current_user: models.User = Depends(get_current_user)) -> models.User:
+    def dependency(current_user: Principal = Depends(get_current_user)) -> Principal:
         if not allowed_roles:
             return current_user
 
@@ -0,0 +1,74 @@
+"""
+Automatic tenant scoping for ORM queries.
+
+While a tenant is set (X-School-ID -> tenant_id_ctx, see RequestContextMiddleware),
+every ORM SELECT / UPDATE / DELETE on a TenantScoped model gets
+`school_id = <tenant>` added, including joined, aliased and relationship-loaded
+entities. No tenant (scheduler jobs, scripts) means no scoping.
+
+Cross-tenant work opts out explicitly:
+
+    db.query(User).execution_options(all_tenants=True)...
+    with all_tenants():
+        ...
+
+Core statements on Table objects (insert(table), update(table)) are not
+touched; they keep their explicit filters.
+"""
+from __future__ import annotations
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy import Column, Integer, event
+from sqlalchemy.orm import ORMExecuteState, Session, with_loader_criteria
+
+from app.core.tenancy.tenant_context import get_tenant
+
+# execution option that disables scoping for one statement
+ALL_TENANTS = "all_tenants"
+
+_all_tenants_ctx: ContextVar[bool] = ContextVar("all_tenants", default=False)
+
+
+class TenantScoped:
+    """
+    Mixin for models whose rows belong to exactly one school (non-null
+    school_id). Models declare their own school_id column; this one only
+    gives with_loader_criteria() something to build the criteria from.
+    """
+
+    school_id = Column(Integer, nullable=False)
+
+
+@contextmanager
+def all_tenants():
+    """
+    Disable tenant scoping for everything executed inside the block.
+    """
+    token = _all_tenants_ctx.set(True)
+    try:
+        yield
+    finally:
+        _all_tenants_ctx.reset(token)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _scope_to_tenant(state: ORMExecuteState):
+    if not (state.is_select or state.is_update or state.is_delete):
+        return
+    # lazy / column loads inherit the criteria of the statement that loaded the parent
+    if state.is_column_load or state.is_relationship_load:
+        return
+    if state.execution_options.get(ALL_TENANTS) or _all_tenants_ctx.get():
+        return
+    tenant_id = get_tenant()
+    if tenant_id is None:
+        return
+
+    state.statement = state.statement.options(
+        with_loader_criteria(
+            TenantScoped,
+            lambda cls: cls.school_id == tenant_id,
+            include_aliases=True,
+        )
+    )
@@ -0,0 +1,207 @@
+from __future__ import annotations
+from typing import Dict, Any
+import os
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.monitoring.metrics import metrics
+
+
+# Per-deployment pool profiles.
+# Pick one with DB_POOL_PROFILE; any field can be overridden with the
+# matching DB_POOL_* env var (e.g. DB_POOL_SIZE=20).
+POOL_PROFILES: Dict[str, Dict[str, Any]] = {
+    # uvicorn API worker: sized for the anyio threadpool + a burst margin
+    "api": {
+        "pool_size": 10,
+        "max_overflow": 20,
+        "pool_timeout": 5,
+        "pool_recycle": 1800,
+        "pool_pre_ping": True,
+    },
+    # in-process / standalone scheduler: few long-running jobs
+    "scheduler": {
+        "pool_size": 2,
+        "max_overflow": 2,
+        "pool_timeout": 30,
+        "pool_recycle": 1800,
+        "pool_pre_ping": True,
+    },
+    # one-shot scripts (cron, seeders, maintenance)
+    "script": {
+        "pool_size": 1,
+        "max_overflow": 1,
+        "pool_timeout": 60,
+        "pool_recycle": -1,
+        "pool_pre_ping": False,
+    },
+    # each read replica engine: only reporting reads go there
+    "replica": {
+        "pool_size": 3,
+        "max_overflow": 5,
+        "pool_timeout": 5,
+        "pool_recycle": 1800,
+        "pool_pre_ping": True,
+    },
+}
+
+REPLICA_POOL_PROFILE = "replica"
+
+DEFAULT_POOL_PROFILE = "api"
+
+
+def _env_bool(value: str) -> bool:
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def get_pool_settings(profile: str | None = None) -> Dict[str, Any]:
+    """
+    Resolve pool kwargs for create_engine():
+    profile defaults <- DB_POOL_* env overrides (DB_REPLICA_POOL_* for the
+    replica profile).
+    """
+    profile = profile or os.getenv("DB_POOL_PROFILE", DEFAULT_POOL_PROFILE)
+    if profile not in POOL_PROFILES:
+        raise ValueError(f"Unknown DB pool profile: {profile}")
+
+    settings = dict(POOL_PROFILES[profile])
+
+    prefix = "DB_REPLICA_POOL" if profile == REPLICA_POOL_PROFILE else "DB_POOL"
+    overrides = {
+        "pool_size": ("SIZE", int),
+        "max_overflow": ("MAX_OVERFLOW", int),
+        "pool_timeout": ("TIMEOUT", float),
+        "pool_recycle": ("RECYCLE", int),
+        "pool_pre_ping": ("PRE_PING", _env_bool),
+    }
+    for key, (suffix, cast) in overrides.items():
+        raw = os.getenv(f"{prefix}_{suffix}")
+        if raw is not None and raw != "":
+            settings[key] = cast(raw)
+
+    settings["profile"] = profile
+    return settings
+
+
+class InstrumentedQueuePool(QueuePool):
+    """
+    QueuePool that reports saturation to app.monitoring.metrics, labelled
+    by profile, driver, role (primary / replica) and host:
+
+    - db_pool_checkout_wait_ms        (timer)   time to hand out a connection
+    - db_pool_checked_out             (gauge)   connections currently in use
+    - db_pool_overflow                (gauge)   connections above pool_size
+    - db_pool_overflow_events_total   (counter) new overflow connections opened
+    - db_pool_timeouts_total          (counter) checkouts that hit pool_timeout
+    """
+
+    _driver = "sync"
+
+    def __init__(
+        self,
+        creator,
+        pool_profile: str = DEFAULT_POOL_PROFILE,
+        pool_role: str = "primary",
+        pool_host: str = "",
+        **kwargs,
+    ):
+        super().__init__(creator, **kwargs)
+        self._profile = pool_profile
+        self._role = pool_role
+        self._host = pool_host
+        self._labels = {"profile": pool_profile, "driver": self._driver, "role": pool_role, "host": pool_host}
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            conn = super().connect()
+        except exc.TimeoutError:
+            metrics.inc("db_pool_timeouts_total", labels=self._labels)
+            raise
+        finally:
+            metrics.observe(
+                "db_pool_checkout_wait_ms",
+                (time.perf_counter() - start) * 1000.0,
+                labels=self._labels,
+            )
+        self._report_usage()
+        return conn
+
+    def _do_return_conn(self, record):
+        super()._do_return_conn(record)
+        self._report_usage()
+
+    def _inc_overflow(self) -> bool:
+        opened = super()._inc_overflow()
+        if opened and self._overflow > 0:
+            metrics.inc("db_pool_overflow_events_total", labels=self._labels)
+        return opened
+
+    def _report_usage(self):
+        try:
+            metrics.set_gauge("db_pool_checked_out", self.checkedout(), labels=self._labels)
+            metrics.set_gauge("db_pool_overflow", max(self.overflow(), 0), labels=self._labels)
+        except Exception:
+            # telemetry must never break a checkout
+            pass
+
+    def recreate(self):
+        # keep the labels when SQLAlchemy rebuilds the pool (dispose / fork)
+        self.logger.info("Pool recreating")
+        return self.__class__(
+            self._creator,
+            pool_size=self._pool.maxsize,
+            max_overflow=self._max_overflow,
+            pre_ping=self._pre_ping,
+            use_lifo=self._pool.use_lifo,
+            timeout=self._timeout,
+            recycle=self._recycle,
+            echo=self.echo,
+            logging_name=self._orig_logging_name,
+            reset_on_return=self._reset_on_return,
+            _dispatch=self.dispatch,
+            dialect=self._dialect,
+            pool_profile=self._profile,
+            pool_role=self._role,
+            pool_host=self._host,
+        )
+
+
+class InstrumentedAsyncAdaptedQueuePool(InstrumentedQueuePool):
+    """
+    Same telemetry for create_async_engine() (asyncpg).
+    """
+
+    _driver = "async"
+    _is_asyncio = True
+    _queue_class = AsyncAdaptedQueuePool._queue_class
+    _dialect = AsyncAdaptedQueuePool._dialect
+
+
+def engine_pool_kwargs(
+    profile: str | None = None,
+    *,
+    is_async: bool = False,
+    role: str = "primary",
+    host: str = "",
+) -> Dict[str, Any]:
+    """
+    kwargs for create_engine() / create_async_engine() using the instrumented pool.
+    role / host only label the pool metrics, so the primary and each replica
+    report separately.
+    """
+    settings = get_pool_settings(profile)
+    return {
+        "poolclass": InstrumentedAsyncAdaptedQueuePool if is_async else InstrumentedQueuePool,
+        "pool_size": settings["pool_size"],
+        "max_overflow": settings["max_overflow"],
+        "pool_timeout": settings["pool_timeout"],
+        "pool_recycle": settings["pool_recycle"],
+        "pool_pre_ping": settings["pool_pre_ping"],
+        # forwarded by create_engine() to InstrumentedQueuePool.__init__
+        "pool_profile": settings["profile"],
+        "pool_role": role,
+        "pool_host": host,
+    }
@@ -0,0 +1,118 @@
+from __future__ import annotations
+from typing import Dict, List, Optional, Set, Tuple
+import itertools
+import threading
+import time
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.dml import UpdateBase
+
+from app.monitoring.metrics import metrics
+
+
+REPLICA_LAG_SQL = text(
+    "SELECT COALESCE(EXTRACT(EPOCH FROM (now() - pg_last_xact_replay_timestamp())), 0)"
+)
+
+
+class ReplicaRouter:
+    """
+    Picks an engine for read-only work:
+
+    - round-robin over replicas whose replication lag is under max_lag_seconds
+    - lag is probed at most once per check_interval per replica, by a single
+      request; concurrent requests use the last known state meanwhile
+    - falls back to the primary when no replica is healthy (or none configured)
+    """
+
+    def __init__(
+        self,
+        primary: Engine,
+        replicas: Optional[List[Engine]] = None,
+        *,
+        max_lag_seconds: float = 5.0,
+        check_interval: float = 5.0,
+    ):
+        self.primary = primary
+        self.replicas = replicas or []
+        self.max_lag_seconds = max_lag_seconds
+        self.check_interval = check_interval
+        self._rr = itertools.count()
+        # engine -> (checked_at, healthy)
+        self._health: Dict[Engine, Tuple[float, bool]] = {}
+        self._probing: Set[Engine] = set()
+        self._lock = threading.Lock()
+
+    def _replica_label(self, engine: Engine) -> str:
+        return f"{engine.url.host}:{engine.url.port or 5432}"
+
+    def _probe(self, engine: Engine) -> bool:
+        try:
+            with engine.connect() as conn:
+                lag = float(conn.execute(REPLICA_LAG_SQL).scalar() or 0)
+        except Exception:
+            metrics.inc("db_replica_probe_failures_total", labels={"replica": self._replica_label(engine)})
+            return False
+
+        metrics.set_gauge("db_replica_lag_seconds", lag, labels={"replica": self._replica_label(engine)})
+        return lag <= self.max_lag_seconds
+
+    def _is_healthy(self, engine: Engine) -> bool:
+        now = time.monotonic()
+        checked_at, healthy = self._health.get(engine, (0.0, False))
+        if now - checked_at < self.check_interval:
+            return healthy
+
+        with self._lock:
+            if engine in self._probing:
+                return healthy
+            self._probing.add(engine)
+        try:
+            healthy = self._probe(engine)
+            self._health[engine] = (time.monotonic(), healthy)
+        finally:
+            with self._lock:
+                self._probing.discard(engine)
+        return healthy
+
+    def read_engine(self) -> Engine:
+        if not self.replicas:
+            return self.primary
+
+        start = next(self._rr)
+        for i in range(len(self.replicas)):
+            engine = self.replicas[(start + i) % len(self.replicas)]
+            if self._is_healthy(engine):
+                metrics.inc("db_read_routing_total", labels={"target": "replica"})
+                return engine
+
+        metrics.inc("db_read_routing_total", labels={"target": "primary_fallback"})
+        return self.primary
+
+
+class RoutingSession(Session):
+    """
+    Session that sends reads to a replica and everything else to the primary.
+
+    Read-your-writes: once the session has flushed or executed DML, every
+    following statement in it (i.e. the rest of the request) goes to the
+    primary, so a request never reads stale data it just wrote.
+    """
+
+    def __init__(self, *args, router: ReplicaRouter, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.router = router
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self._flushing or isinstance(clause, UpdateBase):
+            self.info["has_written"] = True
+
+        if self.info.get("has_written"):
+            return self.router.primary
+
+        # pin one replica per session so a request sees a single snapshot source
+        if "read_engine" not in self.info:
+            self.info["read_engine"] = self.router.read_engine()
+        return self.info["read_engine"]
@@ -1,19 +1,92 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 import os
 
+from app.db.pool import REPLICA_POOL_PROFILE, engine_pool_kwargs
+from app.db.routing import ReplicaRouter, RoutingSession
+
 DB_USER = os.getenv("POSTGRES_USER", "coreon")
 DB_PASS = os.getenv("POSTGRES_PASSWORD", "coreon")
 DB_HOST = os.getenv("POSTGRES_HOST", "postgres")
 DB_PORT = os.getenv("POSTGRES_PORT", "5432")
 DB_NAME = os.getenv("POSTGRES_DB", "coreon")
 
-SQLALCHEMY_DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+# Read replicas: "host[:port],host[:port]" (empty = all reads on primary)
+DB_REPLICA_HOSTS = [h.strip() for h in os.getenv("POSTGRES_REPLICA_HOSTS", "").split(",") if h.strip()]
+DB_REPLICA_MAX_LAG_SECONDS = float(os.getenv("DB_REPLICA_MAX_LAG_SECONDS", "5"))
+DB_REPLICA_CHECK_SECONDS = float(os.getenv("DB_REPLICA_CHECK_SECONDS", "5"))
+
+
+def _database_url(driver: str, host: str = DB_HOST, port: str = DB_PORT) -> str:
+    return f"{driver}://{DB_USER}:{DB_PASS}@{host}:{port}/{DB_NAME}"
+
+
+def _split_host(entry: str):
+    host, _, port = entry.partition(":")
+    return host, port or DB_PORT
+
+
+SQLALCHEMY_DATABASE_URL = _database_url("postgresql")
+SQLALCHEMY_ASYNC_DATABASE_URL = _database_url("postgresql+asyncpg")
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+# Pool sizing comes from DB_POOL_PROFILE (api / scheduler / script) + DB_POOL_* overrides
+_PRIMARY_HOST = f"{DB_HOST}:{DB_PORT}"
+engine = create_engine(SQLALCHEMY_DATABASE_URL, **engine_pool_kwargs(host=_PRIMARY_HOST))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+# Async path for read-heavy endpoints (asyncpg); same profile, separate pool
+async_engine = create_async_engine(
+    SQLALCHEMY_ASYNC_DATABASE_URL, **engine_pool_kwargs(is_async=True, host=_PRIMARY_HOST)
+)
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+
+def _replica_pool_kwargs(entry: str, is_async: bool = False):
+    host, port = _split_host(entry)
+    return engine_pool_kwargs(REPLICA_POOL_PROFILE, is_async=is_async, role="replica", host=f"{host}:{port}")
+
+
+# Replica engines + routing sessions for reporting / read-only work
+# (smaller "replica" pool profile, DB_REPLICA_POOL_* overrides)
+replica_engines = [
+    create_engine(_database_url("postgresql", *_split_host(h)), **_replica_pool_kwargs(h))
+    for h in DB_REPLICA_HOSTS
+]
+async_replica_engines = [
+    create_async_engine(
+        _database_url("postgresql+asyncpg", *_split_host(h)), **_replica_pool_kwargs(h, is_async=True)
+    )
+    for h in DB_REPLICA_HOSTS
+]
+
+read_router = ReplicaRouter(
+    engine,
+    replica_engines,
+    max_lag_seconds=DB_REPLICA_MAX_LAG_SECONDS,
+    check_interval=DB_REPLICA_CHECK_SECONDS,
+)
+async_read_router = ReplicaRouter(
+    async_engine.sync_engine,
+    [e.sync_engine for e in async_replica_engines],
+    max_lag_seconds=DB_REPLICA_MAX_LAG_SECONDS,
+    check_interval=DB_REPLICA_CHECK_SECONDS,
+)
+
+ReadSessionLocal = sessionmaker(
+    class_=RoutingSession,
+    router=read_router,
+    autocommit=False,
+    autoflush=False,
+)
+AsyncReadSessionLocal = async_sessionmaker(
+    sync_session_class=RoutingSession,
+    router=async_read_router,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
 # --- Dependency for FastAPI routes ---
 def get_db():
     db = SessionLocal()
@@ -21,3 +94,23 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# --- Async dependency (async def routes only) ---
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+# --- Read-only / reporting dependencies (replica when healthy, primary after a write) ---
+def get_read_db():
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_read_db():
+    async with AsyncReadSessionLocal() as db:
+        yield db
@@ -1,6 +1,7 @@
 from .event_bus import event_bus
 from .handlers.notification_handler import notification_handler
 from .handlers.audit_handler import audit_handler
+from .handlers.principal_cache_handler import principal_cache_handler
 from .types import (
     WorkflowEvents,
     FinanceEvents,
@@ -47,6 +48,8 @@ event_bus.subscribe(OrgEvents.DEPARTMENT_CREATED, notification_handler)
 # Users
 event_bus.subscribe(UserEvents.USER_CREATED, notification_handler)
 event_bus.subscribe(UserEvents.ROLE_ASSIGNED, notification_handler)
+# cache invalidation must be visible before the request returns
+event_bus.subscribe(UserEvents.ROLE_ASSIGNED, principal_cache_handler, inline=True)
 
 # Students
 event_bus.subscribe(StudentEvents.STUDENT_ENROLLED, notification_handler)
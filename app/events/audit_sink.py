@@ -0,0 +1,204 @@
+import atexit
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, List, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.exc import DBAPIError, OperationalError
+
+from app.db.session import SessionLocal
+from app.models.audit_core import AuditLog
+from app.monitoring.metrics import metrics
+
+logger = logging.getLogger("coreon.api")
+
+# Flush when this many rows are buffered ...
+AUDIT_BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE", "200"))
+# ... or at least this often, so a row never waits longer than this
+AUDIT_FLUSH_INTERVAL_MS = int(os.getenv("AUDIT_FLUSH_INTERVAL_MS", "500"))
+# Hard cap: past this the producer flushes itself instead of growing the buffer
+AUDIT_BUFFER_MAX = int(os.getenv("AUDIT_BUFFER_MAX", "5000"))
+# While the DB is unreachable rows are kept (oldest dropped past this) and
+# writes are retried with exponential backoff up to the max delay
+AUDIT_RETRY_BUFFER_MAX = int(os.getenv("AUDIT_RETRY_BUFFER_MAX", "50000"))
+AUDIT_RETRY_BACKOFF_MAX_SECONDS = float(os.getenv("AUDIT_RETRY_BACKOFF_MAX_SECONDS", "30"))
+
+
+def _db_unavailable(exc: Exception) -> bool:
+    # connection refused / lost, failover, ...: the rows themselves are fine
+    return isinstance(exc, OperationalError) or (
+        isinstance(exc, DBAPIError) and exc.connection_invalidated
+    )
+
+
+class AuditSink:
+    """
+    Buffers AuditLog rows in memory and writes them with one multi-row INSERT
+    per batch, from a background flusher thread.
+
+    A batch rejected for its data (IntegrityError, ...) is retried row by
+    row so one bad row only loses itself. When the database is unavailable
+    the unwritten rows go back to the front of the buffer (bounded by
+    AUDIT_RETRY_BUFFER_MAX) and writing pauses with exponential backoff.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = AUDIT_BATCH_SIZE,
+        flush_interval_ms: int = AUDIT_FLUSH_INTERVAL_MS,
+        max_buffer: int = AUDIT_BUFFER_MAX,
+        retry_buffer_max: int = AUDIT_RETRY_BUFFER_MAX,
+    ):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000.0
+        self.max_buffer = max_buffer
+        self.retry_buffer_max = retry_buffer_max
+        # monotonic time before which no write is attempted (DB unavailable)
+        self._retry_at = 0.0
+        self._backoff = 0.0
+        self._buffer: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        # serializes writers so rows are committed in arrival order
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = threading.Event()
+        self._thread = None
+
+    def add(self, row: Dict[str, Any]) -> None:
+        self._ensure_flusher()
+        with self._lock:
+            self._buffer.append(row)
+            self._trim()
+            depth = len(self._buffer)
+        metrics.set_gauge("audit_buffer_depth", depth)
+
+        if self._closed.is_set():
+            # late events after shutdown: no flusher left, write through
+            self.flush(force=True)
+        elif self._backing_off():
+            # DB unavailable: the flusher retries; never block the producer
+            return
+        elif depth >= self.max_buffer:
+            # flusher is falling behind (DB slow): apply back-pressure here
+            metrics.inc("audit_buffer_overflow_flushes_total")
+            self.flush()
+        elif depth >= self.batch_size:
+            self._wakeup.set()
+
+    def flush(self, force: bool = False) -> int:
+        """
+        Write everything buffered so far. Returns the number of rows written.
+
+        Skipped while backing off after the DB was unavailable, unless forced.
+        """
+        if not force and self._backing_off():
+            return 0
+        with self._flush_lock:
+            with self._lock:
+                rows, self._buffer = self._buffer, []
+            metrics.set_gauge("audit_buffer_depth", 0)
+            if not rows:
+                return 0
+
+            written = 0
+            for start in range(0, len(rows), self.batch_size):
+                count, unwritten = self._write(rows[start:start + self.batch_size])
+                written += count
+                if unwritten:
+                    self._requeue(unwritten + rows[start + self.batch_size:])
+                    return written
+            self._backoff = 0.0
+            return written
+
+    def _write(self, rows: List[Dict[str, Any]]) -> Tuple[int, List[Dict[str, Any]]]:
+        """
+        Returns (rows written, rows to retry later because the DB was unavailable).
+        """
+        start = time.perf_counter()
+        unwritten: List[Dict[str, Any]] = []
+        db = SessionLocal()
+        try:
+            db.execute(insert(AuditLog.__table__).values(rows))
+            db.commit()
+            written = len(rows)
+        except Exception as exc:
+            db.rollback()
+            written = 0
+            if _db_unavailable(exc):
+                logger.warning(f"[AuditSink] database unavailable, keeping {len(rows)} rows", exc_info=True)
+                unwritten = rows
+            else:
+                logger.warning(f"[AuditSink] batch of {len(rows)} failed, retrying row by row", exc_info=True)
+                for i, row in enumerate(rows):
+                    try:
+                        db.execute(insert(AuditLog.__table__).values(row))
+                        db.commit()
+                        written += 1
+                    except Exception as row_exc:
+                        db.rollback()
+                        if _db_unavailable(row_exc):
+                            unwritten = rows[i:]
+                            break
+                        metrics.inc("audit_rows_failed_total")
+                        logger.error(f"[AuditSink] dropped audit row {row.get('action')}", exc_info=True)
+        finally:
+            db.close()
+
+        metrics.inc("audit_rows_written_total", value=written)
+        metrics.observe("audit_flush_duration_ms", (time.perf_counter() - start) * 1000.0)
+        return written, unwritten
+
+    def _requeue(self, rows: List[Dict[str, Any]]) -> None:
+        # back in front of anything added meanwhile, so order is kept
+        with self._lock:
+            self._buffer = rows + self._buffer
+            self._trim()
+            depth = len(self._buffer)
+        metrics.set_gauge("audit_buffer_depth", depth)
+        self._backoff = min(max(self._backoff * 2, self.flush_interval), AUDIT_RETRY_BACKOFF_MAX_SECONDS)
+        self._retry_at = time.monotonic() + self._backoff
+        metrics.inc("audit_write_retries_total")
+
+    def _trim(self) -> None:
+        # caller holds the lock
+        overflow = len(self._buffer) - self.retry_buffer_max
+        if overflow > 0:
+            del self._buffer[:overflow]
+            metrics.inc("audit_rows_failed_total", value=overflow)
+            logger.error(f"[AuditSink] buffer full, dropped {overflow} oldest audit rows")
+
+    def _backing_off(self) -> bool:
+        return time.monotonic() < self._retry_at
+
+    def _ensure_flusher(self):
+        if self._thread is not None or self._closed.is_set():
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name="audit-sink", daemon=True)
+                self._thread.start()
+
+    def _loop(self):
+        while not self._closed.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.error("[AuditSink] flush failed", exc_info=True)
+
+    def close(self) -> None:
+        """
+        Stop the flusher and write whatever is still buffered (shutdown / exit).
+        """
+        self._closed.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5.0)
+        self.flush(force=True)
+
+
+audit_sink = AuditSink()
+atexit.register(audit_sink.close)
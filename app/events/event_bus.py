@@ -1,40 +1,250 @@
-from typing import Callable, Dict, List
+import logging
+import os
+import queue
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional
+
 from app.events.domain_event import DomainEvent
 from app.monitoring.metrics import metrics
 
+logger = logging.getLogger("coreon.api")
+
+# "async": handlers run on a bounded worker pool after publish() returns
+# "sync":  handlers run inline on the publishing thread (tests, scripts)
+EVENT_BUS_MODE = os.getenv("EVENT_BUS_MODE", "async")
+EVENT_BUS_WORKERS = int(os.getenv("EVENT_BUS_WORKERS", "4"))
+EVENT_BUS_QUEUE_SIZE = int(os.getenv("EVENT_BUS_QUEUE_SIZE", "1000"))
+EVENT_BUS_MAX_RETRIES = int(os.getenv("EVENT_BUS_MAX_RETRIES", "3"))
+EVENT_BUS_RETRY_BACKOFF_SECONDS = float(os.getenv("EVENT_BUS_RETRY_BACKOFF_SECONDS", "0.5"))
+
+
+class EventDeliveryError(Exception):
+    """
+    Raised by dispatch(raise_on_failure=True) when a handler run on the
+    calling thread failed.
+    """
+
+
+class _Subscription:
+    """
+    One handler registration. max_concurrency caps how many worker threads may
+    run this handler at once; jobs over the cap wait in `pending` instead of
+    holding a worker.
+    """
+
+    def __init__(self, handler: Callable, max_concurrency: Optional[int], max_retries: int, inline: bool):
+        self.handler = handler
+        self.name = handler.__name__
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.inline = inline
+        self.running = 0
+        self.pending: Deque["_Job"] = deque()
+
+
+class _Job:
+    __slots__ = ("sub", "event", "payload", "attempt")
+
+    def __init__(self, sub: _Subscription, event: str, payload: Dict[str, Any], attempt: int = 0):
+        self.sub = sub
+        self.event = event
+        self.payload = payload
+        self.attempt = attempt
+
 
 class EventBus:
-    def __init__(self):
-        self._handlers: Dict[str, List[Callable]] = {}
+    def __init__(
+        self,
+        mode: str = EVENT_BUS_MODE,
+        workers: int = EVENT_BUS_WORKERS,
+        queue_size: int = EVENT_BUS_QUEUE_SIZE,
+    ):
+        self._handlers: Dict[str, List[_Subscription]] = {}
+        self.mode = mode
+        self.workers = workers
+        self._queue: "queue.Queue[Optional[_Job]]" = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+        # queued + running + pending + scheduled retries, for drain()
+        self._outstanding = 0
+        self._idle = threading.Condition(self._lock)
 
-    def subscribe(self, event_name: str, handler: Callable):
+    def subscribe(
+        self,
+        event_name: str,
+        handler: Callable,
+        *,
+        max_concurrency: Optional[int] = None,
+        max_retries: int = EVENT_BUS_MAX_RETRIES,
+        inline: bool = False,
+    ):
+        """
+        inline=True keeps the handler on the publishing thread even in async
+        mode (for cheap handlers whose effect must be visible immediately).
+        """
         if event_name not in self._handlers:
             self._handlers[event_name] = []
-        self._handlers[event_name].append(handler)
+        self._handlers[event_name].append(
+            _Subscription(handler, max_concurrency, max_retries, inline)
+        )
 
     def publish(self, event: DomainEvent):
-        handlers = self._handlers.get(event.event, [])
-        payload = event.to_dict()
+        self.dispatch(event.event, event.to_dict())
+
+    def dispatch(self, event_name: str, payload: Dict[str, Any], *, raise_on_failure: bool = False):
+        """
+        Deliver an already-serialized event (used by the outbox relay).
+
+        raise_on_failure: raise EventDeliveryError if a handler run on this
+        thread (sync mode / inline) failed, so the caller can redeliver.
+        """
+        subs = self._handlers.get(event_name, [])
 
         # Metrics: event published
         try:
             metrics.inc(
                 "domain_events_published_total",
-                labels={"event": event.event},
+                labels={"event": event_name},
             )
         except Exception:
             pass
 
-        for h in handlers:
-            # Metrics: handler invocation
-            try:
-                metrics.inc(
-                    "domain_event_handler_invocations_total",
-                    labels={"event": event.event, "handler": h.__name__},
-                )
-            except Exception:
-                pass
-            h(payload)
+        failed = []
+        for sub in subs:
+            job = _Job(sub, event_name, payload)
+            if self.mode == "sync" or sub.inline:
+                if not self._run(job, retry=False):
+                    failed.append(sub.name)
+            else:
+                self._submit(job)
+        if failed and raise_on_failure:
+            raise EventDeliveryError(f"{event_name}: {', '.join(failed)} failed")
+
+    # ------------------------------------------------------------------
+    # Async dispatch
+    # ------------------------------------------------------------------
+    def _ensure_workers(self):
+        # started lazily so forked workers / cron scripts get their own threads
+        if self._threads:
+            return
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                t = threading.Thread(target=self._worker_loop, name=f"event-bus-{i}", daemon=True)
+                t.start()
+                self._threads.append(t)
+
+    def _submit(self, job: _Job, new: bool = True):
+        self._ensure_workers()
+        if new:
+            with self._lock:
+                self._outstanding += 1
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            # back-pressure: run on the caller rather than lose the event
+            metrics.inc("domain_event_queue_full_total", labels={"event": job.event})
+            self._run(job, retry=False)
+            self._done()
+            return
+        metrics.set_gauge("domain_event_queue_depth", self._queue.qsize())
+
+    def _worker_loop(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            metrics.set_gauge("domain_event_queue_depth", self._queue.qsize())
+            sub = job.sub
+            with self._lock:
+                if sub.max_concurrency and sub.running >= sub.max_concurrency:
+                    sub.pending.append(job)
+                    continue
+                sub.running += 1
+            self._execute(job)
+
+    def _execute(self, job: _Job):
+        sub = job.sub
+        while job is not None:
+            ok = self._run(job, retry=True)
+            if not ok and job.attempt < sub.max_retries:
+                job.attempt += 1
+                delay = EVENT_BUS_RETRY_BACKOFF_SECONDS * (2 ** (job.attempt - 1))
+                metrics.inc("domain_event_handler_retries_total", labels={"event": job.event, "handler": sub.name})
+                timer = threading.Timer(delay, self._submit, args=(job,), kwargs={"new": False})
+                timer.daemon = True
+                timer.start()
+            else:
+                self._done()
+            # hand the freed slot straight to the next job waiting on this handler
+            with self._lock:
+                job = sub.pending.popleft() if sub.pending else None
+                if job is None:
+                    sub.running -= 1
+
+    def _run(self, job: _Job, retry: bool) -> bool:
+        sub = job.sub
+        labels = {"event": job.event, "handler": sub.name}
+        # Metrics: handler invocation
+        try:
+            metrics.inc("domain_event_handler_invocations_total", labels=labels)
+        except Exception:
+            pass
+
+        start = time.perf_counter()
+        try:
+            sub.handler(job.payload)
+            return True
+        except Exception:
+            metrics.inc("domain_event_handler_failures_total", labels=labels)
+            final = not retry or job.attempt >= sub.max_retries
+            logger.error(
+                f"[EventBus] {sub.name} failed for {job.event} "
+                f"(attempt {job.attempt + 1}{', giving up' if final else ''})",
+                exc_info=True,
+            )
+            return False
+        finally:
+            metrics.observe(
+                "domain_event_handler_duration_ms",
+                (time.perf_counter() - start) * 1000.0,
+                labels=labels,
+            )
+
+    def _done(self):
+        with self._lock:
+            self._outstanding -= 1
+            if self._outstanding <= 0:
+                self._idle.notify_all()
+
+    def drain(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every published event (including retries) has been handled.
+        Returns False on timeout.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._lock:
+            while self._outstanding > 0:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._idle.wait(remaining)
+        return True
+
+    def shutdown(self, timeout: float = 10.0):
+        """
+        Drain outstanding events and stop the workers (app shutdown).
+        """
+        if not self.drain(timeout):
+            logger.warning(f"[EventBus] shutdown with {self._outstanding} events still outstanding")
+        for _ in self._threads:
+            self._queue.put(None)
+        for t in self._threads:
+            t.join(timeout=1.0)
+        self._threads = []
 
 
 event_bus = EventBus()
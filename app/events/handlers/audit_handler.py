@@ -1,10 +1,8 @@
-from sqlalchemy.orm import Session
-from app.db.session import SessionLocal
-from app.models import AuditLog
+from app.events.audit_sink import audit_sink
 
 def audit_handler(payload: dict):
-    db: Session = SessionLocal()
-    log = AuditLog(
+    # buffered: rows are written in batches by the audit sink's flusher
+    audit_sink.add(dict(
         school_id=payload.get("school_id"),
         user_id=payload.get("user_id"),
         entity=payload.get("entity"),
@@ -12,7 +10,4 @@ def audit_handler(payload: dict):
         before=payload.get("before"),
         after=payload.get("after"),
         ip_address=payload.get("ip"),
-    )
-    db.add(log)
-    db.commit()
-    db.close()
+    ))
@@ -0,0 +1,7 @@
+from app.core.principal_cache import invalidate_principal
+
+def principal_cache_handler(payload: dict):
+    # only the user the event is about (entity "user"); user_id is the actor
+    if payload.get("entity") != "user" or payload.get("entity_id") is None:
+        return
+    invalidate_principal(int(payload["entity_id"]))
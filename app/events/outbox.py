@@ -0,0 +1,105 @@
+"""
+Transactional outbox: stage domain events / background tasks on the session
+that performs the business change, instead of publishing after commit.
+
+    stage_event(db, DomainEvent(...))
+    stage_task(db, "send_email", {...})
+    db.commit()
+
+With OUTBOX_ENABLED the messages become OutboxMessage rows in that same
+transaction and are delivered by the relay process (app.scripts.outbox_relay),
+so nothing is lost if the API worker dies right after commit.
+
+Without it (default) they are kept on the session and handed to the
+in-process event bus / task queue once the transaction commits, which is the
+previous behaviour. Rolled back transactions deliver nothing either way.
+"""
+import logging
+import os
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.events.domain_event import DomainEvent
+from app.models.outbox_core import OutboxMessage
+
+logger = logging.getLogger("coreon.api")
+
+OUTBOX_ENABLED = os.getenv("OUTBOX_ENABLED", "false").lower() in ("1", "true", "yes")
+
+_PENDING_KEY = "outbox_pending"
+
+
+def _stage(db: Session, kind: str, name: str, payload: Dict[str, Any]) -> None:
+    if OUTBOX_ENABLED:
+        db.add(OutboxMessage(kind=kind, name=name, payload=payload))
+        return
+    pending: List[Tuple[str, str, Dict[str, Any]]] = db.info.setdefault(_PENDING_KEY, [])
+    pending.append((kind, name, payload))
+
+
+def stage_event(db: Session, domain_event: DomainEvent) -> None:
+    _stage(db, "event", domain_event.event, domain_event.to_dict())
+
+
+def stage_task(db: Session, task_name: str, payload: Dict[str, Any]) -> None:
+    _stage(db, "task", task_name, payload)
+
+
+def deliver(
+    kind: str,
+    name: str,
+    payload: Dict[str, Any],
+    *,
+    enqueue_timeout: Optional[float] = None,
+) -> Optional[Future]:
+    """
+    Hand one message to the in-process bus / queue (after commit, or from the relay).
+
+    Raises when an event handler run on this thread fails (sync mode). For
+    tasks, returns the task queue's Future: the task has only been queued
+    (enqueue_timeout: how long to wait for room in a full lane).
+    """
+    # imported lazily: app.background pulls in task handlers
+    from app.background.task_queue import task_queue
+    from app.events.event_bus import event_bus
+
+    if kind == "event":
+        event_bus.dispatch(name, payload, raise_on_failure=True)
+        return None
+    if kind == "task":
+        future = task_queue.enqueue(name, payload, timeout=enqueue_timeout)
+        if future is None:
+            raise LookupError(f"no task handler registered for {name!r}")
+        return future
+    raise ValueError(f"unknown outbox message kind {kind!r}")
+
+
+@event.listens_for(Session, "after_commit")
+def _deliver_after_commit(session: Session):
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending:
+        return
+    # imported lazily: app.background pulls in task handlers
+    from app.background.task_queue import TaskQueueFull, task_queue
+
+    for kind, name, payload in pending:
+        try:
+            deliver(kind, name, payload)
+        except TaskQueueFull as exc:
+            # enqueue never waits on this path: keep the task in dead_letters
+            # (task_dead_letter_total) rather than dropping it; with
+            # OUTBOX_ENABLED the relay retries instead
+            task_queue.dead_letter(name, payload, str(exc))
+            logger.error(f"[Outbox] {name} dead-lettered: {exc}")
+        except Exception:
+            # the business change is committed; never fail the caller here
+            logger.error(f"[Outbox] in-process delivery of {kind} {name} failed", exc_info=True)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_after_rollback(session: Session, previous_transaction):
+    if previous_transaction.parent is None:
+        session.info.pop(_PENDING_KEY, None)
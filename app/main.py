@@ -1,20 +1,29 @@
 import app.events
 import app.background
-import app.scheduler
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.core.router_loader import load_all_routers
-from app.core import logging_config  # noqa: F401
-from app.middleware.request_id import RequestIDMiddleware
-from app.middleware.logging_middleware import LoggingMiddleware
-from app.middleware.tenant_middleware import TenantMiddleware
+from app.core.logging_config import stop_logging
+from app.middleware.request_context import RequestContextMiddleware
+from app.middleware.rate_limit import RateLimitMiddleware
 from app.middleware.error_handler import register_exception_handlers
+from app.core.passwords import shutdown_hash_executor
+from app.core.response_cache import version_sync
+from app.events.event_bus import event_bus
+from app.events.audit_sink import audit_sink
+from app.background.task_queue import task_queue
+from app.services.notification_hub import notification_hub
+from app.monitoring.multiprocess import start_metrics_flusher
+from app.scheduler import start_scheduler, stop_scheduler
 
 
 app = FastAPI(title="Coreon EDU API")
 
+# Rate limits / fair admission (innermost: sees the tenant, 429s still get CORS headers)
+app.add_middleware(RateLimitMiddleware)
+
 # CORS
 app.add_middleware(
     CORSMiddleware,
@@ -24,10 +33,8 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Middlewares
-app.add_middleware(RequestIDMiddleware)
-app.add_middleware(TenantMiddleware)
-app.add_middleware(LoggingMiddleware)
+# Middlewares (request id + tenant + access log/metrics in one ASGI pass)
+app.add_middleware(RequestContextMiddleware)
 
 # Health
 @app.get("/api/v1/health/", include_in_schema=False)
@@ -39,3 +46,19 @@ load_all_routers(app)
 
 # Exception handlers
 register_exception_handlers(app)
+
+# Cross-worker metrics (no-op unless METRICS_MULTIPROC_DIR is set)
+start_metrics_flusher()
+
+# Scheduler (leader-elected across workers)
+app.add_event_handler("startup", start_scheduler)
+
+# Shutdown hooks
+app.add_event_handler("shutdown", stop_scheduler)
+app.add_event_handler("shutdown", notification_hub.close)
+app.add_event_handler("shutdown", version_sync.close)
+app.add_event_handler("shutdown", shutdown_hash_executor)
+app.add_event_handler("shutdown", event_bus.shutdown)
+app.add_event_handler("shutdown", audit_sink.close)
+app.add_event_handler("shutdown", task_queue.shutdown)
+app.add_event_handler("shutdown", stop_logging)
@@ -18,7 +18,11 @@ def register_exception_handlers(app: FastAPI):
             "request_id": _get_request_id(request),
         }
         logger.warning(f"HTTPException: {payload}")
-        return JSONResponse(status_code=exc.status_code, content=payload)
+        return JSONResponse(
+            status_code=exc.status_code,
+            content=payload,
+            headers=getattr(exc, "headers", None),
+        )
 
     @app.exception_handler(RequestValidationError)
     async def validation_exception_handler(request: Request, exc: RequestValidationError):
@@ -0,0 +1,120 @@
+import math
+from typing import Optional, Tuple
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.rate_limit import (
+    ADMISSION_ENABLED,
+    RATE_LIMIT_ENABLED,
+    AdmissionRejected,
+    admission,
+    client_ip,
+    is_exempt,
+    rate_limiter,
+    route_class,
+)
+from app.core.tenancy.tenant_context import get_tenant
+
+
+def _header(scope: Scope, name: bytes) -> Optional[str]:
+    for key, value in scope.get("headers") or ():
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+def _token(scope: Scope) -> Tuple[Optional[str], Optional[dict]]:
+    # the token is only decoded here; get_current_user still authenticates
+    from app.core.security import decode_token_or_none
+
+    scheme, _, token = (_header(scope, b"authorization") or "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None, None
+    payload = decode_token_or_none(token)
+    if not payload or payload.get("sub") is None:
+        return None, None
+    return token, payload
+
+
+def _principal_key(scope: Scope, payload: Optional[dict]) -> Optional[str]:
+    if payload is not None:
+        return f"user:{payload['sub']}"
+    client = scope.get("client")
+    ip = client_ip(client[0] if client else None, _header(scope, b"x-forwarded-for"))
+    return f"ip:{ip}" if ip else None
+
+
+def _charged_tenant(tenant_id: Optional[int], token: Optional[str], payload: Optional[dict]) -> Optional[int]:
+    """
+    The school whose budget this request spends: X-School-ID only when the
+    token belongs to that school (or a superuser), so an anonymous or
+    foreign caller cannot exhaust another school's budget.
+    """
+    from app.core.principal_cache import principal_cache
+
+    if tenant_id is None or payload is None:
+        return None
+    if payload.get("su") or payload.get("role") == "super_admin":
+        return tenant_id
+    school_id = payload.get("school_id")
+    if school_id is None:
+        # tokens issued before the claim existed: the cached principal, if any
+        try:
+            principal = principal_cache.get(int(payload["sub"]), token)
+        except (TypeError, ValueError):
+            principal = None
+        if principal is None:
+            return None
+        if principal.is_superuser:
+            return tenant_id
+        school_id = principal.school_id
+    return tenant_id if school_id == tenant_id else None
+
+
+def _reject(status_code: int, detail: str, retry_after: float) -> JSONResponse:
+    return JSONResponse(
+        {"detail": detail},
+        status_code=status_code,
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+    )
+
+
+class RateLimitMiddleware:
+    """
+    Token-bucket limits per principal and per tenant (429), then fair-share
+    admission across tenants when the worker is saturated (503 on queue
+    timeout). Runs inside RequestContextMiddleware, which resolves the tenant.
+    See app.core.rate_limit for budgets and settings.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or is_exempt(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        token, payload = _token(scope)
+        tenant_id = _charged_tenant(get_tenant(), token, payload)
+        if RATE_LIMIT_ENABLED:
+            klass = route_class(scope["method"], scope["path"])
+            wait = rate_limiter.check(tenant_id, _principal_key(scope, payload), klass)
+            if wait > 0:
+                await _reject(429, "Rate limit exceeded", wait)(scope, receive, send)
+                return
+
+        if not ADMISSION_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await admission.acquire(str(tenant_id) if tenant_id is not None else "-")
+        except AdmissionRejected as exc:
+            await _reject(exc.status_code, exc.reason, exc.retry_after)(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            admission.release()
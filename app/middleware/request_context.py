@@ -0,0 +1,157 @@
+import json
+import logging
+import os
+import random
+import time
+import uuid
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.tenancy.tenant_context import tenant_id_ctx
+from app.monitoring.metrics import metrics
+
+try:
+    import orjson
+
+    def _dumps(obj) -> str:
+        return orjson.dumps(obj).decode()
+except ImportError:  # optional speedup
+    _dumps = json.dumps
+
+logger = logging.getLogger("coreon.api")
+
+
+def _parse_sample_routes(raw: str) -> dict:
+    rates = {}
+    for item in raw.split(","):
+        route, _, rate = item.strip().rpartition("=")
+        if route:
+            rates[route] = float(rate)
+    return rates
+
+
+# Sampling for successful (2xx) access logs; errors are always logged.
+# ACCESS_LOG_SAMPLE_ROUTES="/notifications/=0.05,/api/v1/health/=0" (route templates)
+ACCESS_LOG_SAMPLE_RATE = float(os.getenv("ACCESS_LOG_SAMPLE_RATE", "1.0"))
+ACCESS_LOG_SAMPLE_ROUTES = _parse_sample_routes(os.getenv("ACCESS_LOG_SAMPLE_ROUTES", ""))
+
+# metric label for requests that matched no route (404s, probes, scanners)
+UNMATCHED_ROUTE = "__unmatched__"
+
+
+def route_template(scope: Scope) -> str:
+    """
+    Matched route template (e.g. /{school_id}/grades/{grade_id}) for metric
+    labels; raw paths would create one series per entity id.
+    """
+    route = scope.get("route")
+    path = getattr(route, "path_format", None) or getattr(route, "path", None)
+    if not path:
+        return UNMATCHED_ROUTE
+    # routes inside a Mount only know their path relative to it
+    mount_prefix = scope.get("root_path", "")[len(scope.get("app_root_path", "")):]
+    return mount_prefix + path
+
+
+class RequestContextMiddleware:
+    """
+    Pure-ASGI replacement for the RequestID / Tenant / Logging middleware chain.
+
+    One pass per request:
+    - assigns (or propagates) X-Request-ID and exposes it on request.state
+    - resolves X-School-ID into tenant_id_ctx for the lifetime of the request
+    - emits the JSON access log + HTTP metrics once the response completes
+
+    The downstream app is awaited directly (no BaseHTTPMiddleware task group)
+    and response messages are forwarded as they arrive, so streaming responses
+    are never buffered.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        headers = dict(scope.get("headers") or [])
+
+        raw_request_id = headers.get(b"x-request-id")
+        request_id = raw_request_id.decode("latin-1") if raw_request_id else str(uuid.uuid4())
+        scope.setdefault("state", {})["request_id"] = request_id
+
+        tenant_token = None
+        raw_school_id = headers.get(b"x-school-id")
+        if raw_school_id:
+            try:
+                tenant_token = tenant_id_ctx.set(int(raw_school_id))
+            except ValueError:
+                pass
+
+        status_code = None
+        request_id_header = (b"x-request-id", request_id.encode("latin-1"))
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message["headers"] = [*message.get("headers", []), request_id_header]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if tenant_token is not None:
+                tenant_id_ctx.reset(tenant_token)
+            self._record(scope, request_id, status_code or 500, time.perf_counter() - start)
+
+    def _record(self, scope: Scope, request_id: str, status_code: int, elapsed: float):
+        duration_ms = elapsed * 1000.0
+        method = scope["method"]
+        path = scope["path"]
+        route = route_template(scope)
+        client = scope.get("client")
+
+        if self._should_log(route, status_code):
+            self._log(method, path, route, status_code, duration_ms, request_id, client)
+
+        # Metrics: HTTP counters + latency, labelled by route template (bounded cardinality)
+        try:
+            metrics.inc("http_requests_total", labels={
+                "method": method,
+                "path": route,
+                "status_code": status_code,
+            })
+            metrics.observe("http_request_duration_ms", duration_ms, labels={
+                "method": method,
+                "path": route,
+            })
+        except Exception:
+            # metrics must never break the request
+            logger.debug("Metrics update failed", exc_info=True)
+
+    def _should_log(self, route: str, status_code: int) -> bool:
+        if not 200 <= status_code < 300:
+            return True
+        rate = ACCESS_LOG_SAMPLE_ROUTES.get(route, ACCESS_LOG_SAMPLE_RATE)
+        return rate >= 1.0 or random.random() < rate
+
+    def _log(self, method, path, route, status_code, duration_ms, request_id, client):
+        record = {
+            "type": "http_request",
+            "method": method,
+            "path": path,
+            "route": route,
+            "status_code": status_code,
+            "duration_ms": int(duration_ms),
+            "request_id": request_id,
+            "client_host": client[0] if client else None,
+        }
+        # Log JSON for ingestion by log stack (ELK, Loki, etc.); the handler
+        # only enqueues, stdout is written by the listener thread
+        try:
+            logger.info(_dumps(record))
+        except Exception:
+            logger.info(str(record))
@@ -98,9 +98,13 @@ from .security_vehicle import VehicleAccess, VehicleAccessLog
 from .security_shifts import GuardShift
 from .notification_core import (
     Notification,
+    NotificationCounter,
     NotificationPreference,
     NotificationTemplate,
 )
+from .outbox_core import OutboxMessage
+from .attendance_core import AttendanceRecord
+from .analytics_core import AttendanceDailyRollup, StudentAttendanceRollup
 
 # Auto-added missing model imports
 from .behavior_core import BehaviorIncident, BehaviorActionPlan
@@ -12,9 +12,10 @@ from sqlalchemy import (
 )
 from sqlalchemy.orm import relationship
 from app.db.session import Base
+from app.core.tenancy.scoping import TenantScoped
 
 
-class AcademicYear(Base):
+class AcademicYear(Base, TenantScoped):
     """
     Example: 2024-2025
     """
@@ -58,7 +59,7 @@ class EducationalStage(Base):
     name = Column(String(100), nullable=False)
 
 
-class Grade(Base):
+class Grade(Base, TenantScoped):
     """
     A grade belongs to a school + stage.
     """
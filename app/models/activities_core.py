@@ -12,9 +12,10 @@ from sqlalchemy import (
 )
 from sqlalchemy.orm import relationship
 from app.db.session import Base
+from app.core.tenancy.scoping import TenantScoped
 
 
-class ActivityClub(Base):
+class ActivityClub(Base, TenantScoped):
     """
     Clubs like:
     - Football
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from sqlalchemy import (
+    Column,
+    Date,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    func,
+)
+from app.db.session import Base
+from app.core.tenancy.scoping import TenantScoped
+
+
+class AttendanceDailyRollup(Base, TenantScoped):
+    """
+    Attendance counts per school, day and classroom (classroom_id NULL for
+    marks taken outside a class, e.g. gate scans).
+
+    Built nightly from attendance_records by
+    app.scheduler.jobs.attendance_rollup; days after the latest rolled-up
+    date are read live from attendance_records.
+    """
+
+    __tablename__ = "attendance_daily_rollups"
+    __table_args__ = (
+        Index("ix_attendance_daily_rollups_school_date", "school_id", "date"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    school_id = Column(
+        Integer,
+        ForeignKey("schools.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    date = Column(Date, nullable=False)
+    classroom_id = Column(
+        Integer,
+        ForeignKey("classrooms.id", ondelete="SET NULL"),
+        nullable=True,
+    )
+
+    present = Column(Integer, nullable=False, server_default="0")
+    absent = Column(Integer, nullable=False, server_default="0")
+    late = Column(Integer, nullable=False, server_default="0")
+    excused = Column(Integer, nullable=False, server_default="0")
+    total = Column(Integer, nullable=False, server_default="0")
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
+class StudentAttendanceRollup(Base, TenantScoped):
+    """
+    Attendance counts per student and month (month = first day of the month),
+    rolled up with AttendanceDailyRollup and covering the same days.
+    """
+
+    __tablename__ = "student_attendance_rollups"
+    __table_args__ = (
+        Index("ix_student_attendance_rollups_school_month", "school_id", "month"),
+        Index("ix_student_attendance_rollups_school_student", "school_id", "student_id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    school_id = Column(
+        Integer,
+        ForeignKey("schools.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    student_id = Column(Integer, nullable=False)
+    month = Column(Date, nullable=False)
+
+    present = Column(Integer, nullable=False, server_default="0")
+    absent = Column(Integer, nullable=False, server_default="0")
+    late = Column(Integer, nullable=False, server_default="0")
+    excused = Column(Integer, nullable=False, server_default="0")
+    total = Column(Integer, nullable=False, server_default="0")
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+from sqlalchemy import (
+    Column,
+    Date,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    JSON,
+    func,
+)
+from sqlalchemy.orm import relationship
+from app.db.session import Base
+from app.core.tenancy.scoping import TenantScoped
+
+
+ATTENDANCE_STATUSES = ("present", "absent", "late", "excused")
+
+
+def _attendance_day(context):
+    # the school day the mark belongs to (UTC), when not given explicitly
+    timestamp = context.get_current_parameters().get("timestamp") or datetime.now(timezone.utc)
+    return timestamp.date()
+
+
+class AttendanceRecord(Base, TenantScoped):
+    """
+    One attendance mark for a student (class roll call, QR / RFID scan).
+
+    status: present | absent | late | excused
+    """
+
+    __tablename__ = "attendance_records"
+    __table_args__ = (
+        # analytics (live days, nightly rollups) and student history
+        Index("ix_attendance_records_school_date", "school_id", "date"),
+        Index("ix_attendance_records_school_student_date", "school_id", "student_id", "date"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    school_id = Column(
+        Integer,
+        ForeignKey("schools.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+
+    student_id = Column(
+        Integer,
+        ForeignKey("student_profiles.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+
+    classroom_id = Column(
+        Integer,
+        ForeignKey("classrooms.id", ondelete="SET NULL"),
+        nullable=True,
+        index=True,
+    )
+
+    status = Column(String(20), nullable=False, server_default="present")
+    timestamp = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    date = Column(Date, nullable=False, default=_attendance_day)
+    meta = Column(JSON, nullable=True)
+
+    created_by = Column(
+        Integer,
+        ForeignKey("users.id", ondelete="SET NULL"),
+        nullable=True,
+        index=True,
+    )
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    student = relationship("StudentProfile")
+    classroom = relationship("Classroom")
+    creator = relationship("User")
@@ -1,11 +1,16 @@
 from datetime import datetime
 
-from sqlalchemy import Column, Integer, String, JSON, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, JSON, DateTime, ForeignKey, Index
 from app.db.session import Base
+from app.core.tenancy.scoping import TenantScoped
 
 
-class BehaviorIncident(Base):
+class BehaviorIncident(Base, TenantScoped):
     __tablename__ = "behavior_incidents"
+    __table_args__ = (
+        # a student's incidents, newest first
+        Index("ix_behavior_incidents_school_student_created", "school_id", "student_id", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     school_id = Column(Integer, index=True, nullable=False)
@@ -13,9 +13,10 @@ from sqlalchemy import (
 )
 from sqlalchemy.orm import relationship
 from app.db.session import Base
+from app.core.tenancy.scoping import TenantScoped
 
 
-class FacilityRoom(Base):
+class FacilityRoom(Base, TenantScoped):
     """
     Physical room in the school.
     """
@@ -40,7 +41,7 @@ class FacilityRoom(Base):
     school = relationship("School")
 
 
-class Asset(Base):
+class Asset(Base, TenantScoped):
     """
     Asset or equipment belonging to the school.
     """
@@ -71,7 +72,7 @@ class Asset(Base):
     school = relationship("School")
 
 
-class MaintenanceRequest(Base):
+class MaintenanceRequest(Base, TenantScoped):
     """
     Maintenance ticket:
     - broken AC
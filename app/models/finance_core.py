@@ -11,12 +11,14 @@ from sqlalchemy import (
     JSON,
     UniqueConstraint,
     func,
+    Index,
 )
 from sqlalchemy.orm import relationship
 from app.db.session import Base
+from app.core.tenancy.scoping import TenantScoped
 
 
-class FeeStructure(Base):
+class FeeStructure(Base, TenantScoped):
     """
     Fee plan for a school.
     Example rows:
@@ -47,7 +49,7 @@ class FeeStructure(Base):
     school = relationship("School")
 
 
-class StudentFee(Base):
+class StudentFee(Base, TenantScoped):
     """
     Assigned fee structure per student.
     """
@@ -85,7 +87,7 @@ class StudentFee(Base):
     fee_structure = relationship("FeeStructure")
 
 
-class Discount(Base):
+class Discount(Base, TenantScoped):
     """
     Discount types:
         - sibling
@@ -137,12 +139,16 @@ class StudentDiscount(Base):
     )
 
 
-class Invoice(Base):
+class Invoice(Base, TenantScoped):
     """
     Monthly/Yearly invoice for student.
     """
 
     __tablename__ = "invoices"
+    __table_args__ = (
+        # unpaid / partial invoices of a school
+        Index("ix_invoices_school_status", "school_id", "status"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
 
@@ -5,6 +5,7 @@ from sqlalchemy import (
     Column,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
     String,
     JSON,
@@ -26,6 +27,12 @@ class Notification(Base):
     """
 
     __tablename__ = "notifications"
+    __table_args__ = (
+        # inbox pages: WHERE user_id = ? AND (created_at, id) < cursor ORDER BY created_at DESC, id DESC
+        Index("ix_notifications_user_created_id", "user_id", "created_at", "id"),
+        # unread views / counter rebuilds
+        Index("ix_notifications_user_read_created", "user_id", "is_read", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
 
@@ -83,6 +90,31 @@ class Notification(Base):
     request = relationship("Request")
 
 
+class NotificationCounter(Base):
+    """
+    Per-user unread counter, kept in step with notifications by
+    NotificationService (same transaction) so the badge is one PK lookup.
+
+    Built lazily from the notifications table on first read.
+    """
+
+    __tablename__ = "notification_counters"
+
+    user_id = Column(
+        Integer,
+        ForeignKey("users.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    unread = Column(Integer, nullable=False, server_default="0")
+
+    updated_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+        nullable=False,
+    )
+
+
 class NotificationPreference(Base):
     """
     Per-user channel preferences.
@@ -9,12 +9,14 @@ from sqlalchemy import (
     String,
     JSON,
     func,
+    Index,
 )
 from sqlalchemy.orm import relationship
 from app.db.session import Base
+from app.core.tenancy.scoping import TenantScoped
 
 
-class NurseryDailyReport(Base):
+class NurseryDailyReport(Base, TenantScoped):
     """
     Daily report for nursery students:
     - meals
@@ -25,6 +27,9 @@ class NurseryDailyReport(Base):
     """
 
     __tablename__ = "nursery_daily_reports"
+    __table_args__ = (
+        Index("ix_nursery_daily_reports_school_date", "school_id", "date"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
 
@@ -63,7 +68,7 @@ class NurseryDailyReport(Base):
     creator = relationship("User")
 
 
-class NurseryIncident(Base):
+class NurseryIncident(Base, TenantScoped):
     """
     Incidents in nursery:
     - falls
@@ -13,6 +13,7 @@ from sqlalchemy import (
 )
 from sqlalchemy.orm import relationship
 from app.db.session import Base
+from app.core.tenancy.scoping import TenantScoped
 
 
 class OrganizationType(Base):
@@ -39,7 +40,7 @@ class ProductModule(Base):
     )
 
 
-class SchoolModule(Base):
+class SchoolModule(Base, TenantScoped):
     __tablename__ = "school_modules"
     __table_args__ = (
         UniqueConstraint("school_id", "module_id", name="uq_school_module"),
@@ -87,7 +88,7 @@ class DepartmentType(Base):
     )
 
 
-class Department(Base):
+class Department(Base, TenantScoped):
     __tablename__ = "departments"
     __table_args__ = (
         UniqueConstraint("school_id", "name", name="uq_department_school_name"),
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Index,
+    Integer,
+    String,
+    JSON,
+    func,
+    text,
+)
+from app.db.session import Base
+
+
+class OutboxMessage(Base):
+    """
+    Transactional outbox.
+
+    Rows are written in the same transaction as the business change and
+    delivered afterwards by the relay (app.scripts.outbox_relay):
+    - kind = "event": domain event, `name` is the event name
+    - kind = "task":  background task, `name` is the task name
+    """
+
+    __tablename__ = "outbox_messages"
+    __table_args__ = (
+        # relay polls undelivered rows in id order
+        Index(
+            "ix_outbox_messages_pending",
+            "available_at",
+            "id",
+            postgresql_where=text("dispatched_at IS NULL"),
+            sqlite_where=text("dispatched_at IS NULL"),
+        ),
+    )
+
+    id = Column(Integer, primary_key=True)
+
+    kind = Column(String(20), nullable=False)
+    name = Column(String(150), nullable=False)
+    payload = Column(JSON, nullable=False)
+
+    attempts = Column(Integer, nullable=False, server_default="0")
+    last_error = Column(String(2000), nullable=True)
+
+    created_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False,
+    )
+    # not before: pushed forward after a failed delivery
+    available_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False,
+    )
+    dispatched_at = Column(DateTime(timezone=True), nullable=True, index=True)
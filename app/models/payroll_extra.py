@@ -2,9 +2,10 @@ from datetime import datetime
 
 from sqlalchemy import Column, Integer, String, Numeric, DateTime
 from app.db.session import Base
+from app.core.tenancy.scoping import TenantScoped
 
 
-class PayrollBonus(Base):
+class PayrollBonus(Base, TenantScoped):
     __tablename__ = "payroll_bonus"
 
     id = Column(Integer, primary_key=True, index=True)
@@ -17,7 +18,7 @@ class PayrollBonus(Base):
     created_by = Column(Integer, nullable=True)
 
 
-class PayrollDeduction(Base):
+class PayrollDeduction(Base, TenantScoped):
     __tablename__ = "payroll_deduction"
 
     id = Column(Integer, primary_key=True, index=True)
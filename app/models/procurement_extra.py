@@ -1,8 +1,9 @@
 from datetime import datetime
 from sqlalchemy import Column, Integer, String, JSON, DateTime, ForeignKey, Numeric
 from app.db.session import Base
+from app.core.tenancy.scoping import TenantScoped
 
-class Vendor(Base):
+class Vendor(Base, TenantScoped):
     __tablename__ = "vendors"
     id = Column(Integer, primary_key=True, index=True)
     school_id = Column(Integer, index=True, nullable=False)
@@ -14,7 +15,7 @@ class Vendor(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     created_by = Column(Integer, nullable=True)
 
-class RFQ(Base):
+class RFQ(Base, TenantScoped):
     __tablename__ = "rfq"
     id = Column(Integer, primary_key=True, index=True)
     school_id = Column(Integer, index=True, nullable=False)
@@ -25,7 +26,7 @@ class RFQ(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     created_by = Column(Integer, nullable=True)
 
-class Quotation(Base):
+class Quotation(Base, TenantScoped):
     __tablename__ = "quotations"
     id = Column(Integer, primary_key=True, index=True)
     school_id = Column(Integer, index=True, nullable=False)
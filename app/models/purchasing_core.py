@@ -14,9 +14,10 @@ from sqlalchemy import (
 )
 from sqlalchemy.orm import relationship
 from app.db.session import Base
+from app.core.tenancy.scoping import TenantScoped
 
 
-class Supplier(Base):
+class Supplier(Base, TenantScoped):
     __tablename__ = "suppliers"
 
     id = Column(Integer, primary_key=True, index=True)
@@ -38,7 +39,7 @@ class Supplier(Base):
     school = relationship("School")
 
 
-class PurchaseItem(Base):
+class PurchaseItem(Base, TenantScoped):
     __tablename__ = "purchase_items"
 
     id = Column(Integer, primary_key=True, index=True)
@@ -54,7 +55,7 @@ class PurchaseItem(Base):
     category = Column(String(100), nullable=True)
 
 
-class PurchaseOrder(Base):
+class PurchaseOrder(Base, TenantScoped):
     __tablename__ = "purchase_orders"
 
     id = Column(Integer, primary_key=True, index=True)
@@ -121,7 +122,7 @@ class PurchaseOrderItem(Base):
     item = relationship("PurchaseItem")
 
 
-class PurchaseRequest(Base):
+class PurchaseRequest(Base, TenantScoped):
     """
     A staff member can request items before a purchase order is created.
     """
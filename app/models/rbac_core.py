@@ -12,6 +12,7 @@ from sqlalchemy import (
 )
 from sqlalchemy.orm import relationship
 from app.db.session import Base
+from app.core.tenancy.scoping import TenantScoped
 
 
 class Permission(Base):
@@ -38,7 +39,7 @@ class Permission(Base):
     )
 
 
-class Role(Base):
+class Role(Base, TenantScoped):
     """
     A role belongs to a school and optionally to a department.
     Examples:
@@ -143,4 +144,5 @@ class UserRole(Base):
         index=True,
     )
 
+    user = relationship("User", back_populates="roles")
     role = relationship("Role", back_populates="user_roles")
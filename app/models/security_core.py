@@ -11,9 +11,10 @@ from sqlalchemy import (
 )
 from sqlalchemy.orm import relationship
 from app.db.session import Base
+from app.core.tenancy.scoping import TenantScoped
 
 
-class SecurityPost(Base):
+class SecurityPost(Base, TenantScoped):
     """
     A security post / gate / checkpoint.
     """
@@ -7,17 +7,22 @@ from sqlalchemy import (
     String,
     ForeignKey,
     func,
+    Index,
 )
 from sqlalchemy.orm import relationship
 from app.db.session import Base
+from app.core.tenancy.scoping import TenantScoped
 
 
-class StudentDismissalLog(Base):
+class StudentDismissalLog(Base, TenantScoped):
     """
     Track student dismissal / early pickup.
     """
 
     __tablename__ = "student_dismissal_logs"
+    __table_args__ = (
+        Index("ix_student_dismissal_logs_school_requested", "school_id", "requested_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
 
@@ -7,17 +7,22 @@ from sqlalchemy import (
     String,
     ForeignKey,
     func,
+    Index,
 )
 from sqlalchemy.orm import relationship
 from app.db.session import Base
+from app.core.tenancy.scoping import TenantScoped
 
 
-class GateAccessLog(Base):
+class GateAccessLog(Base, TenantScoped):
     """
     Gate access for people (students, staff, visitors, drivers).
     """
 
     __tablename__ = "gate_access_logs"
+    __table_args__ = (
+        Index("ix_gate_access_logs_school_timestamp", "school_id", "timestamp"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
 
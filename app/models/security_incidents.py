@@ -10,9 +10,10 @@ from sqlalchemy import (
 )
 from sqlalchemy.orm import relationship
 from app.db.session import Base
+from app.core.tenancy.scoping import TenantScoped
 
 
-class SecurityIncident(Base):
+class SecurityIncident(Base, TenantScoped):
     """
     Security or safety incident:
     - fire drill
@@ -10,9 +10,10 @@ from sqlalchemy import (
 )
 from sqlalchemy.orm import relationship
 from app.db.session import Base
+from app.core.tenancy.scoping import TenantScoped
 
 
-class GuardShift(Base):
+class GuardShift(Base, TenantScoped):
     """
     Guard shifts per security post.
     """
@@ -11,9 +11,10 @@ from sqlalchemy import (
 )
 from sqlalchemy.orm import relationship
 from app.db.session import Base
+from app.core.tenancy.scoping import TenantScoped
 
 
-class VehicleAccess(Base):
+class VehicleAccess(Base, TenantScoped):
     """
     Registered vehicle allowed to access school.
     """
@@ -44,7 +45,7 @@ class VehicleAccess(Base):
     )
 
 
-class VehicleAccessLog(Base):
+class VehicleAccessLog(Base, TenantScoped):
     """
     Log of vehicle entering / exiting.
     """
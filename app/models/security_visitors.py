@@ -7,9 +7,11 @@ from sqlalchemy import (
     String,
     ForeignKey,
     func,
+    Index,
 )
 from sqlalchemy.orm import relationship
 from app.db.session import Base
+from app.core.tenancy.scoping import TenantScoped
 
 
 class Visitor(Base):
@@ -39,12 +41,16 @@ class Visitor(Base):
     )
 
 
-class VisitorVisit(Base):
+class VisitorVisit(Base, TenantScoped):
     """
     Visit log for a visitor.
     """
 
     __tablename__ = "visitor_visits"
+    __table_args__ = (
+        # visitors currently on site
+        Index("ix_visitor_visits_school_status", "school_id", "status"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
 
@@ -12,9 +12,10 @@ from sqlalchemy import (
 )
 from sqlalchemy.orm import relationship
 from app.db.session import Base
+from app.core.tenancy.scoping import TenantScoped
 
 
-class Bus(Base):
+class Bus(Base, TenantScoped):
     __tablename__ = "buses"
 
     id = Column(Integer, primary_key=True, index=True)
@@ -33,7 +34,7 @@ class Bus(Base):
     school = relationship("School")
 
 
-class Driver(Base):
+class Driver(Base, TenantScoped):
     __tablename__ = "drivers"
 
     id = Column(Integer, primary_key=True, index=True)
@@ -53,7 +54,7 @@ class Driver(Base):
     school = relationship("School")
 
 
-class Route(Base):
+class Route(Base, TenantScoped):
     __tablename__ = "routes"
 
     id = Column(Integer, primary_key=True, index=True)
@@ -8,12 +8,14 @@ from sqlalchemy import (
     Integer,
     String,
     func,
+    Index,
 )
 from sqlalchemy.orm import relationship
 from app.db.session import Base
+from app.core.tenancy.scoping import TenantScoped
 
 
-class User(Base):
+class User(Base, TenantScoped):
     """
     Core system user (login account).
 
@@ -21,6 +23,10 @@ class User(Base):
     """
 
     __tablename__ = "users"
+    __table_args__ = (
+        # announcement audiences: active users of a school
+        Index("ix_users_school_active", "school_id", "is_active"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
 
@@ -43,7 +49,7 @@ class User(Base):
 
     school = relationship("School")
 
-    roles = relationship("UserRole", back_populates="role", cascade="all, delete-orphan")
+    roles = relationship("UserRole", back_populates="user", cascade="all, delete-orphan")
 
     staff_profile = relationship(
         "StaffProfile",
@@ -10,12 +10,14 @@ from sqlalchemy import (
     JSON,
     UniqueConstraint,
     func,
+    Index,
 )
 from sqlalchemy.orm import relationship
 from app.db.session import Base
+from app.core.tenancy.scoping import TenantScoped
 
 
-class WorkflowDefinition(Base):
+class WorkflowDefinition(Base, TenantScoped):
     """
     Defines a workflow for a request type in a school.
 
@@ -98,7 +100,7 @@ class WorkflowStep(Base):
     approver_role = relationship("Role")
 
 
-class Request(Base):
+class Request(Base, TenantScoped):
     """
     A workflow instance (a request).
 
@@ -109,6 +111,10 @@ class Request(Base):
     """
 
     __tablename__ = "requests"
+    __table_args__ = (
+        # inbox of pending requests per school, newest first
+        Index("ix_requests_school_status_created", "school_id", "status", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
 
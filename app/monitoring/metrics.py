@@ -1,22 +1,123 @@
 from __future__ import annotations
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
+from bisect import bisect_left
 from collections import defaultdict
 import threading
 import time
 
 
+def _log_linear_bounds(low: float, high: float, per_doubling: int) -> List[float]:
+    """
+    Bucket upper bounds growing by 2**(1/per_doubling) from low to high.
+    per_doubling=4 -> ~19% wide buckets -> percentile error under ~10%.
+    """
+    factor = 2 ** (1.0 / per_doubling)
+    bounds = []
+    value = low
+    while value < high:
+        bounds.append(round(value, 4))
+        value *= factor
+    bounds.append(high)
+    return bounds
+
+
+# 0.05ms .. 2min, shared by every latency series (~90 buckets + overflow)
+HISTOGRAM_BOUNDS_MS: List[float] = _log_linear_bounds(0.05, 120_000.0, 4)
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram: constant memory per series regardless of traffic.
+
+    counts[i] holds samples <= HISTOGRAM_BOUNDS_MS[i] (and above the previous
+    bound); the final slot is the +Inf overflow bucket.
+    """
+
+    __slots__ = ("counts", "count", "sum", "min", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(HISTOGRAM_BOUNDS_MS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = float("inf")
+        self.max = float("-inf")
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(HISTOGRAM_BOUNDS_MS, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def copy(self) -> "Histogram":
+        h = Histogram.__new__(Histogram)
+        h.counts = list(self.counts)
+        h.count = self.count
+        h.sum = self.sum
+        h.min = self.min
+        h.max = self.max
+        return h
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimate the q-quantile by linear interpolation inside its bucket,
+        clamped to the observed min/max.
+        """
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, c in enumerate(self.counts):
+            if not c:
+                continue
+            if seen + c >= rank:
+                lower = HISTOGRAM_BOUNDS_MS[i - 1] if i > 0 else 0.0
+                upper = HISTOGRAM_BOUNDS_MS[i] if i < len(HISTOGRAM_BOUNDS_MS) else self.max
+                estimate = lower + (upper - lower) * ((rank - seen) / c)
+                return min(max(estimate, self.min), self.max)
+            seen += c
+        return self.max
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "min_ms": self.min,
+            "max_ms": self.max,
+            "avg_ms": self.sum / self.count,
+            "p50_ms": self.quantile(0.50),
+            "p90_ms": self.quantile(0.90),
+            "p99_ms": self.quantile(0.99),
+        }
+
+
+class _Shard:
+    __slots__ = ("lock", "counters", "gauges", "histograms")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = defaultdict(int)
+        self.gauges: Dict[str, float] = {}
+        self.histograms: Dict[str, Histogram] = {}
+
+
 class Metrics:
     """
     Very simple in-memory metrics collector.
 
     - Counters: increment-only values
-    - Timers: list of observed durations (ms)
+    - Gauges: last-set values (pool sizes, queue depths, ...)
+    - Timers: fixed-bucket histograms of observed durations (ms)
+
+    Series are spread over lock shards by key, so request threads rarely
+    contend and snapshot() only holds one shard lock at a time while copying.
     """
 
+    SHARDS = 16
+
     def __init__(self):
-        self._counters = defaultdict(int)
-        self._timers = defaultdict(list)
-        self._lock = threading.Lock()
+        self._shards = [_Shard() for _ in range(self.SHARDS)]
 
     def _build_key(self, name: str, labels: Optional[Dict[str, Any]]) -> str:
         if not labels:
@@ -25,34 +126,56 @@ class Metrics:
         parts = [f"{k}={labels[k]}" for k in sorted(labels.keys())]
         return f"{name}|{'|'.join(parts)}"
 
+    def _shard(self, key: str) -> _Shard:
+        return self._shards[hash(key) % self.SHARDS]
+
     def inc(self, name: str, value: int = 1, labels: Optional[Dict[str, Any]] = None) -> None:
         key = self._build_key(name, labels)
-        with self._lock:
-            self._counters[key] += value
+        shard = self._shard(key)
+        with shard.lock:
+            shard.counters[key] += value
+
+    def set_gauge(self, name: str, value: float, labels: Optional[Dict[str, Any]] = None) -> None:
+        key = self._build_key(name, labels)
+        shard = self._shard(key)
+        with shard.lock:
+            shard.gauges[key] = value
 
     def observe(self, name: str, value_ms: float, labels: Optional[Dict[str, Any]] = None) -> None:
         key = self._build_key(name, labels)
-        with self._lock:
-            self._timers[key].append(float(value_ms))
+        shard = self._shard(key)
+        with shard.lock:
+            hist = shard.histograms.get(key)
+            if hist is None:
+                hist = shard.histograms[key] = Histogram()
+            hist.observe(float(value_ms))
+
+    def collect(self) -> Dict[str, Any]:
+        """
+        Raw copy of every series (histograms included), one shard lock at a time.
+        """
+        counters: Dict[str, int] = {}
+        gauges: Dict[str, float] = {}
+        histograms: Dict[str, Histogram] = {}
+        for shard in self._shards:
+            with shard.lock:
+                counters.update(shard.counters)
+                gauges.update(shard.gauges)
+                for key, hist in shard.histograms.items():
+                    histograms[key] = hist.copy()
+        return {"counters": counters, "gauges": gauges, "histograms": histograms}
 
     def snapshot(self) -> Dict[str, Any]:
-        with self._lock:
-            counters = dict(self._counters)
-            timers_summary: Dict[str, Any] = {}
-            for key, values in self._timers.items():
-                if not values:
-                    continue
-                vmin = min(values)
-                vmax = max(values)
-                avg = sum(values) / len(values)
-                timers_summary[key] = {
-                    "count": len(values),
-                    "min_ms": vmin,
-                    "max_ms": vmax,
-                    "avg_ms": avg,
-                }
+        raw = self.collect()
+        # percentile math happens outside every lock
+        timers_summary = {
+            key: hist.summary()
+            for key, hist in raw["histograms"].items()
+            if hist.count
+        }
         return {
-            "counters": counters,
+            "counters": raw["counters"],
+            "gauges": raw["gauges"],
             "timers": timers_summary,
             "generated_at": time.time(),
         }
@@ -0,0 +1,291 @@
+"""
+Cross-process metrics aggregation + Prometheus text exposition.
+
+Every process (uvicorn workers, cron scripts) periodically writes its raw
+metrics to METRICS_MULTIPROC_DIR/metrics_<pid>.json (atomic rename). A
+scrape merges all of them:
+
+- counters and histograms are summed across processes (dead ones included,
+  so counters never go backwards after a worker recycle)
+- gauges are reported per live process with a `pid` label
+
+Files of dead processes are folded into metrics_archive.json on scrape so
+the directory does not grow with every worker/cron run.
+
+Without METRICS_MULTIPROC_DIR only the current process is exposed.
+"""
+from __future__ import annotations
+from typing import Any, Dict, List, Optional, Tuple
+import atexit
+import fcntl
+import json
+import math
+import os
+import re
+import threading
+
+from app.monitoring.metrics import HISTOGRAM_BOUNDS_MS, Histogram, metrics
+
+METRICS_MULTIPROC_DIR = os.getenv("METRICS_MULTIPROC_DIR", "")
+METRICS_FLUSH_SECONDS = float(os.getenv("METRICS_FLUSH_SECONDS", "5"))
+
+ARCHIVE_FILE = "metrics_archive.json"
+LOCK_FILE = ".metrics.lock"
+
+# Exported `le` bounds: every doubling of the internal buckets (exact cumulative counts)
+EXPORT_BOUND_INDEXES = list(range(0, len(HISTOGRAM_BOUNDS_MS), 4))
+
+
+# ---------------------------------------------------------------------------
+# Serialization
+# ---------------------------------------------------------------------------
+def _dump(raw: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "counters": raw["counters"],
+        "gauges": raw["gauges"],
+        "histograms": {
+            key: {"counts": h.counts, "count": h.count, "sum": h.sum, "min": h.min, "max": h.max}
+            for key, h in raw["histograms"].items()
+        },
+    }
+
+
+def _load_histogram(data: Dict[str, Any]) -> Histogram:
+    h = Histogram()
+    if len(data["counts"]) == len(h.counts):
+        h.counts = list(data["counts"])
+    else:
+        # bucket layout changed between deploys: keep totals, drop the shape
+        h.counts[-1] = data["count"]
+    h.count = data["count"]
+    h.sum = data["sum"]
+    h.min = data["min"]
+    h.max = data["max"]
+    return h
+
+
+def _merge_into(total: Dict[str, Any], part: Dict[str, Any]) -> None:
+    for key, value in part.get("counters", {}).items():
+        total["counters"][key] = total["counters"].get(key, 0) + value
+    for key, data in part.get("histograms", {}).items():
+        h = data if isinstance(data, Histogram) else _load_histogram(data)
+        acc = total["histograms"].get(key)
+        if acc is None:
+            total["histograms"][key] = h.copy()
+            continue
+        acc.counts = [a + b for a, b in zip(acc.counts, h.counts)]
+        acc.count += h.count
+        acc.sum += h.sum
+        acc.min = min(acc.min, h.min)
+        acc.max = max(acc.max, h.max)
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+# ---------------------------------------------------------------------------
+# Writer side
+# ---------------------------------------------------------------------------
+def flush_metrics() -> None:
+    if not METRICS_MULTIPROC_DIR:
+        return
+    os.makedirs(METRICS_MULTIPROC_DIR, exist_ok=True)
+    path = os.path.join(METRICS_MULTIPROC_DIR, f"metrics_{os.getpid()}.json")
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(_dump(metrics.collect()), f)
+    os.replace(tmp, path)
+
+
+_flusher: Optional[threading.Thread] = None
+
+
+def start_metrics_flusher() -> None:
+    """
+    Start the per-process flush thread (no-op without METRICS_MULTIPROC_DIR).
+    Also flushes once at interpreter exit, which covers one-shot cron scripts.
+    """
+    global _flusher
+    if not METRICS_MULTIPROC_DIR or _flusher is not None:
+        return
+
+    stop = threading.Event()
+
+    def loop():
+        while not stop.wait(METRICS_FLUSH_SECONDS):
+            try:
+                flush_metrics()
+            except Exception:
+                pass
+
+    _flusher = threading.Thread(target=loop, name="metrics-flusher", daemon=True)
+    _flusher.start()
+    atexit.register(flush_metrics)
+
+
+# ---------------------------------------------------------------------------
+# Reader side
+# ---------------------------------------------------------------------------
+def _read_json(path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _compact_dead(entries: List[Tuple[int, str]]) -> None:
+    """
+    Fold counters/histograms of dead processes into the archive file.
+    Caller holds the directory lock.
+    """
+    dead = [(pid, path) for pid, path in entries if not _pid_alive(pid)]
+    if not dead:
+        return
+
+    archive_path = os.path.join(METRICS_MULTIPROC_DIR, ARCHIVE_FILE)
+    total = {"counters": {}, "gauges": {}, "histograms": {}}
+    archived = _read_json(archive_path)
+    if archived:
+        _merge_into(total, archived)
+    for _, path in dead:
+        part = _read_json(path)
+        if part:
+            _merge_into(total, part)
+
+    tmp = archive_path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(_dump(total), f)
+    os.replace(tmp, archive_path)
+    for _, path in dead:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def aggregate() -> Dict[str, Any]:
+    """
+    Merged view: {"counters", "histograms", "gauges": {pid: {key: value}}}.
+    """
+    own_pid = os.getpid()
+    total: Dict[str, Any] = {"counters": {}, "gauges": {}, "histograms": {}}
+
+    local = metrics.collect()
+    _merge_into(total, local)
+    total["gauges"][own_pid] = local["gauges"]
+
+    if not METRICS_MULTIPROC_DIR or not os.path.isdir(METRICS_MULTIPROC_DIR):
+        return total
+
+    lock_path = os.path.join(METRICS_MULTIPROC_DIR, LOCK_FILE)
+    with open(lock_path, "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            entries = []
+            for name in os.listdir(METRICS_MULTIPROC_DIR):
+                m = re.fullmatch(r"metrics_(\d+)\.json", name)
+                if m and int(m.group(1)) != own_pid:
+                    entries.append((int(m.group(1)), os.path.join(METRICS_MULTIPROC_DIR, name)))
+
+            _compact_dead(entries)
+
+            archived = _read_json(os.path.join(METRICS_MULTIPROC_DIR, ARCHIVE_FILE))
+            if archived:
+                _merge_into(total, archived)
+
+            for pid, path in entries:
+                part = _read_json(path)
+                if not part:
+                    continue
+                _merge_into(total, part)
+                total["gauges"][pid] = part.get("gauges", {})
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+    return total
+
+
+# ---------------------------------------------------------------------------
+# Prometheus text format 0.0.4
+# ---------------------------------------------------------------------------
+def _split_key(key: str) -> Tuple[str, Dict[str, str]]:
+    name, *parts = key.split("|")
+    labels = {}
+    for part in parts:
+        k, _, v = part.partition("=")
+        labels[k] = v
+    return name, labels
+
+
+def _metric_name(name: str) -> str:
+    name = re.sub(r"[^a-zA-Z0-9_:]", "_", name)
+    return name if re.match(r"[a-zA-Z_:]", name) else "_" + name
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labels: Dict[str, Any]) -> str:
+    if not labels:
+        return ""
+    inner = ",".join(f'{_metric_name(k)}="{_escape(str(v))}"' for k, v in sorted(labels.items()))
+    return "{" + inner + "}"
+
+
+def _number(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if value == -math.inf:
+        return "-Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render_prometheus(data: Optional[Dict[str, Any]] = None) -> str:
+    data = data if data is not None else aggregate()
+    families: Dict[str, Dict[str, Any]] = {}
+
+    def family(name: str, kind: str) -> List[str]:
+        fam = families.setdefault(name, {"type": kind, "lines": []})
+        return fam["lines"]
+
+    for key, value in sorted(data["counters"].items()):
+        name, labels = _split_key(key)
+        name = _metric_name(name)
+        family(name, "counter").append(f"{name}{_labels(labels)} {_number(value)}")
+
+    for pid, gauges in sorted(data["gauges"].items()):
+        for key, value in sorted(gauges.items()):
+            name, labels = _split_key(key)
+            name = _metric_name(name)
+            labels["pid"] = pid
+            family(name, "gauge").append(f"{name}{_labels(labels)} {_number(value)}")
+
+    for key, hist in sorted(data["histograms"].items()):
+        name, labels = _split_key(key)
+        name = _metric_name(name)
+        lines = family(name, "histogram")
+        cumulative = 0
+        next_idx = 0
+        for idx in EXPORT_BOUND_INDEXES:
+            cumulative += sum(hist.counts[next_idx: idx + 1])
+            next_idx = idx + 1
+            le = dict(labels, le=_number(HISTOGRAM_BOUNDS_MS[idx]))
+            lines.append(f"{name}_bucket{_labels(le)} {cumulative}")
+        lines.append(f"{name}_bucket{_labels(dict(labels, le='+Inf'))} {hist.count}")
+        lines.append(f"{name}_sum{_labels(labels)} {_number(hist.sum)}")
+        lines.append(f"{name}_count{_labels(labels)} {hist.count}")
+
+    out = []
+    for name, fam in families.items():
+        out.append(f"# TYPE {name} {fam['type']}")
+        out.extend(fam["lines"])
+    return "\n".join(out) + "\n"
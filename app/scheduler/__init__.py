@@ -1,13 +1,88 @@
+import time
+from typing import Dict, Optional, Tuple
+
+from apscheduler.events import (
+    EVENT_JOB_ERROR,
+    EVENT_JOB_EXECUTED,
+    EVENT_JOB_MAX_INSTANCES,
+    EVENT_JOB_MISSED,
+    EVENT_JOB_SUBMITTED,
+)
 from apscheduler.schedulers.background import BackgroundScheduler
 from app.core.logging_config import logger
 from app.monitoring.metrics import metrics
 from app.scheduler.jobs.daily import register_daily_jobs
 from app.scheduler.jobs.frequent import register_frequent_jobs
+from app.scheduler.leader import SCHEDULER_ENABLED, LeaderElector, make_lease
 
-scheduler = BackgroundScheduler(timezone="UTC")
+scheduler = BackgroundScheduler(
+    timezone="UTC",
+    # one run at a time per job; a backlog of missed runs collapses into one
+    job_defaults={"max_instances": 1, "coalesce": True, "misfire_grace_time": 300},
+)
 
 register_daily_jobs(scheduler)
 register_frequent_jobs(scheduler)
 
-scheduler.start()
-logger.info("In-process scheduler started")
+# (job id, scheduled run time) -> submitted at
+_started: Dict[Tuple[str, object], float] = {}
+
+
+def _on_job_event(event):
+    if event.code == EVENT_JOB_SUBMITTED:
+        now = time.perf_counter()
+        for run_time in event.scheduled_run_times:
+            _started[(event.job_id, run_time)] = now
+        return
+    if event.code == EVENT_JOB_MAX_INSTANCES:
+        # previous run still going: this one is skipped, not stacked
+        metrics.inc("scheduler_overlap_skipped_total", labels={"job": event.job_id})
+        return
+    if event.code == EVENT_JOB_MISSED:
+        metrics.inc("scheduler_missed_total", labels={"job": event.job_id})
+        return
+
+    started = _started.pop((event.job_id, event.scheduled_run_time), None)
+    if started is not None:
+        metrics.observe(
+            "scheduler_job_duration_ms",
+            (time.perf_counter() - started) * 1000.0,
+            labels={"job": event.job_id},
+        )
+    if event.code == EVENT_JOB_ERROR:
+        metrics.inc("scheduler_failures_total", labels={"job": event.job_id})
+
+
+scheduler.add_listener(
+    _on_job_event,
+    EVENT_JOB_SUBMITTED | EVENT_JOB_EXECUTED | EVENT_JOB_ERROR | EVENT_JOB_MAX_INSTANCES | EVENT_JOB_MISSED,
+)
+
+_elector: Optional[LeaderElector] = None
+
+
+def start_scheduler():
+    """
+    Startup hook: start paused and run jobs only while this worker holds the
+    scheduling lease (app.scheduler.leader). SCHEDULER_ENABLED=false opts the
+    worker out entirely.
+    """
+    global _elector
+    if not SCHEDULER_ENABLED:
+        logger.info("In-process scheduler disabled (SCHEDULER_ENABLED=false)")
+        return
+    if _elector is not None:
+        return
+    scheduler.start(paused=True)
+    _elector = LeaderElector(make_lease(), on_elected=scheduler.resume, on_lost=scheduler.pause)
+    _elector.start()
+    logger.info("In-process scheduler started (paused until elected)")
+
+
+def stop_scheduler():
+    global _elector
+    if _elector is not None:
+        _elector.stop()
+        _elector = None
+    if scheduler.running:
+        scheduler.shutdown(wait=False)
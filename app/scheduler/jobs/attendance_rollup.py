@@ -0,0 +1,122 @@
+"""
+Nightly attendance rollups.
+
+rollup_attendance() aggregates AttendanceRecord rows into AttendanceDailyRollup
+(school, day, classroom) and StudentAttendanceRollup (school, student, month)
+for every closed day (up to yesterday). Each run rebuilds the last
+ATTENDANCE_ROLLUP_REBUILD_DAYS days as well, so late corrections are picked
+up; the first run backfills from the oldest attendance row.
+
+Readers (AnalyticsService) take rollups up to the school's latest rolled-up
+day and read later days (today, or anything the job has not reached yet) live
+from attendance_records, so results are exact and the live part never covers
+more than a day or two.
+
+Plain SQL only (INSERT ... SELECT per day range / per month), so it runs on
+PostgreSQL and SQLite alike.
+"""
+from __future__ import annotations
+from typing import Optional
+from datetime import date, datetime, timedelta, timezone
+import os
+import time
+
+from sqlalchemy import case, delete, func, insert, literal, select
+from sqlalchemy.orm import Session
+
+from app.core.logging_config import logger
+from app.core.tenancy.scoping import all_tenants
+from app.db.session import SessionLocal
+from app.models import AttendanceDailyRollup, AttendanceRecord, StudentAttendanceRollup
+from app.models.attendance_core import ATTENDANCE_STATUSES as STATUSES
+from app.monitoring.metrics import metrics
+
+ATTENDANCE_ROLLUP_REBUILD_DAYS = int(os.getenv("ATTENDANCE_ROLLUP_REBUILD_DAYS", "7"))
+
+
+def _status_counts():
+    return [
+        func.sum(case((AttendanceRecord.status == status, 1), else_=0)).label(status)
+        for status in STATUSES
+    ] + [func.count(AttendanceRecord.id).label("total")]
+
+
+def rollup_attendance(db: Session, through: Optional[date] = None) -> int:
+    """
+    Rebuild rollups up to `through` (default: yesterday, UTC) in one
+    transaction. Returns the number of days rebuilt.
+    """
+    end = through or (datetime.now(timezone.utc).date() - timedelta(days=1))
+    with all_tenants():
+        last = db.query(func.max(AttendanceDailyRollup.date)).scalar()
+        if last is None:
+            start = db.query(func.min(AttendanceRecord.date)).scalar()
+            if start is None:
+                return 0
+        else:
+            start = min(last + timedelta(days=1), end - timedelta(days=ATTENDANCE_ROLLUP_REBUILD_DAYS - 1))
+        if start > end:
+            return 0
+
+        db.execute(
+            delete(AttendanceDailyRollup)
+            .where(AttendanceDailyRollup.date >= start)
+            .where(AttendanceDailyRollup.date <= end)
+        )
+        db.execute(
+            insert(AttendanceDailyRollup).from_select(
+                ["school_id", "date", "classroom_id", *STATUSES, "total"],
+                select(
+                    AttendanceRecord.school_id,
+                    AttendanceRecord.date,
+                    AttendanceRecord.classroom_id,
+                    *_status_counts(),
+                )
+                .where(AttendanceRecord.date >= start)
+                .where(AttendanceRecord.date <= end)
+                .group_by(AttendanceRecord.school_id, AttendanceRecord.date, AttendanceRecord.classroom_id),
+            )
+        )
+
+        # month rows are rebuilt whole: from the first of start's month
+        month = start.replace(day=1)
+        db.execute(delete(StudentAttendanceRollup).where(StudentAttendanceRollup.month >= month))
+        while month <= end:
+            next_month = (month + timedelta(days=32)).replace(day=1)
+            db.execute(
+                insert(StudentAttendanceRollup).from_select(
+                    ["school_id", "student_id", "month", *STATUSES, "total"],
+                    select(
+                        AttendanceRecord.school_id,
+                        AttendanceRecord.student_id,
+                        literal(month).label("month"),
+                        *_status_counts(),
+                    )
+                    .where(AttendanceRecord.date >= month)
+                    .where(AttendanceRecord.date < next_month)
+                    .where(AttendanceRecord.date <= end)
+                    .group_by(AttendanceRecord.school_id, AttendanceRecord.student_id),
+                )
+            )
+            month = next_month
+    db.commit()
+    return (end - start).days + 1
+
+
+def run_rollup_job() -> int:
+    """
+    Scheduler entry point: own session.
+    """
+    db = SessionLocal()
+    start = time.perf_counter()
+    try:
+        days = rollup_attendance(db)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+    metrics.observe("attendance_rollup_ms", (time.perf_counter() - start) * 1000.0)
+    logger.info(f"Attendance rollup rebuilt {days} day(s)")
+    return days
+
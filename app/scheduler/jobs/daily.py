@@ -1,13 +1,33 @@
+import os
+
 from apscheduler.schedulers.base import BaseScheduler
 from app.core.logging_config import logger
 from app.monitoring.metrics import metrics
 
+NOTIFICATION_DAILY_DIGEST_HOUR = int(os.getenv("NOTIFICATION_DAILY_DIGEST_HOUR", "16"))  # UTC
+ATTENDANCE_ROLLUP_HOUR = int(os.getenv("ATTENDANCE_ROLLUP_HOUR", "0"))  # UTC
+
 
 def _daily_maintenance_job():
     logger.info("Running daily maintenance job (in-process scheduler)")
     metrics.inc("scheduler_runs_total", labels={"job": "daily_maintenance"})
 
 
+def _daily_digest_job():
+    from app.services.notification_digest import run_digest_job
+
+    sent = run_digest_job("daily")
+    logger.info(f"Daily notification digests sent: {sent}")
+    metrics.inc("scheduler_runs_total", labels={"job": "daily_digest"})
+
+
+def _attendance_rollup_job():
+    from app.scheduler.jobs.attendance_rollup import run_rollup_job
+
+    run_rollup_job()
+    metrics.inc("scheduler_runs_total", labels={"job": "attendance_rollup"})
+
+
 def register_daily_jobs(scheduler: BaseScheduler):
     scheduler.add_job(
         _daily_maintenance_job,
@@ -17,3 +37,19 @@ def register_daily_jobs(scheduler: BaseScheduler):
         id="daily_maintenance",
         replace_existing=True,
     )
+    scheduler.add_job(
+        _daily_digest_job,
+        "cron",
+        hour=NOTIFICATION_DAILY_DIGEST_HOUR,
+        minute=0,
+        id="daily_notification_digest",
+        replace_existing=True,
+    )
+    scheduler.add_job(
+        _attendance_rollup_job,
+        "cron",
+        hour=ATTENDANCE_ROLLUP_HOUR,
+        minute=15,
+        id="attendance_rollup",
+        replace_existing=True,
+    )
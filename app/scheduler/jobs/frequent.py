@@ -8,6 +8,14 @@ def _five_min_health_job():
     metrics.inc("scheduler_runs_total", labels={"job": "health_probe"})
 
 
+def _hourly_digest_job():
+    from app.services.notification_digest import run_digest_job
+
+    sent = run_digest_job("hourly")
+    logger.info(f"Hourly notification digests sent: {sent}")
+    metrics.inc("scheduler_runs_total", labels={"job": "hourly_digest"})
+
+
 def register_frequent_jobs(scheduler: BaseScheduler):
     scheduler.add_job(
         _five_min_health_job,
@@ -16,3 +24,10 @@ def register_frequent_jobs(scheduler: BaseScheduler):
         id="five_min_health",
         replace_existing=True,
     )
+    scheduler.add_job(
+        _hourly_digest_job,
+        "cron",
+        minute=0,
+        id="hourly_notification_digest",
+        replace_existing=True,
+    )
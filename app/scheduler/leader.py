@@ -0,0 +1,196 @@
+"""
+Leader election for the in-process scheduler.
+
+Every API worker builds the scheduler, but only the worker holding the
+scheduling lease runs jobs; the others keep it paused and retry the lease
+every SCHEDULER_LEASE_CHECK_SECONDS, so a new leader takes over when the
+current one exits. The cron scripts (app/scripts/cron) take the same lease and
+skip when a worker already owns scheduling.
+
+Leases (SCHEDULER_LEADER_BACKEND):
+- file (default): flock on SCHEDULER_LOCK_FILE; one leader per host, freed by
+  the kernel when the process dies
+- postgres: pg_try_advisory_lock on a dedicated connection; one leader per
+  database, freed when that connection closes
+"""
+from __future__ import annotations
+from typing import Callable, Optional
+import fcntl
+import os
+import threading
+
+from app.core.logging_config import logger
+from app.monitoring.metrics import metrics
+
+SCHEDULER_ENABLED = os.getenv("SCHEDULER_ENABLED", "true").lower() == "true"
+SCHEDULER_LEADER_BACKEND = os.getenv("SCHEDULER_LEADER_BACKEND", "file")
+SCHEDULER_LOCK_FILE = os.getenv("SCHEDULER_LOCK_FILE", "/tmp/coreon-scheduler.lock")
+SCHEDULER_ADVISORY_LOCK_KEY = int(os.getenv("SCHEDULER_ADVISORY_LOCK_KEY", "727100"))
+SCHEDULER_LEASE_CHECK_SECONDS = float(os.getenv("SCHEDULER_LEASE_CHECK_SECONDS", "15"))
+
+
+class FileLease:
+    def __init__(self, path: str = SCHEDULER_LOCK_FILE):
+        self.path = path
+        self._fd: Optional[int] = None
+
+    def try_acquire(self) -> bool:
+        if self._fd is not None:
+            return True
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        os.ftruncate(fd, 0)
+        os.write(fd, str(os.getpid()).encode())
+        self._fd = fd
+        return True
+
+    def is_held(self) -> bool:
+        return self._fd is not None
+
+    def release(self) -> None:
+        if self._fd is None:
+            return
+        try:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        finally:
+            os.close(self._fd)
+            self._fd = None
+
+
+class PostgresAdvisoryLease:
+    def __init__(self, engine, key: int = SCHEDULER_ADVISORY_LOCK_KEY):
+        self.engine = engine
+        self.key = key
+        self._conn = None
+
+    def try_acquire(self) -> bool:
+        if self._conn is not None:
+            return True
+        raw = self.engine.raw_connection()
+        raw.detach()  # session-level lock: lives exactly as long as this connection
+        try:
+            raw.driver_connection.autocommit = True
+            with raw.driver_connection.cursor() as cur:
+                cur.execute("SELECT pg_try_advisory_lock(%s)", (self.key,))
+                acquired = bool(cur.fetchone()[0])
+        except Exception:
+            raw.close()
+            raise
+        if not acquired:
+            raw.close()
+            return False
+        self._conn = raw
+        return True
+
+    def is_held(self) -> bool:
+        if self._conn is None:
+            return False
+        try:
+            with self._conn.driver_connection.cursor() as cur:
+                cur.execute("SELECT 1")
+            return True
+        except Exception:
+            # connection gone: so is the lock
+            self._close()
+            return False
+
+    def release(self) -> None:
+        if self._conn is None:
+            return
+        try:
+            with self._conn.driver_connection.cursor() as cur:
+                cur.execute("SELECT pg_advisory_unlock(%s)", (self.key,))
+        except Exception:
+            pass
+        self._close()
+
+    def _close(self) -> None:
+        try:
+            self._conn.close()
+        except Exception:
+            pass
+        self._conn = None
+
+
+def make_lease():
+    if SCHEDULER_LEADER_BACKEND == "postgres":
+        from app.db.session import engine
+        return PostgresAdvisoryLease(engine)
+    return FileLease()
+
+
+class LeaderElector:
+    """
+    Background thread that keeps trying the lease and calls on_elected /
+    on_lost on transitions.
+    """
+
+    def __init__(
+        self,
+        lease,
+        on_elected: Callable[[], None],
+        on_lost: Callable[[], None],
+        interval: float = SCHEDULER_LEASE_CHECK_SECONDS,
+    ):
+        self.lease = lease
+        self.on_elected = on_elected
+        self.on_lost = on_lost
+        self.interval = interval
+        self.is_leader = False
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="scheduler-leader", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        metrics.set_gauge("scheduler_is_leader", 0)
+        while not self._stop.is_set():
+            try:
+                if not self.is_leader and self.lease.try_acquire():
+                    self.is_leader = True
+                    metrics.set_gauge("scheduler_is_leader", 1)
+                    metrics.inc("scheduler_leader_elections_total")
+                    logger.info(f"Scheduler leadership acquired (pid {os.getpid()})")
+                    self.on_elected()
+                elif self.is_leader and not self.lease.is_held():
+                    self._lose()
+                    logger.warning("Scheduler leadership lost")
+            except Exception:
+                logger.error("[Scheduler] leader election failed", exc_info=True)
+            self._stop.wait(self.interval)
+
+    def _lose(self) -> None:
+        self.is_leader = False
+        metrics.set_gauge("scheduler_is_leader", 0)
+        self.on_lost()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        if self.is_leader:
+            self._lose()
+        self.lease.release()
+
+
+def run_if_leader(job: str, fn: Callable[[], None]) -> bool:
+    """
+    Run fn() only if no other process owns scheduling (cron entry points).
+    Returns whether it ran.
+    """
+    lease = make_lease()
+    if not lease.try_acquire():
+        logger.info(f"CRON: {job} skipped, another process owns scheduling")
+        metrics.inc("scheduler_skipped_total", labels={"job": job, "reason": "not_leader"})
+        return False
+    try:
+        fn()
+    finally:
+        lease.release()
+    return True
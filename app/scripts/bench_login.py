@@ -0,0 +1,136 @@
+"""
+Login-storm benchmark: p99 of non-login routes during a burst of logins.
+
+Simulates N users logging in at once while a steady stream of ordinary
+(sync, threadpool-backed) requests hits a stub route, then reports the
+stub route's latency percentiles for:
+
+- legacy:  sync `def` login calling pwd_context.verify on the anyio threadpool
+- current: async login using verify_password_async (dedicated executor +
+           admission control)
+
+Requests are driven through the ASGI interface directly (no DB, no sockets).
+
+Usage:
+    python -m app.scripts.bench_login [logins] [bcrypt_rounds]
+"""
+import asyncio
+import logging
+import sys
+import time
+
+from fastapi import FastAPI
+
+from app.core import passwords
+
+
+def _build_app(mode: str, stored_hash: str) -> FastAPI:
+    app = FastAPI()
+
+    if mode == "legacy":
+        @app.post("/login")
+        def login():
+            return {"ok": passwords.verify_password("secret", stored_hash)}
+    else:
+        @app.post("/login")
+        async def login():
+            try:
+                valid, _ = await passwords.verify_password_async("secret", stored_hash)
+            except passwords.LoginAdmissionError:
+                return {"ok": False, "rejected": True}
+            return {"ok": valid}
+
+    @app.get("/stub")
+    def stub():
+        return {"status": "ok"}
+
+    return app
+
+
+async def _call(app: FastAPI, method: str, path: str) -> float:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+    }
+    sent = False
+
+    async def receive():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await asyncio.sleep(3600)
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        pass
+
+    start = time.perf_counter()
+    await app(scope, receive, send)
+    return (time.perf_counter() - start) * 1000.0
+
+
+async def _run(app: FastAPI, logins: int):
+    samples = []
+    done = asyncio.Event()
+
+    async def background_traffic():
+        # ~20 req/s per client, 5 clients: steady load, not a CPU hog
+        while not done.is_set():
+            samples.append(await _call(app, "GET", "/stub"))
+            await asyncio.sleep(0.05)
+
+    traffic = [asyncio.create_task(background_traffic()) for _ in range(5)]
+    start = time.perf_counter()
+    await asyncio.gather(*(_call(app, "POST", "/login") for _ in range(logins)))
+    wall = time.perf_counter() - start
+    done.set()
+    await asyncio.gather(*traffic)
+
+    samples.sort()
+    return {
+        "p50_ms": samples[int(len(samples) * 0.50)],
+        "p99_ms": samples[int(len(samples) * 0.99)],
+        "samples": len(samples),
+        "burst_s": wall,
+    }
+
+
+def main():
+    logins = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    logging.getLogger("coreon.api").setLevel(logging.WARNING)
+    # never reject in the benchmark: we want to measure queueing, not shedding
+    passwords.LOGIN_ADMISSION_TIMEOUT_SECONDS = 3600
+
+    # same cost for stored hash and context, so no rehash happens mid-benchmark
+    # (must run before the hash executor is created: its workers copy the
+    # context configuration when they start)
+    passwords.pwd_context.update(bcrypt__rounds=rounds)
+    stored_hash = passwords.pwd_context.hash("secret")
+
+    for mode in ("legacy", "current"):
+        app = _build_app(mode, stored_hash)
+        res = asyncio.run(_run(app, logins))
+        passwords._login_slots = None  # semaphore is bound to the finished loop
+        print(
+            f"{mode:>8}: non-login p50={res['p50_ms']:.1f}ms p99={res['p99_ms']:.1f}ms "
+            f"({res['samples']} samples, {logins} logins in {res['burst_s']:.1f}s)"
+        )
+
+    passwords.shutdown_hash_executor()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Before/after latency benchmark for the HTTP middleware stack.
+
+Drives a stub route through the ASGI interface directly (no sockets, no
+uvicorn) so the numbers isolate middleware overhead:
+
+- bare:    no middleware (baseline)
+- legacy:  RequestIDMiddleware + TenantMiddleware + LoggingMiddleware
+           (three BaseHTTPMiddleware layers)
+- current: RequestContextMiddleware (single pure-ASGI layer)
+
+Reported per stack:
+- latency p50/p99 and overhead (mean latency minus bare) from a sequential
+  pass, so no request's time includes waiting behind others
+- throughput from a concurrent pass
+
+The stub awaits like a real handler (BENCH_STUB_IO_MS of simulated I/O,
+default 0 = a bare yield); a route that never yields would let each
+request run to completion in one go and hide the cost of interleaving.
+
+Usage:
+    python -m app.scripts.bench_middleware [requests] [concurrency]
+"""
+import asyncio
+import logging
+import os
+import sys
+import time
+
+from fastapi import FastAPI
+
+from app.middleware.logging_middleware import LoggingMiddleware
+from app.middleware.request_context import RequestContextMiddleware
+from app.middleware.request_id import RequestIDMiddleware
+from app.middleware.tenant_middleware import TenantMiddleware
+
+BENCH_STUB_IO_MS = float(os.getenv("BENCH_STUB_IO_MS", "0"))
+
+
+def _build_app(middlewares) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/stub")
+    async def stub():
+        await asyncio.sleep(BENCH_STUB_IO_MS / 1000.0)
+        return {"status": "ok"}
+
+    for mw in middlewares:
+        app.add_middleware(mw)
+    return app
+
+
+async def _call(app: FastAPI) -> float:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/stub",
+        "raw_path": b"/stub",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"bench"), (b"x-school-id", b"1")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    start = time.perf_counter()
+    await app(scope, receive, send)
+    return (time.perf_counter() - start) * 1000.0
+
+
+async def _run(app: FastAPI, total: int, concurrency: int):
+    # warm-up (route compilation, first-call imports)
+    for _ in range(200):
+        await _call(app)
+
+    # latency: one request at a time
+    samples = [await _call(app) for _ in range(total)]
+
+    # throughput: `concurrency` requests in flight
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with sem:
+            await _call(app)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    wall = time.perf_counter() - start
+
+    mean = sum(samples) / len(samples)
+    samples.sort()
+    return {
+        "p50_ms": samples[int(len(samples) * 0.50)],
+        "p99_ms": samples[int(len(samples) * 0.99)],
+        "mean_ms": mean,
+        "rps": total / wall,
+    }
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+
+    # access logs would dominate the measurement; we only time the stack
+    logging.getLogger("coreon.api").setLevel(logging.WARNING)
+
+    bare = _build_app([])
+    legacy = _build_app([RequestIDMiddleware, TenantMiddleware, LoggingMiddleware])
+    current = _build_app([RequestContextMiddleware])
+
+    baseline = None
+    for name, app in (("bare", bare), ("legacy", legacy), ("current", current)):
+        res = asyncio.run(_run(app, total, concurrency))
+        if baseline is None:
+            baseline = res["mean_ms"]
+        print(
+            f"{name:>8}: p50={res['p50_ms']:.3f}ms "
+            f"p99={res['p99_ms']:.3f}ms "
+            f"overhead={res['mean_ms'] - baseline:.3f}ms/req "
+            f"throughput={res['rps']:.0f} req/s (concurrency {concurrency})"
+        )
+
+
+if __name__ == "__main__":
+    main()
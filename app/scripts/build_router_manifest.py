@@ -0,0 +1,112 @@
+"""
+Generate app/core/router_manifest.py.
+
+Scans app/api/v1 on disk (no imports) for modules that define a top-level
+`router = APIRouter(...)` and records each module path with its static
+prefix, so startup never has to walk the package tree.
+
+Usage:
+    python -m app.scripts.build_router_manifest          # rewrite manifest
+    python -m app.scripts.build_router_manifest --check  # exit 1 if stale
+"""
+import ast
+import os
+import sys
+from typing import List, Optional, Tuple
+
+API_PACKAGE = "app.api.v1"
+API_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "api", "v1")
+MANIFEST_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "core", "router_manifest.py")
+
+# dated copies like router_backup_20251118095138.py are not live routers
+SKIP_MARKERS = ("_backup",)
+# test / debug-only packages (e.g. admin_test's /admin-test/secure) are never mounted
+SKIP_PACKAGES = ("test", "tests", "debug", "demo")
+
+
+def _is_non_production(package: str) -> bool:
+    return package in SKIP_PACKAGES or package.endswith("_test")
+
+
+def _router_prefix(path: str) -> Tuple[bool, Optional[str]]:
+    """
+    (defines_router, static_prefix) for a module file.
+    """
+    with open(path, encoding="utf-8") as f:
+        try:
+            tree = ast.parse(f.read(), filename=path)
+        except SyntaxError:
+            return False, None
+
+    for node in tree.body:
+        if not isinstance(node, ast.Assign):
+            continue
+        if not any(isinstance(t, ast.Name) and t.id == "router" for t in node.targets):
+            continue
+        call = node.value
+        if not (isinstance(call, ast.Call) and getattr(call.func, "id", None) == "APIRouter"):
+            continue
+        prefix = None
+        for kw in call.keywords:
+            if kw.arg == "prefix" and isinstance(kw.value, ast.Constant):
+                prefix = kw.value.value or None
+        return True, prefix
+    return False, None
+
+
+def discover() -> List[Tuple[str, Optional[str]]]:
+    found = []
+    for root, dirs, files in os.walk(API_DIR):
+        dirs[:] = sorted(d for d in dirs if d != "__pycache__" and not _is_non_production(d))
+        rel = os.path.relpath(root, API_DIR)
+        pkg = API_PACKAGE if rel == "." else API_PACKAGE + "." + rel.replace(os.sep, ".")
+        for name in sorted(files):
+            if not name.endswith(".py") or name == "__init__.py":
+                continue
+            if any(marker in name for marker in SKIP_MARKERS):
+                continue
+            has_router, prefix = _router_prefix(os.path.join(root, name))
+            if has_router:
+                found.append((f"{pkg}.{name[:-3]}", prefix))
+    return sorted(found)
+
+
+def render(entries: List[Tuple[str, Optional[str]]]) -> str:
+    lines = [
+        '"""',
+        "GENERATED by `python -m app.scripts.build_router_manifest` - do not edit.",
+        "",
+        "(module, static prefix) for every router under app.api.v1.",
+        "Re-run the generator after adding or removing a domain router.",
+        '"""',
+        "",
+        "ROUTER_MANIFEST = [",
+    ]
+    for module, prefix in entries:
+        lines.append(f"    ({module!r}, {prefix!r}),")
+    lines.append("]")
+    return "\n".join(lines) + "\n"
+
+
+def main():
+    content = render(discover())
+
+    if "--check" in sys.argv:
+        try:
+            with open(MANIFEST_PATH, encoding="utf-8") as f:
+                current = f.read()
+        except FileNotFoundError:
+            current = ""
+        if current != content:
+            print("router manifest is stale; run python -m app.scripts.build_router_manifest")
+            sys.exit(1)
+        print("router manifest is up to date")
+        return
+
+    with open(MANIFEST_PATH, "w", encoding="utf-8") as f:
+        f.write(content)
+    print(f"wrote {MANIFEST_PATH}")
+
+
+if __name__ == "__main__":
+    main()
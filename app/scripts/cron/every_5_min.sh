@@ -1,4 +1,5 @@
 #!/usr/bin/env bash
 set -e
 cd /app
+export DB_POOL_PROFILE="${DB_POOL_PROFILE:-script}"
 python -m app.scripts.maintenance_frequent
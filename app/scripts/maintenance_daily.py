@@ -1,8 +1,15 @@
 from app.core.logging_config import logger
 from app.monitoring.metrics import metrics
+from app.monitoring.multiprocess import start_metrics_flusher
+from app.scheduler.leader import run_if_leader
 
 
 def main():
+    start_metrics_flusher()  # flushes at exit so cron counters reach /metrics/prometheus
+    run_if_leader("daily_maintenance", _run)
+
+
+def _run():
     logger.info("CRON: running daily maintenance (external scheduler)")
     metrics.inc("cron_runs_total", labels={"job": "daily_maintenance"})
 
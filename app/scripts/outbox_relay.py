@@ -0,0 +1,163 @@
+"""
+Outbox relay: delivers OutboxMessage rows written by the API (OUTBOX_ENABLED).
+
+Runs as its own long-lived process next to the API workers:
+
+    OUTBOX_ENABLED=true DB_POOL_PROFILE=script python -m app.scripts.outbox_relay
+    python -m app.scripts.outbox_relay --once     # drain what is there and exit
+
+Each batch is claimed with FOR UPDATE SKIP LOCKED (several relays can run
+side by side) and handed to the event bus (sync mode) / task queue. A row is
+marked dispatched only once every event handler / the task has succeeded;
+a failure, a dead-lettered task or a task still running after
+OUTBOX_TASK_TIMEOUT_SECONDS is retried with backoff. A crash mid-batch means
+the batch is delivered again: handlers must tolerate at-least-once delivery.
+
+SQLite (local / tests) has no row locks; SKIP LOCKED is simply not rendered,
+so run a single relay there.
+"""
+import os
+import sys
+import time
+from concurrent.futures import wait
+from datetime import datetime, timedelta, timezone
+
+from app.core.logging_config import logger
+from app.db.session import SessionLocal
+from app.events.outbox import deliver
+from app.models.outbox_core import OutboxMessage
+from app.monitoring.metrics import metrics
+from app.monitoring.multiprocess import start_metrics_flusher
+
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "100"))
+OUTBOX_POLL_SECONDS = float(os.getenv("OUTBOX_POLL_SECONDS", "1"))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "10"))
+OUTBOX_RETRY_BACKOFF_SECONDS = float(os.getenv("OUTBOX_RETRY_BACKOFF_SECONDS", "5"))
+OUTBOX_RETENTION_HOURS = int(os.getenv("OUTBOX_RETENTION_HOURS", "72"))
+# how long a batch waits for its tasks while holding the claimed rows
+OUTBOX_TASK_TIMEOUT_SECONDS = float(os.getenv("OUTBOX_TASK_TIMEOUT_SECONDS", "60"))
+# the relay is not on a request path: wait for room in a full task lane
+OUTBOX_ENQUEUE_TIMEOUT_SECONDS = float(os.getenv("OUTBOX_ENQUEUE_TIMEOUT_SECONDS", "5"))
+
+
+def _mark_dispatched(row, now) -> None:
+    row.attempts += 1
+    row.dispatched_at = now
+    row.last_error = None
+    metrics.inc("outbox_dispatched_total", labels={"kind": row.kind})
+
+
+def _mark_failed(row, now, exc: BaseException) -> None:
+    row.attempts += 1
+    row.last_error = repr(exc)[:2000]
+    row.available_at = now + timedelta(
+        seconds=OUTBOX_RETRY_BACKOFF_SECONDS * (2 ** (row.attempts - 1))
+    )
+    metrics.inc("outbox_delivery_failures_total", labels={"kind": row.kind, "name": row.name})
+    logger.error(f"[Outbox] delivery of {row.kind} {row.name} (id={row.id}) failed: {exc!r}")
+
+
+def relay_batch(db, batch_size: int = OUTBOX_BATCH_SIZE) -> int:
+    """
+    Deliver one batch. Returns the number of rows claimed.
+    """
+    now = datetime.now(timezone.utc)
+    rows = (
+        db.query(OutboxMessage)
+        .filter(OutboxMessage.dispatched_at.is_(None))
+        .filter(OutboxMessage.available_at <= now)
+        .filter(OutboxMessage.attempts < OUTBOX_MAX_ATTEMPTS)
+        .order_by(OutboxMessage.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+    if not rows:
+        return 0
+
+    start = time.perf_counter()
+    pending = {}
+    for row in rows:
+        try:
+            future = deliver(row.kind, row.name, row.payload, enqueue_timeout=OUTBOX_ENQUEUE_TIMEOUT_SECONDS)
+        except Exception as exc:
+            _mark_failed(row, now, exc)
+            continue
+        if future is None:
+            _mark_dispatched(row, now)
+        else:
+            pending[future] = row
+
+    # tasks are only handed to in-memory lanes: wait for their outcome, but
+    # never hold the row locks longer than OUTBOX_TASK_TIMEOUT_SECONDS
+    done, not_done = wait(pending, timeout=OUTBOX_TASK_TIMEOUT_SECONDS)
+    for future in done:
+        exc = future.exception()
+        if exc is None:
+            _mark_dispatched(pending[future], now)
+        else:
+            _mark_failed(pending[future], now, exc)
+    for future in not_done:
+        # may still finish later; redelivery is covered by at-least-once
+        _mark_failed(pending[future], now, TimeoutError(f"task still running after {OUTBOX_TASK_TIMEOUT_SECONDS}s"))
+    db.commit()
+
+    metrics.observe("outbox_batch_duration_ms", (time.perf_counter() - start) * 1000.0)
+    return len(rows)
+
+
+def purge_dispatched(db) -> int:
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=OUTBOX_RETENTION_HOURS)
+    deleted = (
+        db.query(OutboxMessage)
+        .filter(OutboxMessage.dispatched_at < cutoff)
+        .delete(synchronize_session=False)
+    )
+    db.commit()
+    return deleted
+
+
+def _report_backlog(db) -> None:
+    backlog = (
+        db.query(OutboxMessage)
+        .filter(OutboxMessage.dispatched_at.is_(None))
+        .count()
+    )
+    metrics.set_gauge("outbox_backlog", backlog)
+
+
+def main():
+    from app.events import event_bus
+
+    # run handlers to completion before the batch is marked dispatched
+    event_bus.mode = "sync"
+    start_metrics_flusher()
+
+    once = "--once" in sys.argv[1:]
+    logger.info("Outbox relay started" + (" (single pass)" if once else ""))
+    last_purge = 0.0
+
+    while True:
+        db = SessionLocal()
+        try:
+            claimed = relay_batch(db)
+            if not claimed:
+                _report_backlog(db)
+                if time.monotonic() - last_purge > 3600:
+                    purge_dispatched(db)
+                    last_purge = time.monotonic()
+        except Exception:
+            db.rollback()
+            logger.error("[Outbox] relay pass failed", exc_info=True)
+            claimed = 0
+        finally:
+            db.close()
+
+        if not claimed:
+            if once:
+                break
+            time.sleep(OUTBOX_POLL_SECONDS)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,6 @@
 from sqlalchemy.orm import Session
 from app.services.base import BaseService
-from app.events import event_bus
+from app.events.outbox import stage_event
 from app.events.domain_event import DomainEvent
 from app.events.types import ActivityEvents
 from app.models import ActivityEvent
@@ -17,14 +17,15 @@ class ActivitiesService(BaseService):
             date=data["date"],
         )
         self.db.add(evt)
-        self.db.commit()
-        self.db.refresh(evt)
+        self.db.flush()
 
-        event_bus.publish(DomainEvent(
+        stage_event(self.db, DomainEvent(
             event=ActivityEvents.CLUB_EVENT_CREATED,
             school_id=school_id,
             entity="activity_event",
             entity_id=evt.id,
             data={"event_id": evt.id},
         ))
+        self.db.commit()
+        self.db.refresh(evt)
         return evt
@@ -1,20 +1,25 @@
 from __future__ import annotations
 from typing import Dict, Any, Optional, List
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
 
-from sqlalchemy import func
+from sqlalchemy import case, func
 from sqlalchemy.orm import Session
 
 from app.models import (
     Student,
-    Attendance,
+    AttendanceRecord,
     Grade,
     EventAttendance,
     TransportTripScan,
     HealthVisit,
+    AttendanceDailyRollup,
+    StudentAttendanceRollup,
 )
+from app.models.attendance_core import ATTENDANCE_STATUSES as STATUSES
 from app.services.notification_service import NotificationService
 
+EARLY_WARNING_ABSENT_DAYS = 5
+
 
 class AnalyticsService:
     """
@@ -34,28 +39,61 @@ class AnalyticsService:
     # -----------------------------------------------------
     # 1) Attendance summary
     # -----------------------------------------------------
-    def attendance_summary(self, school_id: int, date_from: date, date_to: date):
-        total = (
-            self.db.query(func.count(Attendance.id))
-            .filter(Attendance.school_id == school_id)
-            .filter(Attendance.date >= date_from)
-            .filter(Attendance.date <= date_to)
+    def _attendance_rolled_through(self, school_id: int) -> Optional[date]:
+        # last day in the nightly rollups (app.scheduler.jobs.attendance_rollup);
+        # later days are read live from attendance_records
+        return (
+            self.db.query(func.max(AttendanceDailyRollup.date))
+            .filter(AttendanceDailyRollup.school_id == school_id)
             .scalar()
         )
-        present = (
-            self.db.query(func.count(Attendance.id))
-            .filter(Attendance.school_id == school_id)
-            .filter(Attendance.date >= date_from)
-            .filter(Attendance.date <= date_to)
-            .filter(Attendance.status == "present")
-            .scalar()
-        )
-        absent = total - present
+
+    def attendance_summary(self, school_id: int, date_from: date, date_to: date):
+        # rollups up to the last rolled-up day, attendance rows after it
+        counts = dict.fromkeys((*STATUSES, "total"), 0)
+        through = self._attendance_rolled_through(school_id)
+        live_from = date_from
+
+        if through is not None and date_from <= through:
+            row = (
+                self.db.query(
+                    *[func.coalesce(func.sum(getattr(AttendanceDailyRollup, k)), 0) for k in counts]
+                )
+                .filter(AttendanceDailyRollup.school_id == school_id)
+                .filter(AttendanceDailyRollup.date >= date_from)
+                .filter(AttendanceDailyRollup.date <= min(date_to, through))
+                .one()
+            )
+            for k, v in zip(counts, row):
+                counts[k] += int(v)
+            live_from = through + timedelta(days=1)
+
+        if live_from <= date_to:
+            row = (
+                self.db.query(
+                    *[
+                        func.coalesce(func.sum(case((AttendanceRecord.status == status, 1), else_=0)), 0)
+                        for status in STATUSES
+                    ],
+                    func.count(AttendanceRecord.id),
+                )
+                .filter(AttendanceRecord.school_id == school_id)
+                .filter(AttendanceRecord.date >= live_from)
+                .filter(AttendanceRecord.date <= date_to)
+                .one()
+            )
+            for k, v in zip(counts, row):
+                counts[k] += int(v)
+
+        total = counts["total"]
+        present = counts["present"]
 
         return {
             "total_records": total,
             "present": present,
-            "absent": absent,
+            "absent": total - present,
+            "late": counts["late"],
+            "excused": counts["excused"],
             "attendance_rate": round((present / total) * 100, 2) if total else 0,
         }
 
@@ -141,17 +179,25 @@ class AnalyticsService:
     # -----------------------------------------------------
     def early_warning(self, school_id: int):
         # simple version: students with too many absences or clinic visits
-        absences = (
+        absent_days: Dict[int, int] = dict(
             self.db.query(
-                Attendance.student_id,
-                func.count(Attendance.id).label("absent_days")
+                StudentAttendanceRollup.student_id,
+                func.sum(StudentAttendanceRollup.absent),
             )
-            .filter(Attendance.school_id == school_id)
-            .filter(Attendance.status == "absent")
-            .group_by(Attendance.student_id)
-            .having(func.count(Attendance.id) >= 5)
+            .filter(StudentAttendanceRollup.school_id == school_id)
+            .group_by(StudentAttendanceRollup.student_id)
             .all()
         )
+        through = self._attendance_rolled_through(school_id)
+        live = (
+            self.db.query(AttendanceRecord.student_id, func.count(AttendanceRecord.id))
+            .filter(AttendanceRecord.school_id == school_id)
+            .filter(AttendanceRecord.status == "absent")
+        )
+        if through is not None:
+            live = live.filter(AttendanceRecord.date > through)
+        for student_id, days in live.group_by(AttendanceRecord.student_id).all():
+            absent_days[student_id] = absent_days.get(student_id, 0) + days
 
         health_issues = (
             self.db.query(
@@ -165,7 +211,11 @@ class AnalyticsService:
         )
 
         return {
-            "absentee_risk": [dict(row._mapping) for row in absences],
+            "absentee_risk": [
+                {"student_id": student_id, "absent_days": int(days)}
+                for student_id, days in absent_days.items()
+                if days >= EARLY_WARNING_ABSENT_DAYS
+            ],
             "health_risk": [dict(row._mapping) for row in health_issues],
         }
 
@@ -53,7 +53,7 @@ class AttendanceService:
         # parent notifications on abnormal events
         if notify_parent and status in ("absent", "late"):
             try:
-                self.notifications.create(
+                self.notifications.create_coalesced(
                     user_id=student_id,  # later link actual parent
                     school_id=school_id,
                     key="attendance_alert",
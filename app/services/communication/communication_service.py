@@ -4,11 +4,19 @@ from datetime import datetime
 
 from sqlalchemy.orm import Session
 
+from app.core.logging_config import logger
+from app.core.rbac.role_enums import Role as RoleName
 from app.services.notification_service import NotificationService
 from app.services.workflow.workflow_service import WorkflowService
 from app.models import (
     CommunicationMessage,
     CommunicationAnnouncement,
+    ParentProfile,
+    Role,
+    StaffProfile,
+    StudentProfile,
+    User,
+    UserRole,
 )
 
 
@@ -39,9 +47,8 @@ class CommunicationService:
         meta: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
 
-        items = []
-        for rid in recipients:
-            msg = CommunicationMessage(
+        items = [
+            CommunicationMessage(
                 school_id=school_id,
                 sender_id=sender_id,
                 recipient_id=rid,
@@ -50,22 +57,27 @@ class CommunicationService:
                 meta=meta or {},
                 sent_at=datetime.utcnow(),
             )
-            self.db.add(msg)
-            items.append(msg)
+            for rid in recipients
+        ]
+        self.db.add_all(items)
+        self.db.flush()
 
-            # in-app notification
-            try:
-                self.notifications.create(
-                    user_id=rid,
+        # in-app notifications, one batch for all recipients; a failure here
+        # must not lose the messages themselves
+        try:
+            with self.db.begin_nested():
+                self.notifications.create_many(
+                    user_ids=recipients,
                     school_id=school_id,
                     key="internal_message",
                     type="communication",
                     category="message",
                     data={"subject": subject, "sender": sender_id},
                     priority="normal",
+                    commit=False,
                 )
-            except Exception:
-                pass
+        except Exception:
+            logger.warning("[Communication] message notifications failed", exc_info=True)
 
         self.db.commit()
         return {"messages": items}
@@ -99,21 +111,50 @@ class CommunicationService:
         self.db.commit()
         self.db.refresh(ann)
 
-        # optional: push notifications
+        # optional: push notifications to the whole audience in one batch
         try:
-            self.notifications.broadcast(
+            self.notifications.create_many(
+                user_ids=self._audience_user_ids(school_id, audience),
                 school_id=school_id,
                 key="announcement",
                 type="communication",
                 category="announcement",
                 data={"title": title},
-                audience=audience,
             )
         except Exception:
-            pass
+            self.db.rollback()
+            logger.warning(f"[Communication] announcement {ann.id} notifications failed", exc_info=True)
 
         return {"announcement": ann}
 
+    def _audience_user_ids(self, school_id: int, audience: str) -> List[int]:
+        """
+        Active user ids of the school matching an announcement audience
+        (ids only, no ORM objects).
+        """
+        q = (
+            self.db.query(User.id)
+            .filter(User.school_id == school_id)
+            .filter(User.is_active.is_(True))
+        )
+        if audience == "all_parents":
+            q = q.join(ParentProfile, ParentProfile.user_id == User.id)
+        elif audience == "all_students":
+            q = q.join(StudentProfile, StudentProfile.user_id == User.id)
+        elif audience == "staff":
+            q = q.join(StaffProfile, StaffProfile.user_id == User.id)
+        elif audience == "teachers":
+            q = (
+                q.join(UserRole, UserRole.user_id == User.id)
+                .join(Role, Role.id == UserRole.role_id)
+                .filter(Role.name == RoleName.TEACHER.value)
+                .distinct()
+            )
+        elif audience != "all":
+            logger.warning(f"[Communication] unknown announcement audience {audience!r}")
+            return []
+        return [uid for (uid,) in q.all()]
+
     # -------------------------
     # List announcements
     # -------------------------
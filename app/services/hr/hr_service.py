@@ -1,6 +1,6 @@
 from sqlalchemy.orm import Session
 from app.services.base import BaseService
-from app.events import event_bus
+from app.events.outbox import stage_event
 from app.events.domain_event import DomainEvent
 from app.events.types import HREvents
 from app.models import LeaveRequest
@@ -18,14 +18,15 @@ class HRService(BaseService):
             status="pending",
         )
         self.db.add(req)
-        self.db.commit()
-        self.db.refresh(req)
+        self.db.flush()
 
-        event_bus.publish(DomainEvent(
+        stage_event(self.db, DomainEvent(
             event=HREvents.LEAVE_REQUEST_CREATED,
             school_id=school_id,
             user_id=staff_id,
             entity="leave_request",
             entity_id=req.id,
         ))
+        self.db.commit()
+        self.db.refresh(req)
         return req
@@ -0,0 +1,226 @@
+"""
+In-process caches for NotificationService.
+
+- templates: compiled NotificationTemplate per (key, school_id), after the
+  school -> global fallback, including "no template" (negative) entries
+- preferences: per-user channel rules
+
+Both are bounded LRU + TTL. ORM listeners drop entries once a template /
+preference write made through this process commits; other processes
+converge within the TTL.
+"""
+from __future__ import annotations
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+import os
+import re
+import threading
+import time
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
+
+from app.models import NotificationPreference, NotificationTemplate
+from app.monitoring.metrics import metrics
+
+
+NOTIFICATION_TEMPLATE_CACHE_SIZE = int(os.getenv("NOTIFICATION_TEMPLATE_CACHE_SIZE", "2000"))
+NOTIFICATION_TEMPLATE_CACHE_TTL_SECONDS = float(os.getenv("NOTIFICATION_TEMPLATE_CACHE_TTL_SECONDS", "300"))
+NOTIFICATION_PREF_CACHE_SIZE = int(os.getenv("NOTIFICATION_PREF_CACHE_SIZE", "20000"))
+NOTIFICATION_PREF_CACHE_TTL_SECONDS = float(os.getenv("NOTIFICATION_PREF_CACHE_TTL_SECONDS", "60"))
+
+_PLACEHOLDER = re.compile(r"\{\{(.*?)\}\}")
+_MISSING = object()
+
+# returned by TTLCache.get() on a miss (None is a cacheable value)
+MISS = object()
+
+
+# ---------------------------------------------------------------------------
+# Templates
+# ---------------------------------------------------------------------------
+def _compile(text: str) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+    # "Hi {{name}}!" -> literals ("Hi ", "!"), keys ("name",)
+    parts = _PLACEHOLDER.split(text)
+    return tuple(parts[0::2]), tuple(parts[1::2])
+
+
+def _render(compiled: Tuple[Tuple[str, ...], Tuple[str, ...]], data: Dict[str, Any]) -> str:
+    literals, keys = compiled
+    if not keys:
+        return literals[0]
+    out = [literals[0]]
+    for key, literal in zip(keys, literals[1:]):
+        value = data.get(key, _MISSING)
+        # unknown placeholders are left as written
+        out.append("{{" + key + "}}" if value is _MISSING else str(value))
+        out.append(literal)
+    return "".join(out)
+
+
+@dataclass(frozen=True)
+class CompiledTemplate:
+    """
+    Template pre-split into literal/placeholder parts; render() is one pass
+    over the parts, and substituted values are never re-scanned.
+    """
+
+    title: Tuple[Tuple[str, ...], Tuple[str, ...]]
+    body: Tuple[Tuple[str, ...], Tuple[str, ...]]
+
+    @classmethod
+    def from_model(cls, template: NotificationTemplate) -> "CompiledTemplate":
+        return cls(
+            title=_compile(template.title_template),
+            body=_compile(template.body_template or ""),
+        )
+
+    def render(self, data: Optional[Dict[str, Any]]) -> Tuple[str, str]:
+        data = data or {}
+        return _render(self.title, data), _render(self.body, data)
+
+
+@dataclass(frozen=True)
+class ChannelRule:
+    channel: str
+    enabled: bool
+    min_priority: Optional[str]
+    # "hourly" / "daily": channel is delivered as a periodic digest instead
+    digest: Optional[str] = None
+
+
+# ---------------------------------------------------------------------------
+# Cache
+# ---------------------------------------------------------------------------
+class TTLCache:
+    """
+    Small thread-safe LRU + TTL map. A stored None is a valid (negative) entry;
+    get() returns MISS only on a miss.
+    """
+
+    def __init__(self, name: str, maxsize: int, ttl: float):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                metrics.inc("notification_cache_hits_total", labels={"cache": self.name})
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+        metrics.inc("notification_cache_misses_total", labels={"cache": self.name})
+        return MISS
+
+    def put(self, key: Hashable, value: Any) -> None:
+        if self.maxsize <= 0 or self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+            size = len(self._entries)
+        metrics.set_gauge("notification_cache_size", size, labels={"cache": self.name})
+
+    def discard(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+            size = len(self._entries)
+        metrics.inc("notification_cache_invalidations_total", labels={"cache": self.name})
+        metrics.set_gauge("notification_cache_size", size, labels={"cache": self.name})
+
+    def invalidate(self, predicate) -> None:
+        with self._lock:
+            for key in [k for k in self._entries if predicate(k)]:
+                del self._entries[key]
+            size = len(self._entries)
+        metrics.inc("notification_cache_invalidations_total", labels={"cache": self.name})
+        metrics.set_gauge("notification_cache_size", size, labels={"cache": self.name})
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+        metrics.set_gauge("notification_cache_size", 0, labels={"cache": self.name})
+
+
+template_cache = TTLCache("template", NOTIFICATION_TEMPLATE_CACHE_SIZE, NOTIFICATION_TEMPLATE_CACHE_TTL_SECONDS)
+preference_cache = TTLCache("preference", NOTIFICATION_PREF_CACHE_SIZE, NOTIFICATION_PREF_CACHE_TTL_SECONDS)
+
+
+def invalidate_template(key: str) -> None:
+    """
+    Drop every cached resolution of `key`: a global template change affects
+    all schools that fall back to it.
+    """
+    template_cache.invalidate(lambda k: k[0] == key)
+
+
+def invalidate_preferences(user_id: int) -> None:
+    preference_cache.discard(user_id)
+
+
+def rules_from_models(prefs: List[NotificationPreference]) -> Tuple[ChannelRule, ...]:
+    return tuple(
+        ChannelRule(p.channel, bool(p.enabled), p.min_priority, (p.config or {}).get("digest"))
+        for p in prefs
+    )
+
+
+# --- ORM writes through this process invalidate once committed ---
+# Keys are collected at flush and evicted after commit: evicting at flush
+# would let a concurrent request re-cache the old committed row for the
+# whole TTL (and would evict for transactions that roll back).
+_STALE_KEY = "notification_cache_stale"
+
+
+def _mark_stale(target, kind: str, values) -> None:
+    session = object_session(target)
+    if session is None:
+        _evict({kind: set(values)})
+        return
+    stale = session.info.setdefault(_STALE_KEY, {"templates": set(), "users": set()})
+    stale[kind].update(values)
+
+
+def _evict(stale: Dict[str, set]) -> None:
+    for key in stale.get("templates", ()):
+        invalidate_template(key)
+    for user_id in stale.get("users", ()):
+        invalidate_preferences(user_id)
+
+
+@event.listens_for(NotificationTemplate, "after_insert")
+@event.listens_for(NotificationTemplate, "after_update")
+@event.listens_for(NotificationTemplate, "after_delete")
+def _template_changed(mapper, connection, target):
+    # a renamed key must also drop resolutions cached under the old name
+    old_keys = inspect(target).attrs.key.history.deleted or ()
+    _mark_stale(target, "templates", [target.key, *old_keys])
+
+
+@event.listens_for(NotificationPreference, "after_insert")
+@event.listens_for(NotificationPreference, "after_update")
+@event.listens_for(NotificationPreference, "after_delete")
+def _preference_changed(mapper, connection, target):
+    _mark_stale(target, "users", [target.user_id])
+
+
+@event.listens_for(Session, "after_commit")
+def _evict_after_commit(session):
+    stale = session.info.pop(_STALE_KEY, None)
+    if stale:
+        _evict(stale)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_after_rollback(session, previous_transaction):
+    if previous_transaction.parent is None:
+        session.info.pop(_STALE_KEY, None)
@@ -0,0 +1,429 @@
+"""
+Real-time notification fan-out for the SSE stream (GET /notifications/stream).
+
+NotificationService / the inbox stage small messages on the session
+(stage_stream); after the transaction commits they are handed to the hub's
+backend, which delivers them to every connected stream of the target user:
+
+- LocalBackend (default): in-process only; right for a single worker and tests
+- PostgresNotifyBackend: pg_notify on publish + one LISTEN connection per
+  worker, so a notification created on any worker (or the outbox relay)
+  reaches streams held by every other worker
+
+NOTIFICATION_STREAM_BACKEND=local|postgres selects the backend.
+
+uvicorn only runs lifespan shutdown once every open response has finished,
+so streams are ended on the server's exit signal (SIGINT / SIGTERM) rather
+than from the shutdown hook, and each stream is closed after
+NOTIFICATION_STREAM_MAX_SECONDS anyway; EventSource reconnects on its own
+and resumes with Last-Event-ID.
+"""
+from __future__ import annotations
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+import asyncio
+import json
+import logging
+import os
+import queue
+import select
+import signal
+import threading
+
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+from app.monitoring.metrics import metrics
+
+logger = logging.getLogger("coreon.api")
+
+NOTIFICATION_STREAM_BACKEND = os.getenv("NOTIFICATION_STREAM_BACKEND", "local")
+NOTIFICATION_STREAM_CHANNEL = os.getenv("NOTIFICATION_STREAM_CHANNEL", "coreon_notifications")
+# per worker / per user open streams
+NOTIFICATION_STREAM_MAX_CONNECTIONS = int(os.getenv("NOTIFICATION_STREAM_MAX_CONNECTIONS", "1000"))
+NOTIFICATION_STREAM_MAX_PER_USER = int(os.getenv("NOTIFICATION_STREAM_MAX_PER_USER", "5"))
+NOTIFICATION_STREAM_HEARTBEAT_SECONDS = float(os.getenv("NOTIFICATION_STREAM_HEARTBEAT_SECONDS", "15"))
+# messages buffered per slow client before the oldest are dropped
+NOTIFICATION_STREAM_QUEUE_SIZE = int(os.getenv("NOTIFICATION_STREAM_QUEUE_SIZE", "100"))
+# streams are ended (and reconnected by the client) after this long
+NOTIFICATION_STREAM_MAX_SECONDS = float(os.getenv("NOTIFICATION_STREAM_MAX_SECONDS", "900"))
+# committed batches waiting for the pg_notify sender thread
+NOTIFICATION_NOTIFY_QUEUE_SIZE = int(os.getenv("NOTIFICATION_NOTIFY_QUEUE_SIZE", "10000"))
+
+BODY_PREVIEW_CHARS = 500
+# pg_notify payloads must stay under 8000 bytes
+_NOTIFY_PAYLOAD_BYTES = 7500
+
+_SHUTDOWN_SIGNALS = (signal.SIGINT, signal.SIGTERM)
+
+Message = Tuple[int, Dict[str, Any]]  # (user_id, message)
+
+
+class StreamLimitExceeded(Exception):
+    pass
+
+
+def notification_message(
+    notification_id: int,
+    *,
+    type: str,
+    category: str,
+    title: str,
+    body: Optional[str],
+    priority: Optional[str],
+    unread_delta: int = 1,
+) -> Dict[str, Any]:
+    """
+    Stream payload for a created/updated notification (kept small: no data,
+    body truncated; clients fetch the full row if they need it).
+    """
+    return {
+        "event": "notification",
+        "id": notification_id,
+        "type": type,
+        "category": category,
+        "title": title,
+        "body": (body or "")[:BODY_PREVIEW_CHARS],
+        "priority": priority,
+        "unread_delta": unread_delta,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Backends
+# ---------------------------------------------------------------------------
+class LocalBackend:
+    """
+    Same-process delivery (single worker, tests).
+    """
+
+    def start(self, deliver: Callable[[List[Message]], None]) -> None:
+        self._deliver = deliver
+
+    def send(self, messages: List[Message]) -> None:
+        self._deliver(messages)
+
+    def close(self) -> None:
+        pass
+
+
+class PostgresNotifyBackend:
+    """
+    Cross-worker fan-out over LISTEN/NOTIFY on the primary database.
+
+    send() runs in after_commit - on the event loop for AsyncSession commits -
+    so it only queues; a sender thread issues the pg_notify calls.
+    """
+
+    def __init__(self, engine, channel: str = NOTIFICATION_STREAM_CHANNEL):
+        self.engine = engine
+        self.channel = channel
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._outgoing: "queue.Queue[Optional[List[Message]]]" = queue.Queue(maxsize=NOTIFICATION_NOTIFY_QUEUE_SIZE)
+        self._sender: Optional[threading.Thread] = None
+
+    def start(self, deliver: Callable[[List[Message]], None]) -> None:
+        self._deliver = deliver
+        self._thread = threading.Thread(target=self._listen_loop, name="notification-listen", daemon=True)
+        self._thread.start()
+        self._sender = threading.Thread(target=self._send_loop, name="notification-notify", daemon=True)
+        self._sender.start()
+
+    def _chunks(self, messages: List[Message]):
+        chunk: List[str] = []
+        size = 2
+        for user_id, message in messages:
+            encoded = json.dumps([user_id, message], separators=(",", ":"))
+            if chunk and size + len(encoded.encode()) + 1 > _NOTIFY_PAYLOAD_BYTES:
+                yield "[" + ",".join(chunk) + "]"
+                chunk, size = [], 2
+            chunk.append(encoded)
+            size += len(encoded.encode()) + 1
+        if chunk:
+            yield "[" + ",".join(chunk) + "]"
+
+    def send(self, messages: List[Message]) -> None:
+        try:
+            self._outgoing.put_nowait(messages)
+        except queue.Full:
+            metrics.inc("notification_stream_dropped_total", value=len(messages))
+            logger.warning(f"[NotificationHub] notify queue full, dropped {len(messages)} message(s)")
+
+    def _send_loop(self) -> None:
+        while True:
+            batch = self._outgoing.get()
+            if batch is None:
+                return
+            messages = list(batch)
+            stopping = False
+            # one connection for whatever piled up meanwhile
+            while True:
+                try:
+                    more = self._outgoing.get_nowait()
+                except queue.Empty:
+                    break
+                if more is None:
+                    stopping = True
+                    break
+                messages.extend(more)
+            try:
+                with self.engine.connect() as conn:
+                    for payload in self._chunks(messages):
+                        conn.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": self.channel, "payload": payload})
+                    conn.commit()
+            except Exception:
+                # best effort, like publish(): clients resync on reconnect
+                logger.error("[NotificationHub] pg_notify failed", exc_info=True)
+            if stopping:
+                return
+
+    def _listen_loop(self) -> None:
+        backoff = 1.0
+        while not self._stop.is_set():
+            raw = None
+            try:
+                raw = self.engine.raw_connection()
+                raw.detach()  # long-lived: not part of the request pool
+                conn = raw.driver_connection
+                conn.autocommit = True
+                with conn.cursor() as cur:
+                    cur.execute(f'LISTEN "{self.channel}"')
+                backoff = 1.0
+                while not self._stop.is_set():
+                    if select.select([conn], [], [], 5.0) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        note = conn.notifies.pop(0)
+                        self._deliver([tuple(item) for item in json.loads(note.payload)])
+            except Exception:
+                logger.error("[NotificationHub] LISTEN connection lost, reconnecting", exc_info=True)
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, 30.0)
+            finally:
+                if raw is not None:
+                    try:
+                        raw.close()
+                    except Exception:
+                        pass
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._sender is not None:
+            # flush what was committed before shutdown
+            try:
+                self._outgoing.put(None, timeout=1.0)
+            except queue.Full:
+                pass
+            self._sender.join(timeout=5.0)
+
+
+# ---------------------------------------------------------------------------
+# Hub
+# ---------------------------------------------------------------------------
+class Subscriber:
+    def __init__(self, user_id: int, loop: asyncio.AbstractEventLoop):
+        self.user_id = user_id
+        self.loop = loop
+        self.queue: "asyncio.Queue[Optional[Dict[str, Any]]]" = asyncio.Queue(maxsize=NOTIFICATION_STREAM_QUEUE_SIZE)
+
+    def offer(self, message: Optional[Dict[str, Any]]) -> None:
+        # runs on the subscriber's loop; a slow client loses its oldest messages
+        if self.queue.full():
+            self.queue.get_nowait()
+            metrics.inc("notification_stream_dropped_total")
+        self.queue.put_nowait(message)
+
+
+class NotificationHub:
+    def __init__(self, backend=None):
+        self._backend = backend
+        self._started = False
+        self._subscribers: Dict[int, Set[Subscriber]] = {}
+        self._count = 0
+        self._lock = threading.Lock()
+        self._closing = False
+        self._signals_hooked = False
+
+    def _get_backend(self):
+        if self._backend is None:
+            if NOTIFICATION_STREAM_BACKEND == "postgres":
+                from app.db.session import engine
+                self._backend = PostgresNotifyBackend(engine)
+            else:
+                self._backend = LocalBackend()
+        if not self._started:
+            with self._lock:
+                if not self._started:
+                    self._backend.start(self.deliver)
+                    self._started = True
+        return self._backend
+
+    # -- stream side (event loop) --
+    def _hook_shutdown_signals(self, loop: asyncio.AbstractEventLoop) -> None:
+        """
+        Chain onto the server's SIGINT / SIGTERM handlers so open streams end
+        as soon as shutdown starts; uvicorn would otherwise wait for them
+        before running the lifespan shutdown hook (notification_hub.close).
+        """
+        if self._signals_hooked or threading.current_thread() is not threading.main_thread():
+            return
+        self._signals_hooked = True
+        for sig in _SHUTDOWN_SIGNALS:
+            previous = signal.getsignal(sig)
+            if not callable(previous):
+                continue
+
+            def handler(signum, frame, previous=previous):
+                # signal context: no locks here, hand over to the loop
+                self._closing = True
+                try:
+                    loop.call_soon_threadsafe(self.end_streams)
+                except RuntimeError:
+                    pass
+                previous(signum, frame)
+
+            signal.signal(sig, handler)
+
+    def subscribe(self, user_id: int) -> Subscriber:
+        self._get_backend()
+        self._hook_shutdown_signals(asyncio.get_running_loop())
+        with self._lock:
+            if self._closing:
+                metrics.inc("notification_stream_rejected_total", labels={"reason": "shutdown"})
+                raise StreamLimitExceeded("server is shutting down")
+            if self._count >= NOTIFICATION_STREAM_MAX_CONNECTIONS:
+                metrics.inc("notification_stream_rejected_total", labels={"reason": "worker_limit"})
+                raise StreamLimitExceeded("too many open streams on this worker")
+            subs = self._subscribers.setdefault(user_id, set())
+            if len(subs) >= NOTIFICATION_STREAM_MAX_PER_USER:
+                metrics.inc("notification_stream_rejected_total", labels={"reason": "user_limit"})
+                raise StreamLimitExceeded("too many open streams for this user")
+            sub = Subscriber(user_id, asyncio.get_running_loop())
+            subs.add(sub)
+            self._count += 1
+            count = self._count
+        metrics.set_gauge("notification_stream_connections", count)
+        return sub
+
+    def unsubscribe(self, sub: Subscriber) -> None:
+        with self._lock:
+            subs = self._subscribers.get(sub.user_id)
+            if subs is not None and sub in subs:
+                subs.discard(sub)
+                self._count -= 1
+                if not subs:
+                    del self._subscribers[sub.user_id]
+            count = self._count
+        metrics.set_gauge("notification_stream_connections", count)
+
+    async def events(self, sub: Subscriber, initial: List[Dict[str, Any]]):
+        """
+        SSE body: initial messages, then live ones, with comment heartbeats.
+        Ends on shutdown and after NOTIFICATION_STREAM_MAX_SECONDS.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + NOTIFICATION_STREAM_MAX_SECONDS
+        try:
+            yield "retry: 5000\n\n"
+            for message in initial:
+                yield _format_sse(message)
+            while not self._closing:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    return
+                try:
+                    message = await asyncio.wait_for(
+                        sub.queue.get(), min(NOTIFICATION_STREAM_HEARTBEAT_SECONDS, remaining)
+                    )
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+                    continue
+                if message is None:  # hub closing
+                    return
+                yield _format_sse(message)
+        finally:
+            self.unsubscribe(sub)
+
+    # -- publish side (any thread) --
+    def publish(self, messages: List[Message]) -> None:
+        if not messages:
+            return
+        try:
+            self._get_backend().send(messages)
+            metrics.inc("notification_stream_published_total", value=len(messages))
+        except Exception:
+            # real-time delivery is best effort; clients resync on reconnect
+            logger.error("[NotificationHub] publish failed", exc_info=True)
+
+    def deliver(self, messages: List[Message]) -> None:
+        with self._lock:
+            targets = [
+                (sub, message)
+                for user_id, message in messages
+                for sub in self._subscribers.get(user_id, ())
+            ]
+        for sub, message in targets:
+            try:
+                sub.loop.call_soon_threadsafe(sub.offer, message)
+            except RuntimeError:
+                # loop already closed
+                pass
+
+    def end_streams(self) -> None:
+        """
+        End every open stream on this worker and refuse new ones.
+        """
+        with self._lock:
+            self._closing = True
+            subs = [sub for group in self._subscribers.values() for sub in group]
+        for sub in subs:
+            try:
+                sub.loop.call_soon_threadsafe(sub.offer, None)
+            except RuntimeError:
+                pass
+
+    def close(self) -> None:
+        """
+        End open streams (if the exit signal did not already) and stop the
+        backend (shutdown).
+        """
+        self.end_streams()
+        if self._backend is not None:
+            self._backend.close()
+
+
+def _format_sse(message: Dict[str, Any]) -> str:
+    lines = []
+    if message.get("event") == "notification":
+        # lets EventSource resume with Last-Event-ID
+        lines.append(f"id: {message['id']}")
+    lines.append(f"event: {message.get('event', 'message')}")
+    lines.append("data: " + json.dumps(message, separators=(",", ":"), default=str))
+    return "\n".join(lines) + "\n\n"
+
+
+notification_hub = NotificationHub()
+
+
+# ---------------------------------------------------------------------------
+# Transaction staging: nothing is streamed for rolled back work
+# ---------------------------------------------------------------------------
+_PENDING_KEY = "stream_pending"
+
+
+def stage_stream(db: Session, user_id: int, message: Dict[str, Any]) -> None:
+    db.info.setdefault(_PENDING_KEY, []).append((user_id, message))
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_after_commit(session: Session):
+    pending = session.info.pop(_PENDING_KEY, None)
+    if pending:
+        notification_hub.publish(pending)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_after_rollback(session: Session, previous_transaction):
+    if previous_transaction.parent is None:
+        session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,201 @@
+"""
+Notification inbox: keyset pagination + maintained unread counter.
+
+Pages are ordered by (created_at, id) descending and continue from an opaque
+cursor, so every page is an index range scan on
+ix_notifications_user_created_id no matter how long the history is.
+
+notification_counters.unread is adjusted in the same transaction as every
+insert / mark-read (see NotificationService), so the badge is one PK lookup.
+Both the adjustment and the first read build a missing counter row from the
+notifications table with INSERT ... ON CONFLICT, so a change racing the
+build is applied on top of it instead of being lost.
+"""
+from __future__ import annotations
+from typing import List, Optional, Tuple
+from datetime import datetime
+import base64
+
+from sqlalchemy import case, func, literal, select, tuple_, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+
+from app.models import Notification, NotificationCounter
+from app.services.notification_hub import stage_stream
+
+INBOX_DEFAULT_LIMIT = 50
+INBOX_MAX_LIMIT = 200
+
+# users per UPDATE ... WHERE user_id IN (...)
+_CHUNK = 1000
+
+
+# ---------------------------------------------------------------------------
+# Cursor pagination
+# ---------------------------------------------------------------------------
+def encode_cursor(created_at: datetime, notification_id: int) -> str:
+    raw = f"{created_at.isoformat()}|{notification_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Raises ValueError on a malformed cursor.
+    """
+    padded = cursor + "=" * (-len(cursor) % 4)
+    created_at, _, notification_id = base64.urlsafe_b64decode(padded.encode()).decode().partition("|")
+    return datetime.fromisoformat(created_at), int(notification_id)
+
+
+def inbox_query(
+    user_id: int,
+    *,
+    limit: int = INBOX_DEFAULT_LIMIT,
+    cursor: Optional[str] = None,
+    unread_only: bool = False,
+) -> Select:
+    """
+    One page (limit + 1 rows, the extra one tells whether a next page exists).
+    """
+    q = select(Notification).where(Notification.user_id == user_id)
+    if unread_only:
+        q = q.where(Notification.is_read.is_(False))
+    if cursor:
+        created_at, last_id = decode_cursor(cursor)
+        # row-value comparison: a single index range on (user_id, created_at, id)
+        q = q.where(tuple_(Notification.created_at, Notification.id) < (created_at, last_id))
+    return (
+        q.order_by(Notification.created_at.desc(), Notification.id.desc())
+        .limit(limit + 1)
+    )
+
+
+def split_page(rows: List[Notification], limit: int) -> Tuple[List[Notification], Optional[str]]:
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(last.created_at, last.id)
+
+
+# ---------------------------------------------------------------------------
+# Unread counter
+# ---------------------------------------------------------------------------
+def _counter_insert(db: Session):
+    # INSERT ... ON CONFLICT (PostgreSQL; SQLite for local runs / tests)
+    dialect = sqlite if db.get_bind().dialect.name == "sqlite" else postgresql
+    return dialect.insert(NotificationCounter.__table__)
+
+
+def bump_unread(db: Session, user_ids: List[int], delta: int) -> None:
+    """
+    Adjust the counters of `user_ids` by `delta` (never below zero), after
+    the notification rows were changed in the same transaction.
+
+    Existing counters take a PK update. Only users without one yet are
+    built from the notifications table (which already includes this
+    transaction's change); ON CONFLICT applies `delta` on top of a counter
+    built concurrently by unread_count().
+    """
+    table = NotificationCounter.__table__
+    adjusted = case((table.c.unread + delta < 0, 0), else_=table.c.unread + delta)
+    unread_now = func.sum(case((Notification.is_read.is_(False), 1), else_=0))
+    for start in range(0, len(user_ids), _CHUNK):
+        chunk = user_ids[start:start + _CHUNK]
+        updated = db.execute(
+            update(table)
+            .where(table.c.user_id.in_(chunk))
+            .values(unread=adjusted, updated_at=func.now())
+            .returning(table.c.user_id)
+        ).scalars().all()
+        missing = set(chunk).difference(updated)
+        if not missing:
+            continue
+
+        # first change for these users
+        built = (
+            select(Notification.user_id, unread_now)
+            .where(Notification.user_id.in_(missing))
+            .group_by(Notification.user_id)
+        )
+        stmt = _counter_insert(db).from_select(["user_id", "unread"], built)
+        db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[table.c.user_id],
+                set_={"unread": adjusted, "updated_at": func.now()},
+            )
+        )
+
+
+def unread_count(db: Session, user_id: int) -> int:
+    count = (
+        db.query(NotificationCounter.unread)
+        .filter(NotificationCounter.user_id == user_id)
+        .scalar()
+    )
+    if count is not None:
+        return count
+
+    # first read for this user: build the counter from the index; if a
+    # bump_unread (or another read) created it meanwhile, keep that row
+    built = (
+        select(literal(user_id), func.count(Notification.id))
+        .where(Notification.user_id == user_id)
+        .where(Notification.is_read.is_(False))
+    )
+    db.execute(
+        _counter_insert(db)
+        .from_select(["user_id", "unread"], built)
+        .on_conflict_do_nothing(index_elements=[NotificationCounter.__table__.c.user_id])
+    )
+    db.commit()
+    return (
+        db.query(NotificationCounter.unread)
+        .filter(NotificationCounter.user_id == user_id)
+        .scalar()
+    )
+
+
+def mark_read(db: Session, user_id: int, notification_ids: List[int]) -> int:
+    """
+    Mark the given notifications of `user_id` read. Returns how many changed.
+    """
+    if not notification_ids:
+        return 0
+    table = Notification.__table__
+    updated = 0
+    for start in range(0, len(notification_ids), _CHUNK):
+        result = db.execute(
+            update(table)
+            .where(table.c.user_id == user_id)
+            .where(table.c.id.in_(notification_ids[start:start + _CHUNK]))
+            .where(table.c.is_read.is_(False))
+            .values(is_read=True, read_at=func.now())
+        )
+        updated += result.rowcount
+    if updated:
+        bump_unread(db, [user_id], -updated)
+        stage_stream(db, user_id, {"event": "unread", "delta": -updated})
+    db.commit()
+    return updated
+
+
+def mark_all_read(db: Session, user_id: int) -> int:
+    table = Notification.__table__
+    result = db.execute(
+        update(table)
+        .where(table.c.user_id == user_id)
+        .where(table.c.is_read.is_(False))
+        .values(is_read=True, read_at=func.now())
+    )
+    # exact again, whatever drift the counter had
+    counters = NotificationCounter.__table__
+    db.execute(
+        update(counters)
+        .where(counters.c.user_id == user_id)
+        .values(unread=0, updated_at=func.now())
+    )
+    stage_stream(db, user_id, {"event": "unread", "count": 0})
+    db.commit()
+    return result.rowcount
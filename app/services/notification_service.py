@@ -1,29 +1,45 @@
 from __future__ import annotations
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
+from datetime import datetime, timedelta, timezone
+import os
 
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 from app.models import (
     Notification,
     NotificationPreference,
     NotificationTemplate,
 )
-from app.background.task_queue import task_queue
+from app.events.outbox import stage_task
+from app.services.notification_hub import notification_message, stage_stream
+from app.services.notification_inbox import bump_unread
+from app.monitoring.metrics import metrics
+from app.services.notification_cache import (
+    MISS,
+    ChannelRule,
+    CompiledTemplate,
+    preference_cache,
+    rules_from_models,
+    template_cache,
+)
+
+# users per IN (...) preference lookup / recipients per channel batch task
+IN_CLAUSE_CHUNK = 1000
+DELIVERY_BATCH_SIZE = int(os.getenv("NOTIFICATION_DELIVERY_BATCH_SIZE", "500"))
+# create_coalesced(): merge window and how many raw events a merged notification keeps
+COALESCE_WINDOW_SECONDS = float(os.getenv("NOTIFICATION_COALESCE_WINDOW_SECONDS", "900"))
+COALESCE_MAX_ITEMS = int(os.getenv("NOTIFICATION_COALESCE_MAX_ITEMS", "20"))
 
 
 class NotificationService:
     def __init__(self, db: Session):
         self.db = db
 
-    def _render_template(self, template: NotificationTemplate, data: dict):
-        title = template.title_template
-        body = template.body_template or ""
-        for key, value in (data or {}).items():
-            placeholder = "{{" + key + "}}"
-            title = title.replace(placeholder, str(value))
-            body = body.replace(placeholder, str(value))
-        return title, body
+    def _get_template(self, key: str, school_id: Optional[int]) -> Optional[CompiledTemplate]:
+        cached = template_cache.get((key, school_id))
+        if cached is not MISS:
+            return cached
 
-    def _get_template(self, key: str, school_id: Optional[int]):
         # 1) school-specific template
         tmpl = (
             self.db.query(NotificationTemplate)
@@ -31,28 +47,71 @@ class NotificationService:
             .filter(NotificationTemplate.school_id == school_id)
             .first()
         )
-        if tmpl:
-            return tmpl
+        if not tmpl:
+            # 2) global fallback
+            tmpl = (
+                self.db.query(NotificationTemplate)
+                .filter(NotificationTemplate.key == key)
+                .filter(NotificationTemplate.school_id.is_(None))
+                .first()
+            )
 
-        # 2) global fallback
-        return (
-            self.db.query(NotificationTemplate)
-            .filter(NotificationTemplate.key == key)
-            .filter(NotificationTemplate.school_id.is_(None))
-            .first()
-        )
+        # "no template" is cached too (negative entry)
+        compiled = CompiledTemplate.from_model(tmpl) if tmpl else None
+        template_cache.put((key, school_id), compiled)
+        return compiled
+
+    def _get_channel_rules(self, user_id: int) -> Tuple[ChannelRule, ...]:
+        rules = preference_cache.get(user_id)
+        if rules is MISS:
+            prefs = (
+                self.db.query(NotificationPreference)
+                .filter(NotificationPreference.user_id == user_id)
+                .all()
+            )
+            rules = rules_from_models(prefs)
+            preference_cache.put(user_id, rules)
+        return rules
+
+    def _get_channel_rules_many(self, user_ids: List[int]) -> Dict[int, Tuple[ChannelRule, ...]]:
+        rules: Dict[int, Tuple[ChannelRule, ...]] = {}
+        missing = []
+        for uid in user_ids:
+            cached = preference_cache.get(uid)
+            if cached is MISS:
+                missing.append(uid)
+            else:
+                rules[uid] = cached
+
+        # one query per chunk for every uncached user
+        for start in range(0, len(missing), IN_CLAUSE_CHUNK):
+            chunk = missing[start:start + IN_CLAUSE_CHUNK]
+            by_user: Dict[int, List[NotificationPreference]] = {uid: [] for uid in chunk}
+            prefs = (
+                self.db.query(NotificationPreference)
+                .filter(NotificationPreference.user_id.in_(chunk))
+                .all()
+            )
+            for p in prefs:
+                by_user[p.user_id].append(p)
+            for uid, user_prefs in by_user.items():
+                rules[uid] = rules_from_models(user_prefs)
+                preference_cache.put(uid, rules[uid])
+        return rules
 
     def _check_preferences(self, user_id: int, priority: str) -> Dict[str, bool]:
-        prefs = (
-            self.db.query(NotificationPreference)
-            .filter(NotificationPreference.user_id == user_id)
-            .all()
-        )
+        return self._allowed_channels(self._get_channel_rules(user_id), priority)
 
+    @staticmethod
+    def _allowed_channels(rules: Tuple[ChannelRule, ...], priority: str) -> Dict[str, bool]:
         allowed: Dict[str, bool] = {"in_app": True}
         levels = ["low", "normal", "high", "critical"]
 
-        for p in prefs:
+        for p in rules:
+            if p.digest and priority != "critical":
+                # delivered by the periodic digest job (notification_digest)
+                allowed[p.channel] = False
+                continue
             if p.min_priority:
                 if levels.index(priority) < levels.index(p.min_priority):
                     allowed[p.channel] = False
@@ -76,7 +135,7 @@ class NotificationService:
         # template
         template = self._get_template(key, school_id)
         if template:
-            title, body = self._render_template(template, data or {})
+            title, body = template.render(data)
         else:
             title = key
             body = None
@@ -98,12 +157,16 @@ class NotificationService:
         )
 
         self.db.add(notification)
-        self.db.commit()
-        self.db.refresh(notification)
+        self.db.flush()
+        bump_unread(self.db, [user_id], 1)
+        stage_stream(self.db, user_id, notification_message(
+            notification.id, type=type, category=category, title=title,
+            body=body, priority=priority,
+        ))
 
-        # async channels via background queue
+        # async channels via background queue, staged in the same transaction
         if channels.get("email"):
-            task_queue.enqueue("send_email", {
+            stage_task(self.db, "send_email", {
                 "user_id": user_id,
                 "school_id": school_id,
                 "notification_id": notification.id,
@@ -113,7 +176,7 @@ class NotificationService:
             })
 
         if channels.get("sms"):
-            task_queue.enqueue("send_sms", {
+            stage_task(self.db, "send_sms", {
                 "user_id": user_id,
                 "school_id": school_id,
                 "notification_id": notification.id,
@@ -122,7 +185,7 @@ class NotificationService:
             })
 
         if channels.get("push"):
-            task_queue.enqueue("send_push", {
+            stage_task(self.db, "send_push", {
                 "user_id": user_id,
                 "school_id": school_id,
                 "notification_id": notification.id,
@@ -131,4 +194,153 @@ class NotificationService:
                 "priority": priority,
             })
 
+        self.db.commit()
+        self.db.refresh(notification)
         return notification
+
+    def create_coalesced(
+        self,
+        *,
+        user_id: int,
+        school_id: Optional[int],
+        key: str,
+        type: str,
+        category: str,
+        data: Optional[Dict[str, Any]] = None,
+        priority: str = "normal",
+        window_seconds: Optional[float] = None,
+    ):
+        """
+        Like create(), but repeated (user, key) events inside the window are
+        merged into the user's latest unread notification for that key:
+        data gains "count" and the last "items", title/body are re-rendered,
+        and no further channel deliveries are sent.
+        """
+        window = COALESCE_WINDOW_SECONDS if window_seconds is None else window_seconds
+        data = data or {}
+        if window <= 0:
+            return self.create(
+                user_id=user_id, school_id=school_id, key=key, type=type,
+                category=category, data=data, priority=priority,
+            )
+
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=window)
+        existing = (
+            self.db.query(Notification)
+            .filter(Notification.user_id == user_id)
+            .filter(Notification.is_read.is_(False))
+            .filter(Notification.created_at >= cutoff)
+            .filter(Notification.type == type)
+            .filter(Notification.data["coalesce_key"].as_string() == key)
+            .order_by(Notification.id.desc())
+            .with_for_update()
+            .first()
+        )
+        if existing is None:
+            return self.create(
+                user_id=user_id, school_id=school_id, key=key, type=type, category=category,
+                data={**data, "coalesce_key": key, "count": 1, "items": [data]},
+                priority=priority,
+            )
+
+        merged = {**(existing.data or {}), **data}
+        merged["count"] = (existing.data or {}).get("count", 1) + 1
+        merged["items"] = ((existing.data or {}).get("items", []) + [data])[-COALESCE_MAX_ITEMS:]
+
+        template = self._get_template(key, school_id)
+        if template:
+            existing.title, existing.body = template.render(merged)
+        existing.data = merged
+        levels = ["low", "normal", "high", "critical"]
+        if levels.index(priority) > levels.index(existing.priority or "normal"):
+            existing.priority = priority
+        # same id: open streams replace the entry, the unread count is unchanged
+        stage_stream(self.db, user_id, notification_message(
+            existing.id, type=existing.type, category=existing.category,
+            title=existing.title, body=existing.body, priority=existing.priority,
+            unread_delta=0,
+        ))
+
+        self.db.commit()
+        metrics.inc("notifications_coalesced_total", labels={"key": key})
+        return existing
+
+    def create_many(
+        self,
+        *,
+        user_ids: List[int],
+        school_id: Optional[int],
+        key: str,
+        type: str,
+        category: str,
+        data: Optional[Dict[str, Any]] = None,
+        request_id: Optional[int] = None,
+        priority: str = "normal",
+        commit: bool = True,
+    ) -> int:
+        """
+        Fan one notification out to many users: one template lookup/render,
+        one preference query per chunk, one batched INSERT, and channel
+        deliveries staged as batch tasks. Returns the number of rows created.
+        """
+        user_ids = list(dict.fromkeys(user_ids))
+        if not user_ids:
+            return 0
+
+        template = self._get_template(key, school_id)
+        if template:
+            title, body = template.render(data)
+        else:
+            title = key
+            body = None
+
+        rules = self._get_channel_rules_many(user_ids)
+
+        table = Notification.__table__
+        rows = [
+            {
+                "user_id": uid,
+                "school_id": school_id,
+                "type": type,
+                "category": category,
+                "title": title,
+                "body": body,
+                "data": data,
+                "request_id": request_id,
+                "priority": priority,
+            }
+            for uid in user_ids
+        ]
+        # executemany + RETURNING is sent as multi-row INSERT ... VALUES pages
+        result = self.db.execute(
+            insert(table).returning(table.c.id, table.c.user_id),
+            rows,
+        )
+        ids_by_user = {user_id: nid for nid, user_id in result}
+        bump_unread(self.db, user_ids, 1)
+        message = notification_message(
+            0, type=type, category=category, title=title, body=body, priority=priority,
+        )
+        for uid in user_ids:
+            stage_stream(self.db, uid, {**message, "id": ids_by_user[uid]})
+
+        recipients: Dict[str, List[Dict[str, int]]] = {"email": [], "sms": [], "push": []}
+        for uid in user_ids:
+            allowed = self._allowed_channels(rules.get(uid, ()), priority)
+            for channel, batch in recipients.items():
+                if allowed.get(channel):
+                    batch.append({"user_id": uid, "notification_id": ids_by_user[uid]})
+
+        for channel, batch in recipients.items():
+            for start in range(0, len(batch), DELIVERY_BATCH_SIZE):
+                stage_task(self.db, f"send_{channel}_batch", {
+                    "school_id": school_id,
+                    "title": title,
+                    "body": body,
+                    "priority": priority,
+                    "recipients": batch[start:start + DELIVERY_BATCH_SIZE],
+                })
+
+        if commit:
+            self.db.commit()
+        return len(user_ids)
@@ -1,6 +1,6 @@
 from sqlalchemy.orm import Session
 from app.services.base import BaseService
-from app.events import event_bus
+from app.events.outbox import stage_event
 from app.events.domain_event import DomainEvent
 from app.events.types import NurseryEvents
 from app.models import NurseryDailyReport
@@ -17,14 +17,15 @@ class NurseryService(BaseService):
             notes=notes,
         )
         self.db.add(rpt)
-        self.db.commit()
-        self.db.refresh(rpt)
+        self.db.flush()
 
-        event_bus.publish(DomainEvent(
+        stage_event(self.db, DomainEvent(
             event=NurseryEvents.DAILY_REPORT_SUBMITTED,
             school_id=school_id,
             user_id=staff_id,
             entity="nursery_daily_report",
             entity_id=rpt.id,
         ))
+        self.db.commit()
+        self.db.refresh(rpt)
         return rpt
@@ -1,6 +1,6 @@
 from sqlalchemy.orm import Session
 from app.services.base import BaseService
-from app.events import event_bus
+from app.events.outbox import stage_event
 from app.events.domain_event import DomainEvent
 from app.events.types import SecurityEvents
 from app.models import SecurityIncident
@@ -18,10 +18,9 @@ class SecurityService(BaseService):
             description=input_data.get("description"),
         )
         self.db.add(inc)
-        self.db.commit()
-        self.db.refresh(inc)
+        self.db.flush()
 
-        event_bus.publish(DomainEvent(
+        stage_event(self.db, DomainEvent(
             event=SecurityEvents.INCIDENT_REPORTED,
             school_id=school_id,
             user_id=reporter_id,
@@ -29,4 +28,6 @@ class SecurityService(BaseService):
             entity_id=inc.id,
             data={"incident_id": inc.id},
         ))
+        self.db.commit()
+        self.db.refresh(inc)
         return inc
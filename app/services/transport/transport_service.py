@@ -233,7 +233,7 @@ class TransportService:
         key = "transport_check_in" if scan_type == "check_in" else "transport_check_out"
 
         try:
-            self.notifications.create(
+            self.notifications.create_coalesced(
                 user_id=created_by,
                 school_id=school_id,
                 key=key,
@@ -1,6 +1,6 @@
 from sqlalchemy.orm import Session
 from app.services.base import BaseService
-from app.events import event_bus
+from app.events.outbox import stage_event
 from app.events.types import WorkflowEvents
 from app.events.domain_event import DomainEvent
 from app.models import Request
@@ -17,10 +17,10 @@ class WorkflowService(BaseService):
             status="pending",
         )
         self.db.add(req)
-        self.db.commit()
-        self.db.refresh(req)
+        self.db.flush()
 
-        event_bus.publish(DomainEvent(
+        # committed together with the request; delivered after commit or by the outbox relay
+        stage_event(self.db, DomainEvent(
             event=WorkflowEvents.APPROVAL_PENDING,
             user_id=user_id,
             school_id=school_id,
@@ -28,4 +28,6 @@ class WorkflowService(BaseService):
             entity_id=req.id,
             data={"request_id": req.id},
         ))
+        self.db.commit()
+        self.db.refresh(req)
         return req